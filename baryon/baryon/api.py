@@ -2,12 +2,13 @@ from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions, routers
 
-from quarks.serializers import ExtensionViewSet, QuarkViewSet
+from quarks.serializers import ClassViewSet, ExtensionViewSet, QuarkViewSet
 
 router = routers.DefaultRouter()
 
 router.register("quarks", QuarkViewSet)
 router.register("extension", ExtensionViewSet)
+router.register("classes", ClassViewSet, basename="class")
 
 
 schema_view = get_schema_view(
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 from typing import List
 
@@ -138,3 +139,26 @@ LOGGING = {
 }
 
 SITE_ID = 1
+
+# Scrape webhooks
+# a push to a repository of a project queues a scrape of the project
+# the secret is used to verify GitHub signatures and GitLab tokens - if it is
+# not set, webhooks are accepted without verification
+BARYON_WEBHOOK_SECRET = os.environ.get("BARYON_WEBHOOK_SECRET")
+# pushes within this time get combined into a single scrape
+BARYON_WEBHOOK_DEBOUNCE_SECONDS = 120
+
+# Scraper data
+# runtime state of the scraper such as the quark info cache - this needs to
+# persist across deployments, so the docker setup mounts it as a volume
+BARYON_DATA_PATH = Path(os.environ.get("BARYON_DATA_PATH", BASE_DIR.parent / "data"))
+
+# Repo cache
+# disk budget of the cloned repositories in GiB - after a full scrape the least
+# recently updated repositories get removed until the cache fits the budget.
+# If not set, the cache is only cleaned from repositories of unlisted projects
+BARYON_REPO_CACHE_MAX_SIZE = (
+    int(float(os.environ["BARYON_REPO_CACHE_MAX_GB"]) * 2**30)
+    if os.environ.get("BARYON_REPO_CACHE_MAX_GB")
+    else None
+)
@@ -1,6 +1,13 @@
 from django.contrib import admin
 
-from .models import Project, ProjectClass, ProjectDoc, ProjectVersion
+from .models import (
+    Project,
+    ProjectClass,
+    ProjectDoc,
+    ProjectGeneration,
+    ProjectVersion,
+    ScrapeJob,
+)
 
 
 class ProjectClassInline(admin.TabularInline):
@@ -33,14 +40,42 @@ class ProjectAdmin(admin.ModelAdmin):
 
     list_filter = ["project_type"]
 
-    autocomplete_fields = [
-        "dependencies",
-    ]
-
-    readonly_fields = ["uuid"]
+    # the dependencies get resolved by the scraper
+    readonly_fields = ["uuid", "dependencies"]
 
     inlines = [
         ProjectVersionInline,
         ProjectClassInline,
         ProjectDocInline,
     ]
+
+    # edits need to invalidate the in-memory indices, see GenerationIndex
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        ProjectGeneration.bump()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        ProjectGeneration.bump()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        ProjectGeneration.bump()
+
+
+@admin.register(ScrapeJob)
+class ScrapeJobAdmin(admin.ModelAdmin):
+    list_display = [
+        "name",
+        "status",
+        "priority",
+        "scheduled_for",
+        "claimed_by",
+        "attempts",
+    ]
+
+    search_fields = ["name"]
+
+    list_filter = ["status"]
+
+    readonly_fields = ["uuid"]
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class QuarksConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "quarks"
+
+    def ready(self):
+        from . import checks  # noqa
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+
+@register()
+def check_webhook_secret(app_configs, **kwargs):
+    if settings.BARYON_WEBHOOK_SECRET:
+        return []
+    return [
+        Warning(
+            "BARYON_WEBHOOK_SECRET is not set, so anyone can trigger scrapes via the webhook.",
+            hint="Set the env variable BARYON_WEBHOOK_SECRET and configure it as the secret of the webhooks.",
+            id="quarks.W001",
+        )
+    ]
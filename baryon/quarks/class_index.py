@@ -0,0 +1,171 @@
+import bisect
+import collections
+import dataclasses
+import uuid
+from typing import Counter, Dict, Iterable, List, Optional, Sequence, Set, overload
+
+from .generation_index import GenerationIndex
+from .models import ProjectClass, ProjectGeneration
+
+
+class ClassIndex(GenerationIndex):
+    """An in-memory index of all class names which matches a search term as
+    prefix, as substring and fuzzy via trigrams, so the classes can be searched
+    per keystroke without scanning the class table.
+
+    Matches are ranked by kind - prefix before substring before fuzzy - and
+    shorter names first.
+    """
+
+    # minimal share of trigrams of a fuzzy match, like the default of pg_trgm
+    SIMILARITY_THRESHOLD = 0.3
+
+    def __init__(self, classes: Sequence[tuple], generation: Optional[uuid.UUID]):
+        super().__init__(generation)
+        # class pks by lower case name, declarations before extensions
+        self._pks: Dict[str, List[uuid.UUID]] = collections.defaultdict(list)
+        for pk, name, is_extension in sorted(classes, key=lambda c: c[2]):
+            self._pks[name.lower()].append(pk)
+        self._names = sorted(self._pks.keys())
+        # indices of the names by trigram
+        self._trigrams: Dict[str, List[int]] = collections.defaultdict(list)
+        self._num_trigrams: List[int] = []
+        for i, name in enumerate(self._names):
+            trigrams = self.trigrams(name)
+            self._num_trigrams.append(len(trigrams))
+            for trigram in trigrams:
+                self._trigrams[trigram].append(i)
+
+    @classmethod
+    def build(cls) -> "ClassIndex":
+        generation = ProjectGeneration.current()
+        return cls(
+            list(ProjectClass.objects.values_list("pk", "name", "is_extension")),
+            generation,
+        )
+
+    @staticmethod
+    def trigrams(word: str) -> Set[str]:
+        # padded like pg_trgm, so the start of a word has more weight
+        padded = f"  {word} "
+        return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+    def _prefix_matches(self, term: str) -> List[str]:
+        start = bisect.bisect_left(self._names, term)
+        end = bisect.bisect_left(self._names, term + "\uffff", lo=start)
+        return sorted(self._names[start:end], key=lambda name: (len(name), name))
+
+    def _substring_matches(self, term: str) -> List[str]:
+        return sorted(
+            (name for name in self._names if term in name),
+            key=lambda name: (name.index(term), len(name), name),
+        )
+
+    def _fuzzy_matches(self, term: str) -> List[str]:
+        trigrams = self.trigrams(term)
+        shared: Counter[int] = collections.Counter()
+        for trigram in trigrams:
+            shared.update(self._trigrams.get(trigram, []))
+        similarities = {
+            i: count / (len(trigrams) + self._num_trigrams[i] - count)
+            for i, count in shared.items()
+        }
+        return [
+            self._names[i]
+            for i in sorted(similarities, key=lambda i: (-similarities[i], i))
+            if similarities[i] >= self.SIMILARITY_THRESHOLD
+        ]
+
+    def search(self, term: str, limit: Optional[int] = None) -> List[uuid.UUID]:
+        """Returns the pks of the matching classes, best matches first."""
+        term = term.strip().lower()
+        if not term:
+            return []
+        pks: List[uuid.UUID] = []
+        matched_names: Set[str] = set()
+        for matches in [
+            self._prefix_matches,
+            self._substring_matches,
+            self._fuzzy_matches,
+        ]:
+            for name in matches(term):
+                if name in matched_names:
+                    continue
+                matched_names.add(name)
+                pks.extend(self._pks[name])
+                if limit is not None and len(pks) >= limit:
+                    return pks[:limit]
+        return pks
+
+
+@dataclasses.dataclass
+class ClassDefinition:
+    project: str
+    project_type: str
+    is_extension: bool
+    super_class: Optional[str]
+    file_path: str
+
+
+class ClassResolver(GenerationIndex):
+    """Maps class names to the projects which declare or extend them."""
+
+    def __init__(self, classes: Sequence[tuple], generation: Optional[uuid.UUID]):
+        super().__init__(generation)
+        self._definitions: Dict[str, List[ClassDefinition]] = collections.defaultdict(
+            list
+        )
+        # declarations before extensions
+        for name, *definition in sorted(classes, key=lambda c: c[3]):
+            self._definitions[name].append(ClassDefinition(*definition))
+
+    @classmethod
+    def build(cls) -> "ClassResolver":
+        generation = ProjectGeneration.current()
+        return cls(
+            list(
+                ProjectClass.objects.values_list(
+                    "name",
+                    "project__name",
+                    "project__project_type",
+                    "is_extension",
+                    "super_class",
+                    "file_path",
+                ).order_by("project__name")
+            ),
+            generation,
+        )
+
+    def resolve(self, names: Iterable[str]) -> Dict[str, List[ClassDefinition]]:
+        """Returns the definitions by class name, which are empty for
+        unknown classes.
+        """
+        return {name: list(self._definitions.get(name, [])) for name in names}
+
+
+class ClassSearchResults(Sequence[ProjectClass]):
+    """The ranked classes of a search, which only get fetched for the
+    requested slice, e.g. the current page of a paginator.
+    """
+
+    def __init__(self, pks: List[uuid.UUID]) -> None:
+        self.pks = pks
+
+    def __len__(self) -> int:
+        return len(self.pks)
+
+    @overload
+    def __getitem__(self, index: int) -> ProjectClass:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[ProjectClass]:
+        ...
+
+    def __getitem__(self, index):
+        if isinstance(index, int):
+            return self[index : index + 1 or None][0]
+        pks = self.pks[index]
+        classes = ProjectClass.objects.select_related("project").in_bulk(pks)
+        # classes which got deleted since the index was built are skipped
+        return [classes[pk] for pk in pks if pk in classes]
@@ -0,0 +1,43 @@
+import abc
+import threading
+import uuid
+from typing import Optional, Type, TypeVar
+
+from .models import ProjectGeneration
+
+T = TypeVar("T", bound="GenerationIndex")
+
+
+class GenerationIndex(abc.ABC):
+    """In-memory data which is derived from all scraped projects.
+
+    It belongs to a generation of the scraped projects and gets rebuilt by
+    :meth:`get` once a project got scraped. The current index is shared
+    among all threads of the process.
+    """
+
+    _index: Optional["GenerationIndex"] = None
+    _lock = threading.Lock()
+
+    def __init__(self, generation: Optional[uuid.UUID]) -> None:
+        self.generation = generation
+
+    @classmethod
+    @abc.abstractmethod
+    def build(cls: Type[T]) -> T:
+        """Builds the index from the database. The generation needs to be
+        obtained first, so a concurrent scrape results in a rebuild on the
+        next access.
+        """
+
+    @classmethod
+    def get(cls: Type[T]) -> T:
+        # the index of a subclass is stored on the subclass
+        index = cls.__dict__.get("_index")
+        if index is None or index.generation != ProjectGeneration.current():
+            with cls._lock:
+                index = cls.__dict__.get("_index")
+                if index is None or index.generation != ProjectGeneration.current():
+                    index = cls.build()
+                    cls._index = index
+        return index
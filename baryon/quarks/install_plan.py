@@ -0,0 +1,125 @@
+import collections
+import dataclasses
+import threading
+import uuid
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from .generation_index import GenerationIndex
+from .models import Project, ProjectGeneration
+
+
+@dataclasses.dataclass
+class PlannedProject:
+    name: str
+    project_type: str
+
+
+@dataclasses.dataclass
+class InstallPlan:
+    project: str
+    # the transitive dependencies before their dependents, the project last
+    install_order: List[PlannedProject]
+    # each cycle as names of the projects, its first project depends on the last
+    cycles: List[List[str]]
+
+    @property
+    def dependencies(self) -> List[PlannedProject]:
+        return self.install_order[:-1]
+
+
+class DependencyGraph(GenerationIndex):
+    """An in-memory snapshot of the dependency graph, which computes the
+    transitive dependencies of a project in the order in which they need to
+    be installed.
+
+    Plans get cached for the generation of the snapshot.
+    """
+
+    def __init__(
+        self,
+        projects: Sequence[Tuple[uuid.UUID, str, str]],
+        edges: Sequence[Tuple[uuid.UUID, uuid.UUID]],
+        generation: Optional[uuid.UUID],
+    ) -> None:
+        super().__init__(generation)
+        self._projects = {
+            pk: PlannedProject(name=name, project_type=project_type)
+            for pk, name, project_type in projects
+        }
+        self._dependencies: Dict[uuid.UUID, List[uuid.UUID]] = collections.defaultdict(
+            list
+        )
+        for from_pk, to_pk in edges:
+            # projects and edges get fetched by separate queries, so a
+            # concurrently deleted project may still have edges
+            if from_pk in self._projects and to_pk in self._projects:
+                self._dependencies[from_pk].append(to_pk)
+        # the dependencies get visited in a stable order
+        for dependencies in self._dependencies.values():
+            dependencies.sort(key=lambda pk: self._projects[pk].name)
+        self._plans: Dict[uuid.UUID, InstallPlan] = {}
+        self._plans_lock = threading.Lock()
+
+    @classmethod
+    def build(cls) -> "DependencyGraph":
+        generation = ProjectGeneration.current()
+        return cls(
+            list(Project.objects.values_list("pk", "name", "project_type")),
+            list(
+                Project.dependencies.through.objects.values_list(
+                    "from_project_id", "to_project_id"
+                )
+            ),
+            generation,
+        )
+
+    def _plan(self, pk: uuid.UUID) -> InstallPlan:
+        order: List[uuid.UUID] = []
+        cycles: List[List[str]] = []
+        done: Set[uuid.UUID] = set()
+        # the path of the depth first search, used to detect cycles
+        path: List[uuid.UUID] = []
+        on_path: Set[uuid.UUID] = set()
+
+        def visit(node: uuid.UUID):
+            path.append(node)
+            on_path.add(node)
+            for dependency in self._dependencies.get(node, []):
+                if dependency in on_path:
+                    cycle = path[path.index(dependency) :]
+                    cycles.append([self._projects[p].name for p in cycle])
+                elif dependency not in done:
+                    visit(dependency)
+            path.pop()
+            on_path.discard(node)
+            done.add(node)
+            # all dependencies are ordered before their dependent
+            order.append(node)
+
+        visit(pk)
+        return InstallPlan(
+            project=self._projects[pk].name,
+            install_order=[self._projects[p] for p in order],
+            cycles=cycles,
+        )
+
+    def install_plan(self, project: Project) -> InstallPlan:
+        """Returns the plan to install the project with all of its transitive
+        dependencies. Dependencies which form a cycle get installed in the
+        order in which the cycle was entered.
+
+        A project which is not part of the snapshot yet, because it was
+        created after the snapshot, gets planned without dependencies.
+        """
+        if project.pk not in self._projects:
+            return InstallPlan(
+                project=project.name,
+                install_order=[
+                    PlannedProject(name=project.name, project_type=project.project_type)
+                ],
+                cycles=[],
+            )
+        with self._plans_lock:
+            if project.pk not in self._plans:
+                self._plans[project.pk] = self._plan(project.pk)
+            return self._plans[project.pk]
@@ -0,0 +1,61 @@
+import asyncio
+from argparse import ArgumentParser
+
+from django.conf import settings
+from django.core.management.base import BaseCommand  # type: ignore
+
+from quarks.sc.repo_cache import RepoCache
+from quarks.sc.scraper import ProjectScraper
+
+
+class Command(BaseCommand):
+    help = "Report the disk usage of the cloned repositories and clean them up"
+
+    def add_arguments(self, parser: ArgumentParser):
+        parser.add_argument(
+            "--clean",
+            action="store_true",
+            help="Remove repos of unlisted projects, run git maintenance and enforce the disk budget",
+        )
+
+        parser.add_argument(
+            "--skip-prune",
+            action="store_true",
+            help="Keep the repos of projects which are no longer listed when cleaning",
+        )
+
+        parser.add_argument(
+            "--max-size",
+            help="Disk budget of the repos in GiB - defaults to BARYON_REPO_CACHE_MAX_GB",
+            type=float,
+        )
+
+        parser.add_argument(
+            "--num-largest",
+            help="Number of the largest repos which get listed",
+            type=int,
+            default=20,
+        )
+
+    async def clean(self, repo_cache: RepoCache, prune: bool):
+        """Removes the repos of projects which are no longer listed, runs the
+        git maintenance of all repos and evicts the least recently used repos
+        until the repo cache fits its disk budget.
+        """
+        names = await ProjectScraper.fetch_project_names() if prune else None
+        await repo_cache.clean(names)
+
+    def handle(self, *args, **options):
+        max_size = (
+            int(options["max_size"] * 2**30)
+            if options["max_size"]
+            else settings.BARYON_REPO_CACHE_MAX_SIZE
+        )
+        repo_cache = RepoCache(ProjectScraper.REPO_PATH, max_size=max_size)
+        if options["clean"]:
+            asyncio.run(self.clean(repo_cache, prune=not options["skip_prune"]))
+        self.stdout.write(
+            RepoCache.format_usage(
+                repo_cache.usage(), num_largest=options["num_largest"]
+            )
+        )
@@ -1,13 +1,22 @@
 import asyncio
+import time
 from argparse import ArgumentParser
-from typing import Optional
+from datetime import timedelta
+from pathlib import Path
 
-from django.core.management.base import BaseCommand  # type: ignore
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError  # type: ignore
+from django.db import close_old_connections
 
+from quarks.models import ScrapeJob
+from quarks.sc.scrape_report import ScrapeReport
 from quarks.sc.scraper import ProjectScraper
 
 
 class Command(BaseCommand):
+    # seconds between the checks for new jobs of a following worker
+    POLL_INTERVAL = 15
+
     def add_arguments(self, parser: ArgumentParser):
         parser.add_argument(
             "--limit",
@@ -27,18 +36,144 @@ class Command(BaseCommand):
             help="Omit quark scraping",
         )
 
-    async def scrape_extensions(self, limit: Optional[int] = None):
-        scraper = ProjectScraper()
-        await scraper.scrape_extensions(limit)
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Scrape all projects, even if their remote has not changed since the last scrape",
+        )
+
+        parser.add_argument(
+            "--only",
+            nargs="+",
+            metavar="NAME",
+            help="Only scrape the projects with the given names",
+        )
+
+        parser.add_argument(
+            "--enqueue",
+            action="store_true",
+            help="Store scrape jobs in the DB instead of scraping, see --worker",
+        )
+
+        parser.add_argument(
+            "--worker",
+            action="store_true",
+            help="Scrape the jobs stored in the DB until none are left - multiple workers can run in parallel",
+        )
+
+        parser.add_argument(
+            "--follow",
+            action="store_true",
+            help="Keep the worker running and wait for new jobs, e.g. the delayed jobs of webhooks",
+        )
+
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue an interrupted scrape and skip the projects it already finished",
+        )
 
-    async def scrape_quarks(self, limit: Optional[int] = None):
-        scraper = ProjectScraper()
-        await scraper.scrape_quarks(limit)
+        parser.add_argument(
+            "--schedule",
+            action="store_true",
+            help="Only scrape projects which are due based on their activity and last check, most likely changed first",
+        )
+
+        parser.add_argument(
+            "--max-projects",
+            help="Maximum number of projects to be scraped within this run",
+            type=int,
+        )
+
+        parser.add_argument(
+            "--time-budget",
+            help="Minutes after which no new project gets started",
+            type=float,
+        )
+
+        parser.add_argument(
+            "--git-instances",
+            help="Number of projects which get cloned or pulled concurrently",
+            type=int,
+            default=16,
+        )
+
+        parser.add_argument(
+            "--sclang-instances",
+            help="Number of sclang interpreters which are kept running during the scrape - defaults to the number of CPUs",
+            type=int,
+        )
+
+        parser.add_argument(
+            "--report",
+            help="Path of the JSON report with timings and resource usage of the scrape",
+            type=Path,
+        )
+
+        parser.add_argument(
+            "--trace-memory",
+            action="store_true",
+            help="Trace python allocations via tracemalloc for the report - slows down the scrape",
+        )
+
+    async def scrape(self, options) -> ScrapeReport:
+        scraper = ProjectScraper(
+            force=options["force"],
+            num_git_instances=options["git_instances"],
+            num_sclang_instances=options["sclang_instances"],
+            trace_memory=options["trace_memory"],
+            resume=options["resume"],
+            schedule=options["schedule"],
+            max_projects=options["max_projects"],
+            time_budget=timedelta(minutes=options["time_budget"])
+            if options["time_budget"]
+            else None,
+            repo_cache_max_size=settings.BARYON_REPO_CACHE_MAX_SIZE,
+        )
+        if options["enqueue"]:
+            await scraper.enqueue(
+                quarks=not options["skip_quarks"],
+                extensions=not options["skip_extensions"],
+                limit=options.get("limit"),
+            )
+        elif options["worker"]:
+            await scraper.work()
+        else:
+            await scraper.scrape(
+                quarks=not options["skip_quarks"],
+                extensions=not options["skip_extensions"],
+                limit=options.get("limit"),
+                only=options["only"],
+            )
+        return scraper.report
+
+    def wait_for_jobs(self):
+        while True:
+            # the connection is idle between the polls and may have timed out
+            close_old_connections()
+            if ScrapeJob.claimable().exists():
+                return
+            time.sleep(self.POLL_INTERVAL)
+
+    def run(self, options):
+        # quarks and extensions share the pipeline within one event loop
+        report = asyncio.run(self.scrape(options))
+        if options["enqueue"]:
+            return
+
+        report_path = options["report"] or ProjectScraper.REPORT_PATH.joinpath(
+            f"scrape_{report.started:%Y-%m-%dT%H%M%S}.json"
+        )
+        report.write(report_path)
+        self.stdout.write(report.format_summary())
 
     def handle(self, *args, **options):
+        if options["follow"] and not options["worker"]:
+            raise CommandError("--follow requires --worker")
         print(options)
-        if not options["skip_extensions"]:
-            asyncio.run(self.scrape_extensions(limit=options.get("limit")))
-
-        if not options["skip_quarks"]:
-            asyncio.run(self.scrape_quarks(limit=options.get("limit")))
+        if not options["follow"]:
+            self.run(options)
+            return
+        while True:
+            self.wait_for_jobs()
+            self.run(options)
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quarks", "0002_project_default_branch"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="projectclass",
+            options={"ordering": ["name", "project", "is_extension"]},
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="last_scraped_commit",
+            field=models.CharField(
+                blank=True,
+                help_text="Hash of the remote HEAD during the last successful scrape",
+                max_length=100,
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="last_scraped_tags",
+            field=models.CharField(
+                blank=True,
+                help_text="Fingerprint of the remote tags during the last successful scrape",
+                max_length=100,
+                null=True,
+            ),
+        ),
+    ]
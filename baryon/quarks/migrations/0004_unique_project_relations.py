@@ -0,0 +1,55 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:13
+
+from django.db import migrations, models
+
+# the scraper could create multiple rows for the same key,
+# e.g. a version for each hash a tag pointed to
+UNIQUE_FIELDS = {
+    "ProjectVersion": ["project", "version_name"],
+    "ProjectClass": ["project", "name"],
+    "ProjectDoc": ["project", "source_path"],
+}
+
+
+def remove_duplicates(apps, schema_editor):
+    for model_name, fields in UNIQUE_FIELDS.items():
+        model = apps.get_model("quarks", model_name)
+        seen = set()
+        duplicates = []
+        # keep the most recently modified row of each key
+        for pk, *key in model.objects.order_by("-modified_date").values_list(
+            "pk", *fields
+        ):
+            if tuple(key) in seen:
+                duplicates.append(pk)
+            seen.add(tuple(key))
+        model.objects.filter(pk__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quarks", "0003_project_last_scraped"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="projectclass",
+            constraint=models.UniqueConstraint(
+                fields=("project", "name"), name="unique_project_class_name"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="projectdoc",
+            constraint=models.UniqueConstraint(
+                fields=("project", "source_path"), name="unique_project_doc_source_path"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="projectversion",
+            constraint=models.UniqueConstraint(
+                fields=("project", "version_name"), name="unique_project_version_name"
+            ),
+        ),
+    ]
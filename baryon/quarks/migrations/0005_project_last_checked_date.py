@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quarks", "0004_unique_project_relations"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="last_checked_date",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Datetime of the last check of the remote for changes",
+                null=True,
+            ),
+        ),
+    ]
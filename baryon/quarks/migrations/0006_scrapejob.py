@@ -0,0 +1,105 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:20
+
+import uuid
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quarks", "0005_project_last_checked_date"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScrapeJob",
+            fields=[
+                (
+                    "uuid",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                ("created_date", models.DateTimeField(auto_now_add=True)),
+                ("modified_date", models.DateTimeField(auto_now=True)),
+                (
+                    "name",
+                    models.CharField(help_text="Name of the project", max_length=1024),
+                ),
+                (
+                    "git_url",
+                    models.URLField(help_text="URL of git repository", max_length=1024),
+                ),
+                (
+                    "project_type",
+                    models.CharField(
+                        choices=[("quark", "Quark"), ("extension", "Extension")],
+                        max_length=64,
+                    ),
+                ),
+                (
+                    "repo_info",
+                    models.JSONField(
+                        default=dict,
+                        help_text="Additional info of the repo, e.g. the default tag",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "priority",
+                    models.FloatField(
+                        default=0.0,
+                        help_text="Jobs with a higher priority get claimed first",
+                    ),
+                ),
+                (
+                    "scheduled_for",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        help_text="The job will not be claimed before this date",
+                    ),
+                ),
+                (
+                    "claimed_by",
+                    models.CharField(
+                        blank=True,
+                        help_text="Host and PID of the worker which claimed the job",
+                        max_length=255,
+                        null=True,
+                    ),
+                ),
+                ("claimed_date", models.DateTimeField(blank=True, null=True)),
+                ("attempts", models.PositiveIntegerField(default=0)),
+                ("error", models.TextField(blank=True, default="")),
+            ],
+            options={
+                "ordering": ["-created_date"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="scrapejob",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status", "pending")),
+                fields=("name",),
+                name="unique_pending_scrape_job",
+            ),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:29
+
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models.fields.json import KeyTextTransform
+
+# GIN indices and tsvectors are only available on PostgreSQL, so the index gets
+# created via SQL instead of Meta.indexes, which would break SQLite
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE INDEX quarks_project_search_vector_gin "
+        "ON quarks_project USING gin (search_vector)"
+    )
+    Project = apps.get_model("quarks", "Project")
+    Project.objects.update(
+        search_vector=SearchVector("name", weight="A", config="english")
+        + SearchVector(
+            KeyTextTransform("summary", "quark_info"), weight="B", config="english"
+        )
+        + SearchVector("project_help", weight="C", config="english")
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS quarks_project_search_vector_gin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quarks", "0006_scrapejob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False,
+                help_text="Full text search index of name, summary and README",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:54
+
+import uuid
+
+from django.db import migrations, models
+
+
+def create_generation(apps, schema_editor):
+    ProjectGeneration = apps.get_model("quarks", "ProjectGeneration")
+    ProjectGeneration.objects.create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("quarks", "0007_project_search_vector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProjectGeneration",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("generation", models.UUIDField(default=uuid.uuid4)),
+            ],
+        ),
+        migrations.RunPython(create_generation, migrations.RunPython.noop),
+    ]
@@ -1,14 +1,87 @@
+import re
 import uuid
+from datetime import timedelta
 from pathlib import Path
-
-from django.db import models
-from django.db.models import Q
+from typing import List, Optional
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+)
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import F, Q
+from django.db.models.expressions import CombinedExpression
+from django.db.models.fields.json import KeyTextTransform
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext as _
 
 from .sc.extractor import ProjectRepo as Extractor
 
 
+class ProjectQuerySet(models.QuerySet):
+    SEARCH_CONFIG = "english"
+
+    # tsquery operators must not be passed on from the search term
+    SEARCH_WORD_REGEX = re.compile(r"\w+")
+
+    @classmethod
+    def search_vector(cls) -> CombinedExpression:
+        # the weights rank matches of the name over the summary and the README
+        return (
+            SearchVector("name", weight="A", config=cls.SEARCH_CONFIG)
+            + SearchVector(
+                KeyTextTransform("summary", "quark_info"),
+                weight="B",
+                config=cls.SEARCH_CONFIG,
+            )
+            + SearchVector("project_help", weight="C", config=cls.SEARCH_CONFIG)
+        )
+
+    @classmethod
+    def prefix_tsquery(cls, search_term: str) -> Optional[str]:
+        """Translates a search term into a raw tsquery which matches all words
+        of the term as prefixes, so results show up while the term gets typed.
+        """
+        words = cls.SEARCH_WORD_REGEX.findall(search_term.lower())
+        if not words:
+            return None
+        return " & ".join(f"{word}:*" for word in words)
+
+    def search(self, search_term: str) -> "ProjectQuerySet":
+        """Returns the projects matching the search term, best matches first.
+
+        On PostgreSQL the maintained search vector and its GIN index get used,
+        other databases such as SQLite of the dev and test settings fall back
+        on a substring search.
+        """
+        if connection.vendor != "postgresql":
+            return self.filter(
+                Q(name__icontains=search_term)
+                | Q(quark_info__summary__icontains=search_term)
+                | Q(project_help__icontains=search_term)
+            )
+        tsquery = self.prefix_tsquery(search_term)
+        if tsquery is None:
+            return self
+        query = SearchQuery(tsquery, search_type="raw", config=self.SEARCH_CONFIG)
+        return (
+            self.filter(search_vector=query)
+            .annotate(search_rank=SearchRank(F("search_vector"), query))
+            .order_by("-search_rank", "name")
+        )
+
+    def update_search_vector(self) -> int:
+        """Rebuilds the search vector of the projects from their name, summary
+        and README. Without PostgreSQL there is no search vector to maintain.
+        """
+        if connection.vendor != "postgresql":
+            return 0
+        return self.update(search_vector=self.search_vector())
+
+
 class Project(models.Model):
     class ProjectType(models.TextChoices):
         QUARK = "quark", _("Quark")
@@ -71,7 +144,7 @@ class Project(models.Model):
         help_text=_("Used formatting for text file"),
     )
 
-    # @todo this is deprecated?
+    # resolved from the quark file by the scraper, see sync_dependencies
     dependencies = models.ManyToManyField(  # type: ignore
         "Project",
         related_name="dependents",
@@ -84,39 +157,39 @@ class Project(models.Model):
         default="master",
     )
 
-    def get_dependencies(self) -> models.QuerySet["Project"]:
-        dependencies = []
-
-        # try to extract dependencies from quark file
-        for d in ["dependencies", "ext_dependency"]:
-            dep = self.quark_info.get(d, [])
-
-            if isinstance(dep, str):
-                # e.g. 3dj has ext_dependency listed as a string
-                dep = [x.strip() for x in dep.split(",")]
+    last_scraped_commit = models.CharField(
+        max_length=100,
+        null=True,
+        blank=True,
+        help_text=_("Hash of the remote HEAD during the last successful scrape"),
+    )
 
-            if not isinstance(dep, list):
-                return Project.objects.none()
+    last_scraped_tags = models.CharField(
+        max_length=100,
+        null=True,
+        blank=True,
+        help_text=_("Fingerprint of the remote tags during the last successful scrape"),
+    )
 
-            dependencies.extend(dep)
+    last_checked_date = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("Datetime of the last check of the remote for changes"),
+    )
 
-        if len(dependencies) == 0:
-            return Project.objects.none()
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text=_("Full text search index of name, summary and README"),
+    )
 
-        # fuzzy match against dependency names/urls
-        query = Q()
-        for dependency_name in dependencies:
-            query |= Q(git_url__icontains=dependency_name) | Q(
-                name__icontains=dependency_name
-            )
+    objects = ProjectQuerySet.as_manager()
 
-        return Project.objects.filter(query)
+    def get_dependencies(self) -> models.QuerySet["Project"]:
+        return self.dependencies.all()
 
     def get_dependents(self) -> models.QuerySet["Project"]:
-        return Project.objects.filter(
-            Q(quark_info__dependencies__icontains=self.name)
-            | Q(quark_info__ext_dependency___icontains=self.name)
-        )
+        return Project.objects.filter(dependencies=self)
 
     quark_info = models.JSONField(
         help_text=_("Extracted info from quark file"),
@@ -183,6 +256,12 @@ class ProjectVersion(models.Model):
             "project",
             "-release_date",
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["project", "version_name"],
+                name="unique_project_version_name",
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.version_name
@@ -242,6 +321,12 @@ class ProjectClass(models.Model):
             "project",
             "is_extension",
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["project", "name"],
+                name="unique_project_class_name",
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -293,6 +378,254 @@ class ProjectDoc(models.Model):
             "project",
             "source_path",
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["project", "source_path"],
+                name="unique_project_doc_source_path",
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.source_path
+
+
+class ProjectGeneration(models.Model):
+    """Changes whenever projects, their classes or their dependencies change,
+    so it can be used to invalidate data which is derived from all projects.
+    The single row gets created by a migration.
+    """
+
+    ROW_PK = 1
+
+    # random instead of a counter, so a rolled back generation is not reused
+    generation = models.UUIDField(default=uuid.uuid4)
+
+    @classmethod
+    def current(cls) -> Optional[uuid.UUID]:
+        return (
+            cls.objects.filter(pk=cls.ROW_PK)
+            .values_list("generation", flat=True)
+            .first()
+        )
+
+    @classmethod
+    def bump(cls):
+        """Starts a new generation, which becomes visible to other processes
+        with the commit of the surrounding transaction.
+        """
+        cls.objects.filter(pk=cls.ROW_PK).update(generation=uuid.uuid4())
+
+
+class ScrapeJob(models.Model):
+    """A project which is queued to be scraped by a ``scrape_projects --worker``.
+
+    Jobs get claimed via row locking, so multiple worker processes can
+    drain the queue in parallel without scraping a project twice.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", _("Pending")
+        RUNNING = "running", _("Running")
+        DONE = "done", _("Done")
+        FAILED = "failed", _("Failed")
+
+    # a running job whose worker did not finish it within this time
+    # is considered abandoned, e.g. because the worker got killed
+    CLAIM_TIMEOUT = timedelta(hours=2)
+    MAX_ATTEMPTS = 3
+    RETRY_DELAY = timedelta(minutes=30)
+    # jobs of webhooks get claimed before the jobs of a regular enqueue
+    URGENT_PRIORITY = 1e9
+
+    uuid = models.UUIDField(
+        primary_key=True,
+        editable=False,
+        default=uuid.uuid4,
+        unique=True,
+    )
+
+    created_date = models.DateTimeField(auto_now_add=True)
+    modified_date = models.DateTimeField(auto_now=True)
+
+    name = models.CharField(
+        max_length=1024,
+        help_text=_("Name of the project"),
+    )
+
+    git_url = models.URLField(
+        max_length=1024,
+        help_text=_("URL of git repository"),
+    )
+
+    project_type = models.CharField(max_length=64, choices=Project.ProjectType.choices)
+
+    repo_info = models.JSONField(
+        default=dict,
+        help_text=_("Additional info of the repo, e.g. the default tag"),
+    )
+
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+
+    priority = models.FloatField(
+        default=0.0,
+        help_text=_("Jobs with a higher priority get claimed first"),
+    )
+
+    scheduled_for = models.DateTimeField(
+        default=timezone.now,
+        help_text=_("The job will not be claimed before this date"),
+    )
+
+    claimed_by = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        help_text=_("Host and PID of the worker which claimed the job"),
+    )
+
+    claimed_date = models.DateTimeField(null=True, blank=True)
+
+    attempts = models.PositiveIntegerField(default=0)
+
+    error = models.TextField(blank=True, default="")
+
+    @classmethod
+    def claimable(cls) -> models.QuerySet["ScrapeJob"]:
+        now = timezone.now()
+        # a project which is being scraped must not be scraped by another
+        # worker at the same time, as both would work on the same repo dir
+        running_names = cls.objects.filter(status=cls.Status.RUNNING).values("name")
+        return cls.objects.filter(
+            (
+                Q(status=cls.Status.PENDING, scheduled_for__lte=now)
+                & ~Q(name__in=running_names)
+            )
+            | Q(status=cls.Status.RUNNING, claimed_date__lt=now - cls.CLAIM_TIMEOUT)
+        ).order_by("-priority", "scheduled_for")
+
+    @classmethod
+    def claim(cls, worker: str, limit: int) -> List["ScrapeJob"]:
+        """Marks up to ``limit`` claimable jobs as running for the worker."""
+        claim_update = {
+            "status": cls.Status.RUNNING,
+            "claimed_by": worker,
+            "claimed_date": timezone.now(),
+            "attempts": F("attempts") + 1,
+            "modified_date": timezone.now(),
+        }
+        jobs: List[ScrapeJob]
+        if connection.features.has_select_for_update_skip_locked:
+            # rows locked by other workers are skipped instead of waited for
+            with transaction.atomic():
+                jobs = list(cls.claimable().select_for_update(skip_locked=True)[:limit])
+                cls.objects.filter(pk__in=[job.pk for job in jobs]).update(
+                    **claim_update
+                )
+        else:
+            # SQLite has no row locks, so the job is claimed via a
+            # compare-and-swap - only the worker whose update matched owns the job
+            jobs = []
+            for job in cls.claimable()[:limit]:
+                claimed = (
+                    cls.claimable()
+                    .filter(pk=job.pk, status=job.status, claimed_date=job.claimed_date)
+                    .update(**claim_update)
+                )
+                if claimed:
+                    jobs.append(job)
+        for job in jobs:
+            job.refresh_from_db()
+        return jobs
+
+    @classmethod
+    def enqueue_project(cls, project: Project, delay: timedelta) -> "ScrapeJob":
+        """Queues an urgent scrape of a project after delay.
+        If the project is already queued, its job gets postponed instead,
+        so a burst of pushes results in a single scrape.
+        """
+        scheduled_for = timezone.now() + delay
+        with transaction.atomic():
+            job = (
+                cls.objects.select_for_update()
+                .filter(name=project.name, status=cls.Status.PENDING)
+                .first()
+            )
+            if job is None:
+                try:
+                    with transaction.atomic():
+                        return cls.objects.create(
+                            name=project.name,
+                            git_url=project.git_url,
+                            project_type=project.project_type,
+                            priority=cls.URGENT_PRIORITY,
+                            scheduled_for=scheduled_for,
+                        )
+                except IntegrityError:
+                    # a concurrent push queued the project in the meantime
+                    job = cls.objects.select_for_update().get(
+                        name=project.name, status=cls.Status.PENDING
+                    )
+            job.scheduled_for = max(job.scheduled_for, scheduled_for)
+            job.priority = max(job.priority, cls.URGENT_PRIORITY)
+            job.save(update_fields=["scheduled_for", "priority", "modified_date"])
+            return job
+
+    def finish(self):
+        self.status = self.Status.DONE
+        self.error = ""
+        self.save(update_fields=["status", "error", "modified_date"])
+
+    def fail(self, error: str):
+        self.error = error
+        update_fields = ["status", "error", "scheduled_for", "modified_date"]
+        if self.attempts < self.MAX_ATTEMPTS:
+            self.status = self.Status.PENDING
+            self.scheduled_for = timezone.now() + self.RETRY_DELAY * self.attempts
+            try:
+                with transaction.atomic():
+                    self.save(update_fields=update_fields)
+                return
+            except IntegrityError:
+                # a newer pending job of the project already covers the retry
+                pass
+        self.status = self.Status.FAILED
+        self.save(update_fields=update_fields)
+
+    def postpone(self, delay: timedelta):
+        """Hands a claimed job back to the queue without counting the attempt,
+        e.g. because another process scrapes the project at the moment.
+        """
+        self.status = self.Status.PENDING
+        self.attempts = max(self.attempts - 1, 0)
+        self.scheduled_for = timezone.now() + delay
+        try:
+            with transaction.atomic():
+                self.save(
+                    update_fields=[
+                        "status",
+                        "attempts",
+                        "scheduled_for",
+                        "modified_date",
+                    ]
+                )
+        except IntegrityError:
+            # a newer pending job of the project already covers the scrape
+            self.finish()
+
+    class Meta:
+        ordering = ["-created_date"]
+        constraints = [
+            # a project is queued at most once
+            models.UniqueConstraint(
+                fields=["name"],
+                condition=Q(status="pending"),
+                name="unique_pending_scrape_job",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.status})"
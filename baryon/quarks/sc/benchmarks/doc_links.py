@@ -0,0 +1,110 @@
+"""Benchmarks ``ProjectRepo.fix_doc_links`` on a generated project with
+thousands of help pages, once processed by a single thread and once by a
+process pool. Besides the duration it reports the longest stall of the
+event loop, which would block all other scraper workers.
+
+Run from the ``baryon`` directory via::
+
+    python -m quarks.sc.benchmarks.doc_links
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+
+from ..extractor import HelpFile, ProjectRepo, ProjectType
+
+PAGE_TEMPLATE = """<html><head>
+<link rel="stylesheet" href="./../../scdoc.css" type="text/css" />
+<script src="./../../scdoc.js" type="text/javascript"></script>
+</head><body>
+<div class="doclink">source: <a href="./../../Classes/{name}.schelp">link</a></div>
+{links}
+</body></html>
+"""
+
+
+def create_help_files(
+    repo_path: Path, doc_path: Path, num_pages: int, num_links: int
+) -> List[HelpFile]:
+    names = [f"Class{i}" for i in range(num_pages)]
+    # links to other pages of the project as well as to the online help
+    link_targets = names + ["SinOsc", "Pbind", "Routine"]
+    help_files: List[HelpFile] = []
+    for name in names:
+        html_path = doc_path.joinpath("Classes", f"{name}.html")
+        html_path.parent.mkdir(parents=True, exist_ok=True)
+        links = "\n".join(
+            f'<a href="./../../Classes/{target}">{target}</a>'
+            for target in random.choices(link_targets, k=num_links)
+        )
+        html_path.write_text(PAGE_TEMPLATE.format(name=name, links=links))
+        help_files.append(
+            HelpFile(
+                source_path=repo_path.joinpath(
+                    "HelpSource", "Classes", f"{name}.schelp"
+                ),
+                html_path=html_path,
+            )
+        )
+    return help_files
+
+
+async def measure_loop_stall(stop: asyncio.Event) -> float:
+    max_stall = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        max_stall = max(max_stall, time.perf_counter() - start - 0.001)
+    return max_stall
+
+
+async def benchmark(name: str, executor: Executor, num_pages: int, num_links: int):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        repo_path = Path(temp_dir).joinpath("repo")
+        project = ProjectRepo(
+            project_type=ProjectType.QUARK,
+            name="benchmark",
+            url="https://github.com/supercollider-quarks/benchmark",
+            repo_path=repo_path,
+        )
+        help_files = create_help_files(
+            repo_path=repo_path,
+            doc_path=Path(temp_dir).joinpath("docs"),
+            num_pages=num_pages,
+            num_links=num_links,
+        )
+
+        stop = asyncio.Event()
+        stall_task = asyncio.create_task(measure_loop_stall(stop))
+        start = time.perf_counter()
+        await project.fix_doc_links(help_files, executor=executor)
+        duration = time.perf_counter() - start
+        stop.set()
+        max_stall = await stall_task
+
+    print(
+        f"{name:<14} {duration * 1000:8.1f} ms   "
+        f"longest event loop stall {max_stall * 1000:8.1f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-pages", type=int, default=3000)
+    parser.add_argument("--num-links", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{args.num_pages} help pages with {args.num_links} links each")
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        await benchmark("single thread", executor, args.num_pages, args.num_links)
+    with ProcessPoolExecutor() as executor:
+        await benchmark("process pool", executor, args.num_pages, args.num_links)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
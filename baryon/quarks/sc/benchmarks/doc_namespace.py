@@ -0,0 +1,96 @@
+"""Compares copying and linking a HelpSource tree into the namespace wrapper
+which ``ProjectRepo.build_docs`` creates before rendering the docs.
+The rendering via sclang itself is not part of the benchmark as it is
+the same for both approaches.
+
+Run from the ``baryon`` directory via::
+
+    python -m quarks.sc.benchmarks.doc_namespace
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Set, Tuple
+
+from ..extractor import ProjectRepo
+
+
+def create_help_source_fixture(
+    path: Path, num_help_files: int, num_assets: int, asset_size: int
+):
+    for i in range(num_help_files):
+        help_file = path.joinpath("Classes", f"Class{i}.schelp")
+        help_file.parent.mkdir(parents=True, exist_ok=True)
+        help_file.write_text(f"CLASS:: Class{i}\nsummary:: A class\n" * 20)
+    for i in range(num_assets):
+        asset = path.joinpath("Examples", "sounds", f"sound{i}.wav")
+        asset.parent.mkdir(parents=True, exist_ok=True)
+        asset.write_bytes(os.urandom(asset_size))
+
+
+def disk_usage(path: Path) -> int:
+    # counts each inode once, so hardlinks do not count twice
+    # and symlinks only count with their own size
+    seen_inodes: Set[Tuple[int, int]] = set()
+    total = 0
+    for dir_name, _, file_names in os.walk(path):
+        for file_name in file_names:
+            stat = Path(dir_name).joinpath(file_name).lstat()
+            if (stat.st_dev, stat.st_ino) in seen_inodes:
+                continue
+            seen_inodes.add((stat.st_dev, stat.st_ino))
+            total += stat.st_blocks * 512
+    return total
+
+
+def benchmark(
+    name: str,
+    namespace_func: Callable[[Path, Path], None],
+    help_source_path: Path,
+    repeat: int,
+):
+    durations = []
+    usage = 0
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            target_path = Path(temp_dir).joinpath("namespace")
+            start = time.perf_counter()
+            namespace_func(help_source_path, target_path)
+            durations.append(time.perf_counter() - start)
+            usage = disk_usage(target_path)
+    print(
+        f"{name:<10} best {min(durations) * 1000:8.1f} ms   "
+        f"mean {sum(durations) / len(durations) * 1000:8.1f} ms   "
+        f"temp disk usage {usage / 2**20:8.2f} MiB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--num-help-files", type=int, default=2000)
+    parser.add_argument("--num-assets", type=int, default=200)
+    parser.add_argument("--asset-size", type=int, default=256 * 1024)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        help_source_path = Path(temp_dir).joinpath("HelpSource")
+        create_help_source_fixture(
+            help_source_path,
+            num_help_files=args.num_help_files,
+            num_assets=args.num_assets,
+            asset_size=args.asset_size,
+        )
+        print(
+            f"HelpSource fixture with {args.num_help_files} help files and "
+            f"{args.num_assets} assets ({disk_usage(help_source_path) / 2**20:.2f} MiB)"
+        )
+        benchmark("copytree", shutil.copytree, help_source_path, args.repeat)
+        benchmark("link tree", ProjectRepo._link_tree, help_source_path, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
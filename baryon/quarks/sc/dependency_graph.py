@@ -0,0 +1,75 @@
+import logging
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+from .extractor import ProjectRepo
+
+logger = logging.getLogger(__name__)
+
+
+class DependencyResolver:
+    """Resolves the dependencies declared within quark files to projects.
+
+    A dependency can be declared via the name of a quark, the URL of its
+    repository or both as ``name=url``, optionally pinned to a version via
+    ``@version``. Names get matched case-insensitively and URLs after
+    normalization, so e.g. a ``git@`` and a ``https://`` URL of the same
+    repository match. Free text which matches neither gets dropped instead
+    of guessed.
+    """
+
+    def __init__(self, projects: Dict[Hashable, Tuple[str, str]]) -> None:
+        # projects are given as (name, git_url) by an arbitrary key
+        self._keys_by_name = {name.lower(): key for key, (name, _) in projects.items()}
+        self._keys_by_url = {
+            ProjectRepo.normalize_git_url(git_url): key
+            for key, (_, git_url) in projects.items()
+        }
+
+    @staticmethod
+    def declared_dependencies(quark_info: Dict[str, Any]) -> List[str]:
+        dependencies: List[str] = []
+        for key in ["dependencies", "ext_dependency"]:
+            declared = quark_info.get(key, [])
+            if isinstance(declared, str):
+                # e.g. 3dj has ext_dependency listed as a string
+                declared = declared.split(",")
+            if not isinstance(declared, list):
+                continue
+            dependencies.extend(d.strip() for d in declared if isinstance(d, str))
+        return [d for d in dependencies if d]
+
+    def _resolve_candidate(self, candidate: str) -> Optional[Hashable]:
+        if (key := self._keys_by_name.get(candidate.lower())) is not None:
+            return key
+        if "/" in candidate or ":" in candidate:
+            return self._keys_by_url.get(ProjectRepo.normalize_git_url(candidate))
+        return None
+
+    def resolve(self, dependency: str) -> Optional[Hashable]:
+        """Returns the key of the declared project or None if it is unknown."""
+        for candidate in dependency.split("=", 1):
+            candidate = candidate.strip()
+            # the @ of a version can not be told apart from the @ of the
+            # user within an URL such as git@github.com:foo/bar, so the
+            # candidate gets also resolved without the version
+            head, _, _ = candidate.rpartition("@")
+            for c in [candidate, head]:
+                if c and (key := self._resolve_candidate(c)) is not None:
+                    return key
+        return None
+
+    def resolve_edges(
+        self, quark_infos: Dict[Hashable, Dict[str, Any]]
+    ) -> Set[Tuple[Hashable, Hashable]]:
+        """Returns the (dependent, dependency) pairs of all projects."""
+        edges: Set[Tuple[Hashable, Hashable]] = set()
+        for key, quark_info in quark_infos.items():
+            if not isinstance(quark_info, dict):
+                continue
+            for dependency in self.declared_dependencies(quark_info):
+                dependency_key = self.resolve(dependency)
+                if dependency_key is None:
+                    logger.debug(f"Could not resolve dependency {dependency}")
+                elif dependency_key != key:
+                    edges.add((key, dependency_key))
+        return edges
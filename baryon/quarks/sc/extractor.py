@@ -1,6 +1,8 @@
 import asyncio
+import collections
 import dataclasses
 import enum
+import hashlib
 import json
 import logging
 import os
@@ -8,15 +10,34 @@ import re
 import shutil
 import tempfile
 from asyncio.subprocess import PIPE
+from concurrent.futures import Executor
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Counter,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 
 import chardet
 import pytz
 from lxml import etree
 
+from .git_supervisor import GitError, GitSupervisor
+from .quark_info_cache import QuarkInfoCache
+from .quark_parser import QuarkParseError, parse_quark_file
+
+if TYPE_CHECKING:
+    from .sclang_pool import SclangPool
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,6 +61,29 @@ class CommitInfo:
     tag: Optional[str] = None
 
 
+@dataclasses.dataclass
+class GitMetadata:
+    default_branch: str
+    first_commit: CommitInfo
+    latest_commit: CommitInfo
+    tags: List[CommitInfo]
+
+
+@dataclasses.dataclass
+class RemoteRefs:
+    head: Optional[str]
+    tags: Dict[str, str] = dataclasses.field(default_factory=dict)
+
+    @property
+    def tags_fingerprint(self) -> str:
+        # a stable digest of all tags and their targets - if a tag gets
+        # added, removed or moved the fingerprint changes
+        h = hashlib.sha1()
+        for tag, commit_hash in sorted(self.tags.items()):
+            h.update(f"{commit_hash} {tag}\n".encode())
+        return h.hexdigest()
+
+
 @dataclasses.dataclass
 class SclangClass:
     file_path: Path
@@ -68,12 +112,30 @@ class Readme:
     text: str
 
 
+@dataclasses.dataclass
+class RepoFileIndex:
+    # absolute paths in top-down walk order
+    dirs: List[Path] = dataclasses.field(default_factory=list)
+    files: List[Path] = dataclasses.field(default_factory=list)
+
+    def files_below(self, path: Path) -> List[Path]:
+        return [file_path for file_path in self.files if file_path.is_relative_to(path)]
+
+
 @dataclasses.dataclass
 class HelpFile:
     source_path: Path
     html_path: Optional[Path]
 
 
+@dataclasses.dataclass
+class DocLinkJob:
+    # plain types as this gets send to other processes
+    html_path: str
+    source_url: str
+    source_name: str
+
+
 class ProjectRepo:
     """
 
@@ -95,15 +157,28 @@ class ProjectRepo:
         r"[\t\s]*(?<![A-za-z])(?P<class>[A-Z]+[A-Za-z0-9]*)[\.\(]", re.MULTILINE
     )
 
-    GIT_DEFAULT_BRANCH_EXTRACTOR = re.compile(
-        r"HEAD branch: (?P<default_branch>.+)$", re.MULTILINE
+    # NUL separated as ref names can contain spaces
+    GIT_REF_FORMAT = "%00".join(
+        [
+            "%(refname)",
+            "%(objectname)",
+            "%(committerdate:unix)",
+            "%(*committerdate:unix)",
+            "%(symref)",
+        ]
     )
 
     # attention - hardcoded path!
     SCDOC_TARGET_PATH = Path(__file__).parent.joinpath("../../media/sc_docs").resolve()
 
+    # stores the rendered HTML files and the hashes of their schelp files
+    DOC_MANIFEST_FILE_NAME = ".manifest.json"
+
     HTML_PARSER = etree.HTMLParser()
 
+    # sclang version by sclang path - shared among all instances
+    _sclang_versions: Dict[str, str] = {}
+
     def __init__(
         self,
         project_type: ProjectType,
@@ -115,6 +190,9 @@ class ProjectRepo:
         sclang_path: Optional[Path] = None,
         src_path_patterns: Optional[List[str]] = None,
         download_path: Optional[str] = None,
+        sclang_pool: Optional["SclangPool"] = None,
+        quark_info_cache: Optional[QuarkInfoCache] = None,
+        git_supervisor: Optional[GitSupervisor] = None,
         **kwargs,
     ) -> None:
         self.project_type = project_type
@@ -133,7 +211,25 @@ class ProjectRepo:
         assert self.SCLANG_PATH is not None
 
         self.src_path_patterns = src_path_patterns or [""]
+        self._src_path_regexes = [
+            self._compile_src_path_pattern(pattern)
+            for pattern in self.src_path_patterns
+        ]
         self.download_path = download_path
+        # if set, sclang jobs are executed by the pool instead of a new process,
+        # unless the pool runs a different sclang than sclang_path
+        self.sclang_pool = sclang_pool
+        # if set, quark info extracted via sclang gets cached
+        self.quark_info_cache = quark_info_cache
+        # runs all git calls with timeouts and retries - can be shared
+        self.git_supervisor = git_supervisor or GitSupervisor()
+
+        # refs of the remote repository, see get_remote_refs
+        self.remote_refs: Optional[RemoteRefs] = None
+        # built on first access and reset if the checkout changes
+        self._file_index: Optional[RepoFileIndex] = None
+        # number of spawned subprocesses and sclang pool jobs by command
+        self.subprocess_counts: Counter[str] = collections.Counter()
 
     @classmethod
     async def new_repo(cls, **kwargs):
@@ -141,89 +237,197 @@ class ProjectRepo:
         await project.init_repo()
         return project
 
-    async def git(self, *args, cwd: Optional[Path] = None) -> str:
+    async def git(
+        self,
+        *args,
+        cwd: Optional[Path] = None,
+        before_retry: Optional[Callable[[], None]] = None,
+    ) -> str:
+        """Raises a :class:`GitError` if git fails or times out."""
         cwd = cwd if cwd else self.repo_path
-        git_process = await asyncio.create_subprocess_exec(
-            "git", *args, cwd=cwd, stdout=PIPE, stderr=PIPE
-        )
-        stdout, stderr = await git_process.communicate()
-        # assert git_process.returncode == 0
-        return stdout.decode()
+        self.subprocess_counts["git"] += 1
+        return await self.git_supervisor.run(*args, cwd=cwd, before_retry=before_retry)
 
-    async def get_default_branch(self) -> str:
-        remote_branches = await self.git("remote", "show", "origin")
-        branch_search = self.GIT_DEFAULT_BRANCH_EXTRACTOR.search(remote_branches)
-        if not branch_search:
-            logger.error(
-                f"Could not extract default remote branch from {self} - fall back on local branch"
+    async def get_remote_refs(self) -> RemoteRefs:
+        """Obtains the HEAD and tags of the remote repository via a single
+        ``git ls-remote``, which does not require a local clone.
+        """
+        remote_refs = RemoteRefs(head=None)
+        try:
+            raw_refs = await self.git(
+                "ls-remote", self.url, "HEAD", "refs/tags/*", cwd=Path.cwd()
             )
-            self.default_branch = await self.git("symbolic-ref", "--short", "HEAD")
-        else:
-            self.default_branch = branch_search.group("default_branch")
-        logger.debug(f"Default branch for {self} is {self.default_branch}")
-
-        return self.default_branch
+        except GitError as e:
+            logger.error(f"Could not list remote refs of {self}: {e}")
+            raw_refs = ""
+        for line in raw_refs.split("\n"):
+            if line == "":
+                continue
+            commit_hash, ref = line.split("\t")
+            if ref == "HEAD":
+                remote_refs.head = commit_hash
+            elif ref.startswith("refs/tags/") and not ref.endswith("^{}"):
+                remote_refs.tags[ref.replace("refs/tags/", "")] = commit_hash
+        if remote_refs.head is None:
+            logger.error(f"Could not obtain remote HEAD of {self}")
+        self.remote_refs = remote_refs
+        return remote_refs
+
+    async def get_git_metadata(self) -> GitMetadata:
+        """Extracts tags, first and latest commit as well as the default branch
+        of the local repository with a fixed number of git calls, independent of
+        the number of tags.
+        """
+        raw_refs, raw_first_commits, raw_latest_commit = await asyncio.gather(
+            self.git(
+                "for-each-ref",
+                f"--format={self.GIT_REF_FORMAT}",
+                "refs/tags",
+                "refs/remotes/origin/HEAD",
+            ),
+            # a repo can have multiple root commits - log lists the oldest last
+            self.git("--no-pager", "log", "--max-parents=0", "--format=%H %ct"),
+            self.git("--no-pager", "log", "-n", "1", "--format=%H %ct"),
+        )
 
-    async def get_git_tags(self) -> List[CommitInfo]:
-        raw_tag_info = await self.git("show-ref", "--tags")
-        git_tags: List[CommitInfo] = []
-        for git_tag_info in raw_tag_info.split("\n"):
-            if git_tag_info == "":
+        default_branch: Optional[str] = None
+        tags: List[CommitInfo] = []
+        for raw_ref in raw_refs.split("\n"):
+            if raw_ref == "":
                 continue
-            commit_hash, tag = git_tag_info.split(" ")
-            commit_info = await self.extract_commit_info(commit_hash)
-            commit_info.tag = tag.replace("refs/tags/", "")
-            git_tags.append(commit_info)
-        return git_tags
-
-    async def get_current_commit(self) -> CommitInfo:
-        current_commit = (
-            await self.git(
-                "--no-pager",
-                "log",
-                "--format=%H",
-                "-n",
-                "1",
+            ref, object_hash, commit_date, peeled_commit_date, symref = raw_ref.split(
+                "\0"
             )
-        ).strip()
-        return await self.extract_commit_info(current_commit)
-
-    async def get_first_commit(self) -> CommitInfo:
-        first_commit_hash = (
-            (
-                await self.git(
-                    "--no-pager",
-                    "log",
-                    "--format=%H",
+            if ref == "refs/remotes/origin/HEAD":
+                default_branch = symref.replace("refs/remotes/origin/", "")
+                continue
+            # annotated tags need to be peeled to obtain the date of the commit
+            tag_date = peeled_commit_date or commit_date
+            if tag_date == "":
+                # tag does not point to a commit
+                continue
+            tags.append(
+                CommitInfo(
+                    hash=object_hash,
+                    date=datetime.fromtimestamp(float(tag_date), tz=pytz.utc),
+                    tag=ref.replace("refs/tags/", ""),
                 )
             )
-            .strip()
-            .split("\n")[-1]
-        )
-        return await self.extract_commit_info(first_commit_hash)
-
-    async def extract_commit_info(self, commit_hash: str) -> CommitInfo:
-        # only time for now - show does not offer nice formatting
-        raw_commit_epoch = await self.git(
-            "--no-pager",
-            "log",
-            "--decorate=short",
-            "--format=%ct",
-            "-n",
-            "1",
-            commit_hash,
+
+        if not default_branch:
+            logger.error(
+                f"Could not extract default remote branch from {self} - fall back on local branch"
+            )
+            default_branch = (await self.git("symbolic-ref", "--short", "HEAD")).strip()
+        # pay attention - this is stateful, see __init__
+        self.default_branch = default_branch
+        logger.debug(f"Default branch for {self} is {self.default_branch}")
+
+        return GitMetadata(
+            default_branch=default_branch,
+            first_commit=self._parse_commit_line(
+                raw_first_commits.strip().split("\n")[-1]
+            ),
+            latest_commit=self._parse_commit_line(raw_latest_commit.strip()),
+            tags=tags,
         )
+
+    @staticmethod
+    def _parse_commit_line(line: str) -> CommitInfo:
+        # parses a line of the format "%H %ct"
+        commit_hash, commit_epoch = line.split(" ")
         return CommitInfo(
             hash=commit_hash,
-            date=datetime.fromtimestamp(
-                float(raw_commit_epoch),
-                tz=pytz.utc,
-            ),
+            date=datetime.fromtimestamp(float(commit_epoch), tz=pytz.utc),
         )
 
     async def update_repo(self):
-        logger.debug(f"Pull repository {self}")
-        await self.git("pull")
+        """Updates the checkout to the remote HEAD.
+
+        Instead of a merging ``pull`` only the remote HEAD and the tags get
+        fetched, so diverged or force-pushed histories do not matter and no
+        other branches end up in the cache. Deleted tags get pruned.
+        """
+        logger.debug(f"Update repository {self}")
+        # an explicit tag refspec as tags fetched via --tags are never pruned
+        await self.git(
+            "fetch", "--force", "--prune", "origin", "HEAD", "+refs/tags/*:refs/tags/*"
+        )
+        # fetches the missing blobs of the new checkout
+        await self.git(
+            "reset", "--hard", "FETCH_HEAD", before_retry=self._remove_index_lock
+        )
+        self._file_index = None
+
+    @staticmethod
+    def _compile_src_path_pattern(pattern: str) -> re.Pattern:
+        # translates a glob pattern such as "source/**/sc" into a regex
+        # which matches the dir itself and everything below it
+        regex = ""
+        for part in re.split(r"(\*\*/|\*\*|\*|\?)", pattern.strip("/")):
+            match part:
+                case "**/":
+                    regex += "(.*/)?"
+                case "**":
+                    regex += ".*"
+                case "*":
+                    regex += "[^/]*"
+                case "?":
+                    regex += "[^/]"
+                case _:
+                    regex += re.escape(part)
+        if regex == "":
+            return re.compile("")
+        return re.compile(f"{regex}(/|$)")
+
+    @staticmethod
+    def _walk(
+        path: Path, root: Optional[Path] = None
+    ) -> Iterator[Tuple[Path, List[str], List[str]]]:
+        """Walks ``path`` top-down like :func:`os.walk`, but also follows
+        symlinked dirs, like sclang does.
+        A link to one of its parents or to a dir outside of ``root`` (by
+        default ``path``) gets skipped, so the walk always terminates and does
+        not leave the repo.
+        """
+        real_root = Path(os.path.realpath(root or path))
+        # the real paths of each dir and of its parents, by dir
+        real_paths: Dict[str, Set[str]] = {str(path): {os.path.realpath(path)}}
+        for folder, dir_names, file_names in os.walk(path, followlinks=True):
+            parent_real_paths = real_paths.pop(folder)
+            for dir_name in list(dir_names):
+                dir_path = os.path.join(folder, dir_name)
+                real_path = os.path.realpath(dir_path)
+                if real_path in parent_real_paths or not Path(real_path).is_relative_to(
+                    real_root
+                ):
+                    logger.debug(f"Skip link {dir_path} to {real_path}")
+                    dir_names.remove(dir_name)
+                    continue
+                real_paths[dir_path] = parent_real_paths | {real_path}
+            yield Path(folder), dir_names, file_names
+
+    def get_file_index(self) -> RepoFileIndex:
+        """Walks the repo once and caches all dirs and files, so the discovery
+        of the readme, the docs and the classes does not need to traverse
+        the filesystem again. Hidden dirs such as ``.git`` are skipped.
+        """
+        if self._file_index is not None:
+            return self._file_index
+        file_index = RepoFileIndex()
+        for folder, dir_names, file_names in self._walk(self.repo_path):
+            # modifying dir_names in place prunes the walk
+            dir_names[:] = sorted(
+                dir_name for dir_name in dir_names if not dir_name.startswith(".")
+            )
+            file_index.dirs.extend(folder.joinpath(d) for d in dir_names)
+            file_index.files.extend(folder.joinpath(f) for f in sorted(file_names))
+        self._file_index = file_index
+        return file_index
+
+    def is_src_path(self, path: Path) -> bool:
+        relative_path = path.relative_to(self.repo_path).as_posix()
+        return any(regex.match(relative_path) for regex in self._src_path_regexes)
 
     @staticmethod
     def _get_file_contents(file_path: Path) -> str:
@@ -244,6 +448,8 @@ class ProjectRepo:
 
     def get_readme(self) -> Optional[Readme]:
         readme_candidates: List[ReadmeCandidate] = []
+        # the file names are compared in lower case as glob is case sensitive
+        file_index = self.get_file_index()
         # list is used as a priority search
         for ext in [
             ReadmeFormatting.MARKDOWN,
@@ -251,20 +457,13 @@ class ProjectRepo:
             ReadmeFormatting.RAW,
             ReadmeFormatting.TXT,
         ]:
-            # glob is case sensitive (future self: python 3.12 fixes this)
-            # therefore we use walk (Path.walk is also introduced in 3.12)
-            # @todo skip hidden files/folders such as .git
-            for folder, _, file_names in os.walk(self.repo_path):
-                for file_name in file_names:
-                    if file_name.lower() == f"readme{ext.value.lower()}":
-                        readme_candidates.append(
-                            ReadmeCandidate(
-                                file_path=Path(folder).joinpath(file_name),
-                                formatting=ext,
-                            )
-                        )
-                        # stop on first occasion of a readme candidate
-                        break
+            for file_path in file_index.files:
+                if file_path.name.lower() == f"readme{ext.value.lower()}":
+                    readme_candidates.append(
+                        ReadmeCandidate(file_path=file_path, formatting=ext)
+                    )
+                    # stop on first occasion of a readme candidate
+                    break
 
         if len(readme_candidates) == 0:
             logger.info(f"Could not find a README file for {self}")
@@ -281,8 +480,21 @@ class ProjectRepo:
             logger.error(f"Failed to fetch README for {self}: {e}")
             return None
 
-    async def _sclang(self, *args: str, env: Optional[Dict[str, str]] = None) -> str:
-        cmd = f"{self.SCLANG_PATH} -i foo {' '.join(args)}"
+    async def _sclang(
+        self, script_path: Path, env: Optional[Dict[str, str]] = None
+    ) -> str:
+        # the interpreters of the pool only serve repos which use the same
+        # sclang, a repo with its own sclang_path gets its own process
+        if (
+            self.sclang_pool is not None
+            and str(self.SCLANG_PATH) == self.sclang_pool.sclang_path
+        ):
+            self.subprocess_counts["sclang job"] += 1
+            return await self.sclang_pool.run(script_path, env=env or {})
+
+        self.subprocess_counts["sclang"] += 1
+
+        cmd = f"{self.SCLANG_PATH} -i foo {script_path}"
         # print(f"sc cmd is {cmd} with env {env}")
         if env:
             env = {
@@ -313,7 +525,26 @@ class ProjectRepo:
         # assert git_process.returncode == 0
         return stdout.decode()
 
+    async def get_sclang_version(self) -> str:
+        sclang_path = str(self.SCLANG_PATH)
+        if sclang_path not in self._sclang_versions:
+            try:
+                sclang_process = await asyncio.create_subprocess_exec(
+                    sclang_path, "-v", stdout=PIPE, stderr=PIPE
+                )
+                stdout, _ = await asyncio.wait_for(
+                    sclang_process.communicate(), timeout=30
+                )
+            except (OSError, asyncio.TimeoutError) as e:
+                raise SclangError(f"Could not obtain sclang version: {e!r}")
+            self._sclang_versions[sclang_path] = stdout.decode().strip()
+        return self._sclang_versions[sclang_path]
+
     async def extract_quark_info(self) -> Dict[str, Any]:
+        """Returns the content of the quark file, which gets evaluated by
+        sclang if it is not a plain literal. Raises a SclangError if sclang
+        fails, so the quark info of the last scrape can be kept.
+        """
         quark_file_paths = list(self.repo_path.glob("*.quark"))
         if len(quark_file_paths) == 0:
             # @todo raise exception
@@ -321,22 +552,36 @@ class ProjectRepo:
             return {}
         quark_file_path = quark_file_paths[0]
 
+        # most quark files are plain literals which can be parsed without sclang
+        try:
+            return parse_quark_file(self._get_file_contents(quark_file_path))
+        except QuarkParseError as e:
+            logger.debug(f"Fall back on sclang to parse {quark_file_path}: {e}")
+
+        cache_key: Optional[str] = None
+        if self.quark_info_cache is not None:
+            cache_key = self.quark_info_cache.build_key(
+                content=quark_file_path.read_bytes(),
+                sclang_version=await self.get_sclang_version(),
+            )
+            if (quark_info := self.quark_info_cache.get(cache_key)) is not None:
+                return quark_info
+
         with tempfile.NamedTemporaryFile(
             "r", suffix=f"_sc_quark_{self.name}.json"
         ) as f:
-            try:
-                quark_info_cmd = await self._sclang(
-                    str(Path(__file__).parent.joinpath("quarkToJson.scd").resolve()),
-                    env={
-                        "QUARK_FILE": str(quark_file_path.absolute()),
-                        "QUARK_JSON_FILE": f.name,
-                    },
-                )
-            except SclangError as e:
-                logger.error(f"Could not extract quark info via sclang: {e}")
-                return {}
+            quark_info_cmd = await self._sclang(
+                Path(__file__).parent.joinpath("quarkToJson.scd").resolve(),
+                env={
+                    "QUARK_FILE": str(quark_file_path.absolute()),
+                    "QUARK_JSON_FILE": f.name,
+                },
+            )
             j = json.load(f)
 
+        if self.quark_info_cache is not None and cache_key is not None:
+            self.quark_info_cache.set(cache_key, j)
+
         return j
 
     def find_doc_paths(self, include_main_path_as_fallback: bool = True) -> List[Path]:
@@ -348,94 +593,194 @@ class ProjectRepo:
 
             search for folders containing `.schelp` files
         """
-        help_source_paths: List[Path] = []
-        for folder, dir_names, _ in os.walk(self.repo_path):
-            for dir_name in dir_names:
-                if dir_name.lower() == "helpsource":
-                    help_source_paths.append(Path(folder).joinpath(dir_name))
+        help_source_paths: List[Path] = [
+            dir_path
+            for dir_path in self.get_file_index().dirs
+            if dir_path.name.lower() == "helpsource"
+        ]
 
         if include_main_path_as_fallback and len(help_source_paths) == 0:
             help_source_paths.append(self.repo_path)
 
         return help_source_paths
 
-    async def build_docs(self, help_source_path: Path) -> List[HelpFile]:
-        # in order to create a namespace for the docs (so classes with the same name do not clash)
-        # it is necessary to create a directory which wraps the schelp files
-        # in order to be more stateless this is a temp dir which deletes after the execution
-        #
-        # another approach was to modify the "ScDocEntry.destPath" within sclang
-        # but this is a read-only attribute
-        with tempfile.TemporaryDirectory(f"baryon_{self.name}") as temp_dir:
-            temp_path = Path(temp_dir)
-            shutil.copytree(help_source_path, temp_path.joinpath(self.name))
-            try:
+    def _load_doc_manifest(self) -> Dict[str, Dict[str, str]]:
+        try:
+            with self.SCDOC_TARGET_PATH.joinpath(
+                self.name, self.DOC_MANIFEST_FILE_NAME
+            ).open("r") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _write_doc_manifest(self, manifest: Dict[str, Dict[str, str]]):
+        doc_name_space_dir = self.SCDOC_TARGET_PATH.joinpath(self.name)
+        doc_name_space_dir.mkdir(parents=True, exist_ok=True)
+        with doc_name_space_dir.joinpath(self.DOC_MANIFEST_FILE_NAME).open("w") as f:
+            json.dump(manifest, f, indent=2)
+
+    @staticmethod
+    def _hash_file(file_path: Path) -> str:
+        return hashlib.sha256(file_path.read_bytes()).hexdigest()
+
+    @classmethod
+    def _link_tree(
+        cls, source_path: Path, target_path: Path, root: Optional[Path] = None
+    ):
+        """Mirrors the directory structure of ``source_path`` within ``target_path``
+        but links the files instead of copying them, as sclang only reads them.
+        Uses symlinks and falls back to hardlinks and finally a copy
+        if the filesystem does not support links.
+        Symlinked dirs get mirrored as well, see :meth:`_walk` for ``root``.
+        Existing files within ``target_path`` get replaced.
+        """
+        for dir_path, _, file_names in cls._walk(source_path, root=root):
+            target_dir = target_path.joinpath(dir_path.relative_to(source_path))
+            target_dir.mkdir(parents=True, exist_ok=True)
+            for file_name in file_names:
+                source_file = dir_path.joinpath(file_name).absolute()
+                target_file = target_dir.joinpath(file_name)
+                target_file.unlink(missing_ok=True)
+                try:
+                    target_file.symlink_to(source_file)
+                except OSError:
+                    try:
+                        os.link(source_file, target_file)
+                    except OSError:
+                        shutil.copy2(source_file, target_file)
+
+    async def build_docs(self, help_source_paths: List[Path]) -> List[HelpFile]:
+        """Renders the schelp files of all HelpSource directories of the repo
+        within a single sclang invocation.
+
+        The rendered HTML files and the hashes of their schelp files are stored
+        within a manifest in the namespace dir of the docs, so only new or changed
+        files need to be rendered by sclang.
+        HTML files of deleted schelp files get removed.
+        Raises a :class:`SclangError` if sclang fails, in which case the
+        manifest of the previous build is kept.
+        """
+        doc_name_space_dir = self.SCDOC_TARGET_PATH.joinpath(self.name)
+
+        # maps the HTML file (relative to the namespace dir) to its source -
+        # if multiple HelpSource dirs contain the same file the last one wins
+        source_files: Dict[str, Path] = {}
+        for help_source_path in help_source_paths:
+            for source_path in self.get_file_index().files_below(help_source_path):
+                if source_path.suffix != ".schelp":
+                    continue
+                relative_html_path = source_path.relative_to(
+                    help_source_path
+                ).with_suffix(".html")
+                source_files[str(relative_html_path)] = source_path
+
+        source_entries: Dict[str, Dict[str, str]] = {
+            html_file: {
+                "source": str(source_path.relative_to(self.repo_path)),
+                "hash": self._hash_file(source_path),
+            }
+            for html_file, source_path in source_files.items()
+        }
+
+        manifest = self._load_doc_manifest()
+        for deleted_html_file in manifest.keys() - source_entries.keys():
+            logger.debug(f"Remove docs of deleted {deleted_html_file} of {self}")
+            if doc_name_space_dir.joinpath(deleted_html_file).is_file():
+                doc_name_space_dir.joinpath(deleted_html_file).unlink()
+            manifest.pop(deleted_html_file)
+
+        changed_html_files = [
+            html_file
+            for html_file, source_entry in source_entries.items()
+            if manifest.get(html_file) != source_entry
+            or not doc_name_space_dir.joinpath(html_file).is_file()
+        ]
+        logger.debug(
+            f"{len(changed_html_files)} of {len(source_entries)} help files of {self} need to be rendered"
+        )
+
+        if changed_html_files:
+            # in order to create a namespace for the docs (so classes with the same name do not clash)
+            # it is necessary to create a directory which wraps the schelp files
+            # in order to be more stateless this is a temp dir which deletes after the execution
+            #
+            # another approach was to modify the "ScDocEntry.destPath" within sclang
+            # but this is a read-only attribute
+            with tempfile.TemporaryDirectory(f"baryon_{self.name}") as temp_dir:
+                temp_path = Path(temp_dir)
+                # all HelpSource dirs share the namespace, so they get merged
+                # and can be rendered in one go
+                for help_source_path in help_source_paths:
+                    self._link_tree(
+                        help_source_path,
+                        temp_path.joinpath(self.name),
+                        root=self.repo_path,
+                    )
                 quark_info_cmd = await self._sclang(
-                    str(Path(__file__).parent.joinpath("buildDocs.scd").resolve()),
+                    Path(__file__).parent.joinpath("buildDocs.scd").resolve(),
                     env={
                         # parent to create an additional layer for the namespace :)
                         "QUARK_HELP_SOURCE_PATH": str(temp_path),
-                        # "QUARK_HELP_SOURCE_FILES": ",".join([str(x.relative_to(namespace_help_source_path.parent)) for x in help_file_paths]),
+                        # relative to the source path, therefore including the namespace
+                        "QUARK_HELP_SOURCE_FILES": "\n".join(
+                            f"{self.name}/{Path(html_file).with_suffix('.schelp')}"
+                            for html_file in changed_html_files
+                        ),
                         "QUARK_HELP_TARGET_PATH": str(
                             self.SCDOC_TARGET_PATH.absolute()
                         ),
                     },
                 )
-            except SclangError as e:
-                logger.error(f"Sclang error on building docs for {self.name}: {e}")
-                return []
 
-            logger.debug(f"Doc build log for {self}: {quark_info_cmd}")
-
-        help_files: List[HelpFile] = []
-        doc_name_space_dir = self.SCDOC_TARGET_PATH.joinpath(self.name)
-        for dir_name, _, filenames in os.walk(doc_name_space_dir):
-            for filename in filenames:
-                # only index html files
-                if not filename.endswith(".html"):
-                    continue
-
-                html_file = Path(dir_name).joinpath(filename)
-                assert html_file.is_file()  # sanity check
-
-                # removes namespace wrapper dir
-                relative_path = html_file.relative_to(doc_name_space_dir)
-                source_file_path = help_source_path.joinpath(
-                    Path(str(relative_path).replace(".html", ".schelp"))
-                )
+                logger.debug(f"Doc build log for {self}: {quark_info_cmd}")
 
-                # because there can be multiple HelpSource dirs within one repo
-                # we need to build it multiple times - in this case we may
-                # observe HTML files from a previous build which do not match
-                # a schelp file, therefore we just skip those examples
-                if not source_file_path.is_file():
-                    continue
+            for html_file in changed_html_files:
+                if doc_name_space_dir.joinpath(html_file).is_file():
+                    manifest[html_file] = source_entries[html_file]
+                else:
+                    logger.error(f"Could not render {source_files[html_file]}")
+                    manifest.pop(html_file, None)
 
-                help_files.append(
-                    HelpFile(source_path=source_file_path, html_path=html_file)
-                )
+        self._write_doc_manifest(manifest)
 
-        return help_files
+        return [
+            HelpFile(
+                source_path=source_files[html_file],
+                html_path=doc_name_space_dir.joinpath(html_file),
+            )
+            for html_file in manifest.keys()
+        ]
 
     @staticmethod
     def _get_relative_path_str(path: Path, relative_to: Path) -> str:
-        # this is necessary b/c path.relative_to() can't go up directories
-        # so it is necessary to iterate over paths manually
-        try:
-            return f"./{path.relative_to(relative_to)}"
-        except ValueError:
-            pass
-        num_iters = 0
-        relative_path = "../"
-        while num_iters < 4:
-            try:
-                relative_to = relative_to.joinpath("..").resolve()
-                return f"{relative_path}{path.relative_to(relative_to)}"
-            except ValueError:
-                # go up one level
-                relative_path = f"{relative_path}../"
-                num_iters += 1
-        raise Exception()
+        # this is necessary b/c path.relative_to() can't go up directories -
+        # os.path.relpath does not touch the filesystem, which matters as
+        # this gets called for every link of every help file
+        relative_path = os.path.relpath(path, relative_to)
+        num_levels_up = relative_path.split(os.sep).count("..")
+        if num_levels_up == 0:
+            return f"./{relative_path}"
+        # do not link too far up
+        if num_levels_up > 4:
+            raise Exception()
+        return relative_path
+
+    @staticmethod
+    def normalize_git_url(url: str) -> str:
+        """Reduces the different URLs of a repository, e.g.
+        ``git@github.com:Foo/bar.git`` and ``https://github.com/foo/bar/``,
+        to a common form such as ``github.com/foo/bar``.
+        """
+        url = url.strip().lower()
+        # scheme and user info
+        url = re.sub(r"^[a-z+]+://", "", url)
+        url = re.sub(r"^[^@/]+@", "", url)
+        # scp-like syntax, e.g. github.com:foo/bar
+        url = re.sub(r"^([^/:]+):(?!\d+/)", r"\1/", url)
+        url = url.rstrip("/")
+        if url.endswith(".git"):
+            url = url[: -len(".git")]
+        return url
 
     @staticmethod
     def build_repo_url_for_file(
@@ -454,11 +799,12 @@ class ProjectRepo:
         # github instances
         return f"{base_url}/-/blob/{default_branch}/{relative_file_path}"
 
-    def fix_doc_links(
+    async def fix_doc_links(
         self,
         help_files: List[HelpFile],
         online_help_url: str = "https://docs.supercollider.online",
         relative_path: str = "./../..",
+        executor: Optional[Executor] = None,
     ):
         """
         All relative links within the help file should either link to other help files within the quark or
@@ -466,97 +812,139 @@ class ProjectRepo:
 
         The relative links start with "./../..".
 
+        As parsing and writing the HTML files is blocking, the files get processed
+        in chunks by the given executor (e.g. a process pool), or the default
+        executor of the event loop.
+
         .. todo::
 
             Links to help file of other quarks are not supported for now.
         """
         # assumption: help files are only identified via their html file name within one quark
         # the href misses the .html extension, therefore it is disregarded here as well
+        help_index: Dict[str, str] = {}
+        doc_link_jobs: List[DocLinkJob] = []
         for help_file in help_files:
             if not help_file.html_path:
                 continue
-            with help_file.html_path.open("rb") as f:
-                tree: etree._ElementTree = etree.parse(
-                    source=f, parser=self.HTML_PARSER
-                )
-
-                tag: etree._Element
-                for tag in tree.xpath(
-                    '//*[starts-with(@href, "./../../") or starts-with(@src, "./../../")]'
-                ):
-                    match tag.tag:
-                        # link -> stylesheet - use from online docs
-                        case "link":
-                            tag.attrib["href"] = tag.attrib.get("href", "").replace(
-                                relative_path, online_help_url
-                            )
-                        # script -> js scripts - use from online docs
-                        case "script":
-                            tag.attrib["src"] = tag.attrib.get("src", "").replace(
-                                relative_path, online_help_url
-                            )
-                        # a needs distinction
-                        case "a":
-                            # href target misses extensions .html
-                            url: str = tag.attrib.get("href", "")
-                            for quark_help_file in help_files:
-                                if not quark_help_file.html_path:
-                                    continue
-                                # help files are linked without .html
-                                help_name = (
-                                    str(quark_help_file.html_path.absolute())
-                                    .split("/")[-1]
-                                    .replace(".html", "")
-                                )
-                                if url.endswith(help_name):
-                                    relative_url = self._get_relative_path_str(
-                                        path=quark_help_file.html_path,
-                                        relative_to=help_file.html_path.parent,
-                                    )
-                                    logger.debug(
-                                        f"Rewrite link {url} to {relative_url} for {help_file.html_path}"
-                                    )
-                                    url = relative_url
-                            else:
-                                url = url.replace(relative_path, online_help_url)
-                            tag.attrib["href"] = url
-
-                # replace link to schelp file
-                # @todo this does not work as intended
-                for tag in tree.xpath('//div[@class="doclink"]/a'):
-                    tag.attrib["href"] = self.build_repo_url_for_file(
+            help_index[help_file.html_path.stem] = str(help_file.html_path.absolute())
+            relative_source_path = help_file.source_path.relative_to(self.repo_path)
+            doc_link_jobs.append(
+                DocLinkJob(
+                    html_path=str(help_file.html_path),
+                    source_url=self.build_repo_url_for_file(
                         git_url=self.url,
-                        relative_file_path=help_file.source_path.relative_to(
-                            self.repo_path
-                        ),
+                        relative_file_path=relative_source_path,
                         default_branch=self.default_branch,
-                    )
-                    tag.text = str(help_file.source_path.relative_to(self.repo_path))  # type: ignore
+                    ),
+                    source_name=str(relative_source_path),
+                )
+            )
 
-            # reopen as write only b/c of  lxml
-            with help_file.html_path.open("wb") as f:
+        if len(doc_link_jobs) == 0:
+            return
+
+        loop = asyncio.get_running_loop()
+        chunk_size = max(1, len(doc_link_jobs) // ((os.cpu_count() or 1) * 4))
+        await asyncio.gather(
+            *[
+                loop.run_in_executor(
+                    executor,
+                    self._fix_doc_links_of_files,
+                    doc_link_jobs[i : i + chunk_size],
+                    help_index,
+                    online_help_url,
+                    relative_path,
+                )
+                for i in range(0, len(doc_link_jobs), chunk_size)
+            ]
+        )
+
+    @classmethod
+    def _fix_doc_links_of_files(
+        cls,
+        doc_link_jobs: List[DocLinkJob],
+        help_index: Dict[str, str],
+        online_help_url: str,
+        relative_path: str,
+    ):
+        # this runs within an executor, so it must not depend on the state of an instance
+        # relative URLs only depend on the dir of the page and the help name
+        relative_urls: Dict[Tuple[Path, str], str] = {}
+        for doc_link_job in doc_link_jobs:
+            html_path = Path(doc_link_job.html_path)
+            with html_path.open("rb") as f:
+                tree: etree._ElementTree = etree.parse(source=f, parser=cls.HTML_PARSER)
+
+            tag: etree._Element
+            # links which were redirected to the online help by a previous
+            # build are included as they may now point to a new help file
+            for tag in tree.xpath(
+                '//*[starts-with(@href, "./../../") or starts-with(@src, "./../../")]'
+                ' | //a[starts-with(@href, concat($online_help_url, "/"))]',
+                online_help_url=online_help_url,
+            ):
+                match tag.tag:
+                    # link -> stylesheet - use from online docs
+                    case "link":
+                        tag.attrib["href"] = tag.attrib.get("href", "").replace(
+                            relative_path, online_help_url
+                        )
+                    # script -> js scripts - use from online docs
+                    case "script":
+                        tag.attrib["src"] = tag.attrib.get("src", "").replace(
+                            relative_path, online_help_url
+                        )
+                    # a needs distinction
+                    case "a":
+                        # href target misses extensions .html
+                        url: str = tag.attrib.get("href", "")
+                        help_name, separator, anchor = url.split("/")[-1].partition("#")
+                        if help_name in help_index:
+                            if (html_path.parent, help_name) not in relative_urls:
+                                relative_urls[
+                                    (html_path.parent, help_name)
+                                ] = cls._get_relative_path_str(
+                                    path=Path(help_index[help_name]),
+                                    relative_to=html_path.parent,
+                                )
+                            relative_url = relative_urls[(html_path.parent, help_name)]
+                            logger.debug(
+                                f"Rewrite link {url} to {relative_url} for {html_path}"
+                            )
+                            url = f"{relative_url}{separator}{anchor}"
+                        else:
+                            url = url.replace(relative_path, online_help_url)
+                        tag.attrib["href"] = url
+
+            # replace link to schelp file
+            # @todo this does not work as intended
+            for tag in tree.xpath('//div[@class="doclink"]/a'):
+                tag.attrib["href"] = doc_link_job.source_url
+                tag.text = doc_link_job.source_name  # type: ignore
+
+            with html_path.open("wb") as f:
                 tree.write(f, method="html")  # type: ignore
 
     def get_classes(self) -> List[SclangClass]:
         sclang_classes: List[SclangClass] = []
 
-        sc_files: List[Path] = []
-        for pattern in ["**/*.sc", "*.sc"]:
-            sc_files.extend(self.repo_path.glob(pattern))
+        sc_files: List[Path] = [
+            file_path
+            for file_path in self.get_file_index().files
+            if file_path.suffix == ".sc" and self.is_src_path(file_path)
+        ]
 
         if len(sc_files) == 0:
             logger.error(f"{self} does not contain any sc files!")
 
         for sc_file in sc_files:
-            text: str
-            sc_file_path = self.repo_path.joinpath(sc_file)
-
-            text = self._get_file_contents(sc_file_path)
+            text = self._get_file_contents(sc_file)
             for match in self.SCLANG_CLASS_DECLARATION_REGEX.finditer(text):
                 match_dict = match.groupdict()
                 sclang_classes.append(
                     SclangClass(
-                        file_path=sc_file_path,
+                        file_path=sc_file,
                         name=match_dict["name"],
                         super_class=match_dict.get("super", None),
                         is_extension=match_dict.get("extension", "") != "",
@@ -566,15 +954,43 @@ class ProjectRepo:
         return sclang_classes
 
     async def init_repo(self):
+        """Clones the repo if necessary.
+
+        A partial clone only contains the blobs of the checkout - the blobs of
+        older commits are not needed as only the metadata of the history
+        (commits and tags) gets analyzed. Only the default branch gets cloned,
+        tags of other branches are obtained by :meth:`update_repo`.
+        """
         # @todo split this into two classes? Pre-Cloned and Post-Cloned?
         # this would result in more code but in better type checking
         if not self.repo_path.exists():
             logger.debug(
                 f"Found new repo - clone repository {self} to {self.repo_path}"
             )
-            await self.git("clone", self.url, str(self.repo_path), cwd=Path.cwd())
+            try:
+                await self.git(
+                    "clone",
+                    "--filter=blob:none",
+                    "--single-branch",
+                    self.url,
+                    str(self.repo_path),
+                    cwd=Path.cwd(),
+                    # a killed clone leaves a partial checkout behind
+                    before_retry=self._remove_repo,
+                )
+            except GitError as e:
+                self._remove_repo()
+                raise RepoUnavailable() from e
+            self._file_index = None
         if not self.repo_path.exists():
             raise RepoUnavailable()
 
+    def _remove_repo(self):
+        shutil.rmtree(self.repo_path, ignore_errors=True)
+
+    def _remove_index_lock(self):
+        # a killed reset leaves the lock of the index behind
+        self.repo_path.joinpath(".git", "index.lock").unlink(missing_ok=True)
+
     def __str__(self) -> str:
         return f"{self.name} ({self.url})"
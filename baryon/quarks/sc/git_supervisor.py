@@ -0,0 +1,198 @@
+import asyncio
+import collections
+import dataclasses
+import itertools
+import logging
+import os
+import signal
+import time
+from asyncio.subprocess import PIPE
+from pathlib import Path
+from typing import Callable, Counter, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class GitCall:
+    args: Tuple[str, ...]
+    cwd: Path
+    # monotonic time
+    started: float = dataclasses.field(default_factory=time.monotonic)
+
+    @property
+    def command(self) -> str:
+        # the subcommand, skipping global options such as -c or --no-pager
+        args = iter(self.args)
+        for arg in args:
+            if arg in ["-c", "-C"]:
+                next(args, None)
+            elif not arg.startswith("-"):
+                return arg
+        return ""
+
+    @property
+    def duration(self) -> float:
+        return time.monotonic() - self.started
+
+    def __str__(self) -> str:
+        return f"git {' '.join(self.args)} (in {self.cwd})"
+
+
+class GitError(Exception):
+    def __init__(
+        self, call: GitCall, message: str, returncode: Optional[int] = None
+    ) -> None:
+        super().__init__(f"{call} failed: {message}")
+        self.call = call
+        self.returncode = returncode
+
+
+class GitTimeout(GitError):
+    pass
+
+
+class GitSupervisor:
+    """Runs git subprocesses with a timeout per command and retries the
+    network commands with an exponential backoff.
+
+    Git never prompts for credentials, so a deleted or private repository
+    fails instead of blocking. Each git process runs within its own process
+    group, so on a timeout the helpers of git (ssh, git-remote-https) get
+    killed as well and can not keep the pipes open.
+    Calls which run longer than ``stall_threshold`` get reported by
+    :meth:`watch`.
+    """
+
+    # in seconds, by git command
+    TIMEOUTS = {
+        "clone": 600.0,
+        "fetch": 300.0,
+        "ls-remote": 60.0,
+        # within a partial clone these fetch the missing blobs of the checkout
+        "reset": 300.0,
+        "checkout": 300.0,
+    }
+    DEFAULT_TIMEOUT = 60.0
+
+    # only commands which can fail due to the network get retried
+    RETRIED_COMMANDS = {"clone", "fetch", "ls-remote", "reset", "checkout"}
+
+    ENV = {
+        "GIT_TERMINAL_PROMPT": "0",
+        "GIT_SSH_COMMAND": "ssh -o BatchMode=yes",
+        "GCM_INTERACTIVE": "never",
+    }
+
+    def __init__(
+        self,
+        timeouts: Optional[Dict[str, float]] = None,
+        max_retries: int = 2,
+        backoff: float = 5.0,
+        stall_threshold: float = 120.0,
+    ) -> None:
+        self.timeouts = {**self.TIMEOUTS, **(timeouts or {})}
+        self.max_retries = max_retries
+        # delay before the first retry in seconds, doubled on each retry
+        self.backoff = backoff
+        self.stall_threshold = stall_threshold
+        self.env = {**os.environ, **self.ENV}
+        # number of timeouts, retries, failures and stalls
+        self.counts: Counter[str] = collections.Counter()
+
+        self._call_ids = itertools.count()
+        self._running: Dict[int, GitCall] = {}
+        self._reported_stalls: Set[int] = set()
+
+    def timeout(self, call: GitCall) -> float:
+        return self.timeouts.get(call.command, self.DEFAULT_TIMEOUT)
+
+    @staticmethod
+    def _kill(process: asyncio.subprocess.Process):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    async def _run_once(self, call: GitCall, timeout: float) -> str:
+        process = await asyncio.create_subprocess_exec(
+            "git",
+            *call.args,
+            cwd=call.cwd,
+            stdout=PIPE,
+            stderr=PIPE,
+            env=self.env,
+            start_new_session=True,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            self._kill(process)
+            await process.wait()
+            self.counts["timeouts"] += 1
+            raise GitTimeout(call, f"timed out after {timeout:.0f}s")
+        except asyncio.CancelledError:
+            self._kill(process)
+            await process.wait()
+            raise
+        if process.returncode != 0:
+            raise GitError(call, stderr.decode().strip(), process.returncode)
+        return stdout.decode()
+
+    async def run(
+        self,
+        *args: str,
+        cwd: Path,
+        before_retry: Optional[Callable[[], None]] = None,
+    ) -> str:
+        """Returns the stdout of the git call or raises a :class:`GitError`.
+        ``before_retry`` can restore the state of a failed attempt, e.g. remove
+        a partial clone.
+        """
+        call = GitCall(args=args, cwd=cwd)
+        max_attempts = 1 + (
+            self.max_retries if call.command in self.RETRIED_COMMANDS else 0
+        )
+        call_id = next(self._call_ids)
+        self._running[call_id] = call
+        try:
+            attempt = 1
+            while True:
+                try:
+                    return await self._run_once(call, self.timeout(call))
+                except GitError as e:
+                    if attempt >= max_attempts:
+                        self.counts["failures"] += 1
+                        raise
+                    delay = self.backoff * 2 ** (attempt - 1)
+                    logger.warning(f"{e} - retry in {delay:.0f}s")
+                    self.counts["retries"] += 1
+                    await asyncio.sleep(delay)
+                    if before_retry is not None:
+                        before_retry()
+                    attempt += 1
+        finally:
+            del self._running[call_id]
+            self._reported_stalls.discard(call_id)
+
+    def report_stalls(self) -> List[GitCall]:
+        """Logs and returns the calls which exceeded the stall threshold
+        since the last report.
+        """
+        stalled_calls: List[GitCall] = []
+        for call_id, call in self._running.items():
+            if call_id in self._reported_stalls or call.duration < self.stall_threshold:
+                continue
+            logger.warning(
+                f"{call} stalls for {call.duration:.0f}s, timeout is {self.timeout(call):.0f}s"
+            )
+            self._reported_stalls.add(call_id)
+            self.counts["stalls"] += 1
+            stalled_calls.append(call)
+        return stalled_calls
+
+    async def watch(self, interval: float = 10.0):
+        """Reports stalled calls until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            self.report_stalls()
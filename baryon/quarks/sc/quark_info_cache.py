@@ -0,0 +1,71 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class QuarkInfoCache:
+    """An on-disk cache for quark info which was extracted via sclang.
+
+    Entries are addressed by the content of the quark file and the used
+    sclang version, so a changed file or a sclang update results in a new key.
+    The number of entries is bounded - the least recently used entries get
+    evicted, where the modification time of an entry marks its last usage.
+    """
+
+    def __init__(self, cache_path: Path, max_entries: int = 4096) -> None:
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def build_key(content: bytes, sclang_version: str) -> str:
+        h = hashlib.sha256()
+        h.update(sclang_version.encode())
+        h.update(b"\0")
+        h.update(content)
+        return h.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_path.joinpath(f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry_path = self._entry_path(key)
+        try:
+            with entry_path.open("r") as f:
+                value = json.load(f)
+            # mark entry as recently used
+            os.utime(entry_path)
+        except (OSError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]):
+        self.cache_path.mkdir(parents=True, exist_ok=True)
+        # write to a temp file first so a crash does not leave a broken entry
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.cache_path, suffix=".tmp", delete=False
+        ) as f:
+            json.dump(value, f)
+        os.replace(f.name, self._entry_path(key))
+        self._evict()
+
+    def _evict(self):
+        entries = list(self.cache_path.glob("*.json"))
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[: len(entries) - self.max_entries]:
+            logger.debug(f"Evict {entry} from quark info cache")
+            entry.unlink(missing_ok=True)
+
+    def __str__(self) -> str:
+        return f"{self.hits} hits, {self.misses} misses"
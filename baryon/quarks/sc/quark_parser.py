@@ -0,0 +1,266 @@
+import re
+from typing import Any, Dict, List
+
+
+class QuarkParseError(Exception):
+    pass
+
+
+class QuarkFileParser:
+    """Parses the literal subset of sclang which is used within ``.quark`` files,
+    e.g. ``(name: "foo", dependencies: ["bar"])``, into python objects.
+
+    The returned values mimic ``q[\\toJson]`` of ``quarkToJson.scd``, so
+    symbols become strings, associations are reduced to their key
+    and functions are represented as the string ``"a function"``.
+    Anything which would need to be evaluated by sclang raises a
+    :class:`QuarkParseError`.
+    """
+
+    IDENTIFIER_REGEX = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+    NUMBER_REGEX = re.compile(r"\d+(\.\d+)?([eE][+-]?\d+)?")
+    STRING_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "f": "\f"}
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.pos = 0
+
+    def parse(self) -> Dict[str, Any]:
+        self._skip_whitespace()
+        value = self._parse_value()
+        self._skip_whitespace()
+        # a trailing semicolon is allowed at the end of the file
+        if self._peek() == ";":
+            self.pos += 1
+            self._skip_whitespace()
+        if self.pos != len(self.text):
+            raise self._error("Unexpected content after value")
+        if not isinstance(value, dict):
+            raise self._error("Quark file does not contain an event")
+        return value
+
+    def _error(self, message: str) -> QuarkParseError:
+        line = self.text.count("\n", 0, self.pos) + 1
+        return QuarkParseError(f"{message} in line {line}")
+
+    def _peek(self, offset: int = 0) -> str:
+        return self.text[self.pos + offset : self.pos + offset + 1]
+
+    def _skip_whitespace(self):
+        while self.pos < len(self.text):
+            if self.text[self.pos].isspace():
+                self.pos += 1
+            elif self.text.startswith("//", self.pos):
+                end = self.text.find("\n", self.pos)
+                self.pos = len(self.text) if end == -1 else end
+            elif self.text.startswith("/*", self.pos):
+                self._skip_block_comment()
+            else:
+                break
+
+    def _skip_block_comment(self):
+        # block comments can be nested in sclang
+        depth = 0
+        while self.pos < len(self.text):
+            if self.text.startswith("/*", self.pos):
+                depth += 1
+                self.pos += 2
+            elif self.text.startswith("*/", self.pos):
+                depth -= 1
+                self.pos += 2
+                if depth == 0:
+                    return
+            else:
+                self.pos += 1
+        raise self._error("Unterminated comment")
+
+    def _expect(self, char: str):
+        self._skip_whitespace()
+        if self._peek() != char:
+            raise self._error(f"Expected '{char}'")
+        self.pos += 1
+
+    def _parse_value(self) -> Any:
+        value = self._parse_primary()
+        self._skip_whitespace()
+        if self.text.startswith("->", self.pos):
+            # only the key of an association is used
+            self.pos += 2
+            self._skip_whitespace()
+            self._parse_value()
+        return value
+
+    def _parse_primary(self) -> Any:
+        self._skip_whitespace()
+        char = self._peek()
+        if char == "(":
+            return self._parse_event()
+        if char == "[":
+            return self._parse_array(literal=False)
+        if char == "#" and self._peek(1) == "[":
+            self.pos += 1
+            return self._parse_array(literal=True)
+        if char == '"':
+            return self._parse_strings()
+        if char == "'":
+            return self._parse_quoted("'")
+        if char == "\\":
+            self.pos += 1
+            return self._parse_identifier()
+        if char == "{":
+            self._skip_function()
+            return "a function"
+        if char == "-" or char.isdigit():
+            return self._parse_number()
+        if char.isalpha():
+            identifier = self._parse_identifier()
+            match identifier:
+                case "true":
+                    return True
+                case "false":
+                    return False
+                case "nil":
+                    return None
+            raise self._error(f"Can not evaluate '{identifier}' statically")
+        raise self._error(f"Unexpected character '{char}'")
+
+    def _parse_identifier(self) -> str:
+        match = self.IDENTIFIER_REGEX.match(self.text, self.pos)
+        if not match:
+            raise self._error("Expected identifier")
+        self.pos = match.end()
+        return match.group()
+
+    def _parse_number(self) -> Any:
+        sign = 1
+        if self._peek() == "-":
+            sign = -1
+            self.pos += 1
+        match = self.NUMBER_REGEX.match(self.text, self.pos)
+        if not match:
+            raise self._error("Expected number")
+        self.pos = match.end()
+        # radix notation, e.g. 16rFF, or scale degrees, e.g. 1s
+        if self._peek().isalpha():
+            raise self._error("Unsupported number notation")
+        number = match.group()
+        if match.group(1) or match.group(2):
+            return sign * float(number)
+        return sign * int(number)
+
+    def _parse_quoted(self, quote: str) -> str:
+        self.pos += 1
+        chars: List[str] = []
+        while self.pos < len(self.text):
+            char = self.text[self.pos]
+            if char == "\\":
+                escaped_char = self._peek(1)
+                chars.append(self.STRING_ESCAPES.get(escaped_char, escaped_char))
+                self.pos += 2
+                continue
+            self.pos += 1
+            if char == quote:
+                return "".join(chars)
+            chars.append(char)
+        raise self._error("Unterminated string")
+
+    def _parse_strings(self) -> str:
+        # adjacent string literals get concatenated
+        strings: List[str] = []
+        while self._peek() == '"':
+            strings.append(self._parse_quoted('"'))
+            self._skip_whitespace()
+        # tabs are replaced by toJson
+        return "".join(strings).replace("\t", " ")
+
+    def _skip_function(self):
+        # functions are not evaluated, so we only need to find the closing brace
+        depth = 0
+        while self.pos < len(self.text):
+            self._skip_whitespace()
+            char = self._peek()
+            if char == "":
+                break
+            elif char in "\"'":
+                self._parse_quoted(char)
+            elif char == "$":
+                # char literal, e.g. ${
+                self.pos += 2
+            else:
+                self.pos += 1
+                if char == "{":
+                    depth += 1
+                elif char == "}":
+                    depth -= 1
+                    if depth == 0:
+                        return
+        raise self._error("Unterminated function")
+
+    def _parse_event_key(self) -> str:
+        char = self._peek()
+        if char == "'":
+            key = self._parse_quoted("'")
+        elif char == '"':
+            key = self._parse_quoted('"')
+        elif char == "\\":
+            self.pos += 1
+            key = self._parse_identifier()
+        else:
+            key = self._parse_identifier()
+        self._expect(":")
+        return key
+
+    def _parse_event(self) -> Dict[str, Any]:
+        self.pos += 1
+        event: Dict[str, Any] = {}
+        while True:
+            self._skip_whitespace()
+            if self._peek() == ")":
+                self.pos += 1
+                return event
+            key = self._parse_event_key()
+            value = self._parse_value()
+            # like put of an Event, nil removes the key
+            if value is None:
+                event.pop(key, None)
+            else:
+                event[key] = value
+            self._skip_whitespace()
+            if self._peek() == ",":
+                self.pos += 1
+            elif self._peek() != ")":
+                raise self._error("Expected ',' or ')' within event")
+
+    def _parse_array(self, literal: bool) -> List[Any]:
+        self.pos += 1
+        values: List[Any] = []
+        while True:
+            self._skip_whitespace()
+            if self._peek() == "]":
+                self.pos += 1
+                return values
+            if literal and self._peek().isalpha():
+                # identifiers within literal arrays are symbols
+                values.append(self._parse_literal_array_identifier())
+            else:
+                values.append(self._parse_value())
+            self._skip_whitespace()
+            if self._peek() == ",":
+                self.pos += 1
+            elif self._peek() != "]":
+                raise self._error("Expected ',' or ']' within array")
+
+    def _parse_literal_array_identifier(self) -> Any:
+        identifier = self._parse_identifier()
+        match identifier:
+            case "true":
+                return True
+            case "false":
+                return False
+            case "nil":
+                return None
+        return identifier
+
+
+def parse_quark_file(text: str) -> Dict[str, Any]:
+    return QuarkFileParser(text).parse()
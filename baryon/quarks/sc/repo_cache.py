@@ -0,0 +1,195 @@
+import asyncio
+import dataclasses
+import fcntl
+import logging
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Collection, List, Optional
+
+import pytz
+
+from .git_supervisor import GitError, GitSupervisor
+
+logger = logging.getLogger(__name__)
+
+
+class RepoLocked(Exception):
+    pass
+
+
+@dataclasses.dataclass
+class RepoUsage:
+    name: str
+    path: Path
+    # bytes allocated on disk, like du
+    size: int
+    last_used: datetime
+
+
+class RepoCache:
+    """Keeps the directory of cloned repositories bounded.
+
+    Repositories of projects which are no longer listed get pruned, git
+    housekeeping gets run and, if a disk budget is set, the least recently
+    updated repositories get evicted until the cache fits the budget.
+    An evicted repository simply gets cloned again on its next scrape.
+
+    A repository which is locked by a scrape, also of another process such
+    as a worker, is never removed.
+    """
+
+    # number of concurrent git maintenance processes
+    NUM_MAINTENANCE_INSTANCES = 4
+
+    # a gc of a large repo can take a while
+    MAINTENANCE_TIMEOUT = 600.0
+
+    def __init__(self, path: Path, max_size: Optional[int] = None) -> None:
+        self.path = path
+        # in bytes, None means unbounded
+        self.max_size = max_size
+        self.git_supervisor = GitSupervisor(
+            timeouts={"maintenance": self.MAINTENANCE_TIMEOUT}
+        )
+
+    @staticmethod
+    def _disk_usage(path: Path) -> int:
+        size = 0
+        for dir_path, dir_names, file_names in os.walk(path):
+            for name in dir_names + file_names:
+                try:
+                    stat = os.lstat(os.path.join(dir_path, name))
+                except OSError:
+                    continue
+                size += stat.st_blocks * 512
+        return size
+
+    @staticmethod
+    def _last_used(path: Path) -> datetime:
+        # FETCH_HEAD gets written on every update of the checkout
+        for marker in [path.joinpath(".git", "FETCH_HEAD"), path.joinpath(".git")]:
+            if marker.exists():
+                return datetime.fromtimestamp(marker.stat().st_mtime, tz=pytz.utc)
+        return datetime.fromtimestamp(path.stat().st_mtime, tz=pytz.utc)
+
+    def usage(self) -> List[RepoUsage]:
+        """Returns the usage of every repository, largest first."""
+        if not self.path.is_dir():
+            return []
+        usages = [
+            RepoUsage(
+                name=repo_path.name,
+                path=repo_path,
+                size=self._disk_usage(repo_path),
+                last_used=self._last_used(repo_path),
+            )
+            for repo_path in self.path.iterdir()
+            if repo_path.is_dir()
+        ]
+        return sorted(usages, key=lambda usage: usage.size, reverse=True)
+
+    def try_lock(self, name: str) -> Optional[IO]:
+        """Locks the repository of a project across processes and returns the
+        lock file, which releases the lock once it gets closed. Returns None
+        if the repository is locked already.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        # a file instead of a dir, so it is not listed as a repository
+        lock_file = open(self.path.joinpath(f".{name}.lock"), "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return None
+        return lock_file
+
+    def _remove(self, usage: RepoUsage) -> bool:
+        lock_file = self.try_lock(usage.name)
+        if lock_file is None:
+            logger.info(f"Keep {usage.name} in repo cache as it is being scraped")
+            return False
+        with lock_file:
+            logger.info(
+                f"Remove {usage.name} ({usage.size / 2**20:.1f} MiB) from repo cache"
+            )
+            shutil.rmtree(usage.path, ignore_errors=True)
+        return True
+
+    def prune_orphans(self, names: Collection[str]) -> List[RepoUsage]:
+        """Removes all repositories which do not belong to one of the given
+        project names and returns them.
+        """
+        return [
+            usage
+            for usage in self.usage()
+            if usage.name not in names and self._remove(usage)
+        ]
+
+    def enforce_budget(self) -> List[RepoUsage]:
+        """Evicts the least recently used repositories until the cache fits
+        into :attr:`max_size` and returns them.
+        """
+        if self.max_size is None:
+            return []
+        usages = self.usage()
+        total_size = sum(usage.size for usage in usages)
+        evicted: List[RepoUsage] = []
+        for usage in sorted(usages, key=lambda usage: usage.last_used):
+            if total_size <= self.max_size:
+                break
+            if self._remove(usage):
+                total_size -= usage.size
+                evicted.append(usage)
+        if evicted:
+            logger.info(
+                f"Evicted {len(evicted)} repos to fit the repo cache budget of {self.max_size / 2**30:.1f} GiB"
+            )
+        return evicted
+
+    async def run_maintenance(self):
+        """Runs ``git maintenance`` on every repository, which only repacks
+        and collects garbage if enough loose objects or packs piled up.
+        """
+        semaphore = asyncio.Semaphore(self.NUM_MAINTENANCE_INSTANCES)
+
+        async def maintain(repo_path: Path):
+            async with semaphore:
+                try:
+                    await self.git_supervisor.run(
+                        "maintenance", "run", "--auto", cwd=repo_path
+                    )
+                except GitError as e:
+                    logger.error(f"git maintenance failed on {repo_path.name}: {e}")
+
+        await asyncio.gather(
+            *[
+                maintain(usage.path)
+                for usage in self.usage()
+                if usage.path.joinpath(".git").exists()
+            ]
+        )
+
+    async def clean(self, names: Optional[Collection[str]] = None):
+        """Prunes orphaned repositories if the names of all projects are
+        given, runs the git maintenance and enforces the budget.
+        """
+        if names is not None:
+            self.prune_orphans(names)
+        await self.run_maintenance()
+        self.enforce_budget()
+
+    @staticmethod
+    def format_usage(usages: List[RepoUsage], num_largest: int = 20) -> str:
+        total_size = sum(usage.size for usage in usages)
+        lines = [f"{len(usages)} repos use {total_size / 2**20:.1f} MiB"]
+        if usages:
+            lines += ["", f"{'repo':<30}{'size':>12}  last used"]
+        for usage in usages[:num_largest]:
+            lines.append(
+                f"{usage.name:<30}{usage.size / 2**20:>8.1f} MiB  {usage.last_used:%Y-%m-%d %H:%M}"
+            )
+        if len(usages) > num_largest:
+            lines.append(f"... and {len(usages) - num_largest} more")
+        return "\n".join(lines)
@@ -0,0 +1,214 @@
+import asyncio
+import itertools
+import logging
+import os
+import time
+from asyncio.subprocess import PIPE, STDOUT
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .extractor import SclangError
+
+logger = logging.getLogger(__name__)
+
+
+class SclangWorker:
+    """A long-lived sclang interpreter which executes scripts on request.
+
+    Jobs are send as code via stdin, where sclang executes everything up to
+    the escape character. Each job posts a sentinel line on completion,
+    so everything posted before the sentinel is the output of the job.
+
+    .. note::
+
+        The executed scripts must not exit the interpreter if the env variable
+        ``BARYON_SCLANG_POOL`` is set.
+    """
+
+    JOB_DONE = "BARYON_JOB_DONE"
+    JOB_ERROR = "BARYON_JOB_ERROR"
+
+    # executes the code received via stdin without printing its result
+    EXECUTE_CHAR = "\x1b"
+
+    _job_ids = itertools.count()
+
+    def __init__(self, sclang_path: str, boot_timeout: float = 120.0) -> None:
+        self.sclang_path = sclang_path
+        self.boot_timeout = boot_timeout
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.num_jobs = 0
+        self.last_used = time.monotonic()
+
+    @property
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    @staticmethod
+    def _sc_string(value: str) -> str:
+        escaped_value = value.replace("\\", "\\\\").replace('"', '\\"')
+        return f'"{escaped_value}"'
+
+    async def start(self):
+        logger.debug(f"Start sclang worker via {self.sclang_path}")
+        try:
+            # -i foo sets the interpreter - this is somehow necessary
+            self.process = await asyncio.create_subprocess_exec(
+                self.sclang_path,
+                "-i",
+                "foo",
+                stdin=PIPE,
+                stdout=PIPE,
+                stderr=STDOUT,
+                env={**os.environ.copy(), "BARYON_SCLANG_POOL": "1"},
+                limit=2**20,
+            )
+        except OSError as e:
+            raise SclangError(f"Could not start sclang: {e}")
+        self.num_jobs = 0
+        # the interpreter only starts to consume stdin after the class library
+        # has been compiled, so a ping also waits for the boot to finish
+        await self.ping(timeout=self.boot_timeout)
+
+    async def stop(self):
+        if self.process is None:
+            return
+        if self.process.returncode is None:
+            self.process.kill()
+        await self.process.wait()
+        self.process = None
+
+    async def restart(self):
+        await self.stop()
+        await self.start()
+
+    async def ping(self, timeout: float = 10.0):
+        await self._execute("", timeout=timeout)
+
+    async def run(
+        self, script_path: Path, env: Dict[str, str], timeout: float = 30.0
+    ) -> str:
+        set_env = "".join(
+            f"{self._sc_string(k)}.setenv({self._sc_string(v)});"
+            for k, v in env.items()
+        )
+        # env variables are persistent within the interpreter, so
+        # they need to be removed so they do not leak into the next job
+        unset_env = "".join(f"{self._sc_string(k)}.unsetenv;" for k in env.keys())
+        code = (
+            f"{set_env}"
+            "try {"
+            f"thisProcess.interpreter.executeFile({self._sc_string(str(script_path))});"
+            "} {|error| error.reportError; failed = true; };"
+            f"{unset_env}"
+        )
+        self.num_jobs += 1
+        return await self._execute(code, timeout=timeout)
+
+    async def _execute(self, code: str, timeout: float) -> str:
+        if self.process is None or self.process.stdin is None:
+            raise SclangError("sclang worker is not running")
+        job_id = next(self._job_ids)
+        self.last_used = time.monotonic()
+        # a variable declaration is only allowed at the top level of a code block
+        self.process.stdin.write(
+            (
+                "(var failed = false;"
+                f"{code}"
+                f"if(failed, {{ {self._sc_string(f'{self.JOB_ERROR} {job_id}')}.postln }}, "
+                f"{{ {self._sc_string(f'{self.JOB_DONE} {job_id}')}.postln }});)"
+                f"{self.EXECUTE_CHAR}"
+            ).encode()
+        )
+        try:
+            await self.process.stdin.drain()
+            return await asyncio.wait_for(self._read_job(job_id), timeout=timeout)
+        except asyncio.TimeoutError:
+            # asyncio.TimeoutError is not a TimeoutError prior to python 3.11
+            raise TimeoutError()
+        except ConnectionError as e:
+            raise SclangError(f"sclang worker terminated: {e}")
+
+    async def _read_job(self, job_id: int) -> str:
+        assert self.process is not None and self.process.stdout is not None
+        output: List[str] = []
+        while True:
+            raw_line = await self.process.stdout.readline()
+            if raw_line == b"":
+                # makes sure the returncode gets set
+                await self.process.wait()
+                raise SclangError(
+                    "sclang worker terminated unexpectedly: " + "".join(output)
+                )
+            line = raw_line.decode(errors="replace")
+            if line.strip() == f"{self.JOB_DONE} {job_id}":
+                return "".join(output)
+            if line.strip() == f"{self.JOB_ERROR} {job_id}":
+                raise SclangError("".join(output))
+            output.append(line)
+
+
+class SclangPool:
+    """Distributes sclang jobs among a fixed number of long-lived interpreters
+    so the class library does not need to be compiled for every job.
+
+    Workers are started lazily and get restarted after a crash, a timeout,
+    a failed health check or after ``max_jobs_per_worker`` jobs.
+    """
+
+    # idle workers get pinged before accepting a new job
+    HEALTH_CHECK_INTERVAL = 60.0
+
+    def __init__(
+        self,
+        size: int = 2,
+        sclang_path: Optional[str] = None,
+        timeout: float = 30.0,
+        boot_timeout: float = 120.0,
+        max_jobs_per_worker: int = 200,
+    ) -> None:
+        self.size = size
+        self.sclang_path = (
+            sclang_path if sclang_path else os.environ.get("SCLANG_PATH", "sclang")
+        )
+        self.timeout = timeout
+        self.max_jobs_per_worker = max_jobs_per_worker
+
+        self._workers = [
+            SclangWorker(sclang_path=self.sclang_path, boot_timeout=boot_timeout)
+            for _ in range(size)
+        ]
+        self._idle_workers: asyncio.Queue[SclangWorker] = asyncio.Queue()
+        for worker in self._workers:
+            self._idle_workers.put_nowait(worker)
+
+    async def _check_health(self, worker: SclangWorker):
+        if not worker.is_alive:
+            await worker.restart()
+            return
+        if worker.num_jobs >= self.max_jobs_per_worker:
+            logger.debug(f"Recycle sclang worker after {worker.num_jobs} jobs")
+            await worker.restart()
+            return
+        if time.monotonic() - worker.last_used > self.HEALTH_CHECK_INTERVAL:
+            try:
+                await worker.ping()
+            except (TimeoutError, SclangError) as e:
+                logger.error(f"sclang worker failed health check - restart: {e}")
+                await worker.restart()
+
+    async def run(self, script_path: Path, env: Dict[str, str]) -> str:
+        worker = await self._idle_workers.get()
+        try:
+            await self._check_health(worker)
+            return await worker.run(script_path, env=env, timeout=self.timeout)
+        except TimeoutError:
+            # a worker can not be trusted after a timeout -
+            # it will be restarted before its next job
+            await worker.stop()
+            raise
+        finally:
+            self._idle_workers.put_nowait(worker)
+
+    async def close(self):
+        await asyncio.gather(*[worker.stop() for worker in self._workers])
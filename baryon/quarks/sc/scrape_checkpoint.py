@@ -0,0 +1,80 @@
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+import pytz
+
+logger = logging.getLogger(__name__)
+
+
+class ScrapeCheckpoint:
+    """The persisted state of a scrape run, which records when each
+    project finished, so an interrupted run can be resumed.
+
+    The state gets written after every finished project, so a killed
+    run loses at most the projects which were in progress.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.started = datetime.now(tz=pytz.utc)
+        self.finished: Optional[datetime] = None
+        # finish date by project name
+        self.projects: Dict[str, datetime] = {}
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["ScrapeCheckpoint"]:
+        try:
+            with path.open("r") as f:
+                state = json.load(f)
+            checkpoint = cls(path)
+            checkpoint.started = datetime.fromisoformat(state["started"])
+            checkpoint.finished = (
+                datetime.fromisoformat(state["finished"]) if state["finished"] else None
+            )
+            checkpoint.projects = {
+                name: datetime.fromisoformat(finished)
+                for name, finished in state["projects"].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.debug(f"Could not load scrape checkpoint {path}: {e}")
+            return None
+        return checkpoint
+
+    @property
+    def is_finished(self) -> bool:
+        return self.finished is not None
+
+    def is_done(self, name: str) -> bool:
+        return name in self.projects
+
+    def mark_done(self, name: str):
+        self.projects[name] = datetime.now(tz=pytz.utc)
+        self.save()
+
+    def finish(self):
+        self.finished = datetime.now(tz=pytz.utc)
+        self.save()
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            "started": self.started.isoformat(),
+            "finished": self.finished.isoformat() if self.finished else None,
+            "projects": {
+                name: finished.isoformat() for name, finished in self.projects.items()
+            },
+        }
+        # write to a temp file first so a kill does not leave a broken state
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.path.parent, suffix=".tmp", delete=False
+        ) as f:
+            json.dump(state, f)
+        os.replace(f.name, self.path)
+
+    def __str__(self) -> str:
+        return f"scrape started {self.started:%Y-%m-%d %H:%M} with {len(self.projects)} finished projects"
@@ -0,0 +1,209 @@
+import collections
+import dataclasses
+import json
+import logging
+import math
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Counter, Dict, List, Optional
+
+import pytz
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class StageTiming:
+    project: str
+    stage: str
+    # wall time in seconds
+    duration: float
+    failed: bool = False
+
+
+class ScrapeReport:
+    """Collects the wall time of each stage per project, the number of spawned
+    subprocesses, the peak RSS and optionally a tracemalloc summary of a scrape.
+
+    The report can be written as JSON, so runs can be compared against each
+    other, and summarized as a table with percentiles and the slowest projects.
+    """
+
+    PERCENTILES = [50, 90, 99]
+
+    def __init__(self, trace_memory: bool = False) -> None:
+        self.trace_memory = trace_memory
+        self.started = datetime.now(tz=pytz.utc)
+        self.duration: Optional[float] = None
+        self.timings: List[StageTiming] = []
+        self.subprocess_counts: Dict[str, Counter[str]] = {}
+        # timeouts, retries, failures and stalls of git calls
+        self.git_counts: Counter[str] = collections.Counter()
+        self.peak_rss: Dict[str, int] = {}
+        # only set if memory gets traced
+        self.traced_memory_peak: Optional[int] = None
+        self.memory_allocations: List[Dict[str, Any]] = []
+        self._start_time = time.perf_counter()
+
+    def start(self):
+        self.started = datetime.now(tz=pytz.utc)
+        self._start_time = time.perf_counter()
+        if self.trace_memory:
+            tracemalloc.start()
+
+    def add_timing(self, project: str, stage: str, duration: float, failed: bool):
+        self.timings.append(
+            StageTiming(project=project, stage=stage, duration=duration, failed=failed)
+        )
+
+    def add_subprocess_counts(self, project: str, counts: Counter[str]):
+        self.subprocess_counts[project] = counts
+
+    def add_git_counts(self, counts: Counter[str]):
+        self.git_counts.update(counts)
+
+    @staticmethod
+    def _max_rss(who: int) -> int:
+        max_rss = resource.getrusage(who).ru_maxrss
+        # linux reports kilobytes, macOS bytes
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+    def finish(self, num_allocations: int = 10):
+        self.duration = time.perf_counter() - self._start_time
+        self.peak_rss = {
+            "scraper": self._max_rss(resource.RUSAGE_SELF),
+            # largest of all terminated subprocesses such as git and sclang
+            "subprocesses": self._max_rss(resource.RUSAGE_CHILDREN),
+        }
+        if self.trace_memory and tracemalloc.is_tracing():
+            _, self.traced_memory_peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            self.memory_allocations = [
+                {
+                    "location": str(stat.traceback),
+                    "size": stat.size,
+                    "count": stat.count,
+                }
+                for stat in snapshot.statistics("lineno")[:num_allocations]
+            ]
+
+    @staticmethod
+    def percentile(values: List[float], p: float) -> float:
+        # nearest rank
+        if not values:
+            return 0.0
+        sorted_values = sorted(values)
+        rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+        return sorted_values[rank - 1]
+
+    def stage_durations(self) -> Dict[str, List[float]]:
+        durations: Dict[str, List[float]] = collections.defaultdict(list)
+        for timing in self.timings:
+            durations[timing.stage].append(timing.duration)
+        return durations
+
+    def project_durations(self) -> Dict[str, Dict[str, float]]:
+        durations: Dict[str, Dict[str, float]] = collections.defaultdict(dict)
+        for timing in self.timings:
+            durations[timing.project][timing.stage] = timing.duration
+        return durations
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started": self.started.isoformat(),
+            "duration": self.duration,
+            "stages": {
+                stage: {
+                    "count": len(durations),
+                    "failed": sum(t.failed for t in self.timings if t.stage == stage),
+                    "total": sum(durations),
+                    **{
+                        f"p{p}": self.percentile(durations, p) for p in self.PERCENTILES
+                    },
+                    "max": max(durations),
+                }
+                for stage, durations in self.stage_durations().items()
+            },
+            "projects": {
+                project: {
+                    "stages": stages,
+                    "subprocesses": dict(self.subprocess_counts.get(project, {})),
+                }
+                for project, stages in self.project_durations().items()
+            },
+            "git": dict(self.git_counts),
+            "peak_rss": self.peak_rss,
+            "traced_memory_peak": self.traced_memory_peak,
+            "memory_allocations": self.memory_allocations,
+        }
+
+    def write(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        logger.info(f"Wrote scrape report to {path}")
+
+    def format_summary(self, num_slowest: int = 10) -> str:
+        report = self.to_dict()
+        percentile_columns = "".join(f"{f'p{p}':>9}" for p in self.PERCENTILES)
+        lines = [
+            f"Scrape took {report['duration'] or 0:.1f}s",
+            "",
+            f"{'stage':<10}{'count':>7}{'failed':>8}{'total':>10}{percentile_columns}{'max':>9}",
+        ]
+        for stage, stats in report["stages"].items():
+            percentiles = "".join(f"{stats[f'p{p}']:>8.2f}s" for p in self.PERCENTILES)
+            lines.append(
+                f"{stage:<10}{stats['count']:>7}{stats['failed']:>8}"
+                f"{stats['total']:>9.1f}s{percentiles}{stats['max']:>8.2f}s"
+            )
+
+        slowest_projects = sorted(
+            report["projects"].items(),
+            key=lambda item: sum(item[1]["stages"].values()),
+            reverse=True,
+        )[:num_slowest]
+        if slowest_projects:
+            lines += ["", "Slowest projects:"]
+        for project, stats in slowest_projects:
+            stages = ", ".join(
+                f"{stage} {duration:.2f}s"
+                for stage, duration in stats["stages"].items()
+            )
+            subprocesses = ", ".join(
+                f"{count} {name}" for name, count in stats["subprocesses"].items()
+            )
+            lines.append(
+                f"  {project:<30}{sum(stats['stages'].values()):>8.2f}s  ({stages})"
+                + (f"  [{subprocesses}]" if subprocesses else "")
+            )
+
+        if report["git"]:
+            lines += [
+                "",
+                "Git calls: "
+                + ", ".join(f"{count} {name}" for name, count in report["git"].items()),
+            ]
+        if report["peak_rss"]:
+            lines += [
+                "",
+                "Peak RSS: "
+                + ", ".join(
+                    f"{name} {size / 2**20:.1f} MiB"
+                    for name, size in report["peak_rss"].items()
+                ),
+            ]
+        if report["traced_memory_peak"] is not None:
+            lines.append(
+                f"Peak of traced python memory: {report['traced_memory_peak'] / 2**20:.1f} MiB"
+            )
+            lines += [
+                f"  {allocation['size'] / 2**20:8.1f} MiB  {allocation['location']}"
+                for allocation in report["memory_allocations"]
+            ]
+        return "\n".join(lines)
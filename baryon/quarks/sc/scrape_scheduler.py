@@ -0,0 +1,80 @@
+import dataclasses
+import math
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import pytz
+
+
+@dataclasses.dataclass
+class ProjectActivity:
+    latest_commit: Optional[datetime]
+    last_checked: Optional[datetime]
+
+
+class ScrapeScheduler:
+    """Ranks projects by how likely their remote changed since the last check.
+
+    A project is expected to change at an interval proportional to the time
+    since its latest commit - a project with a commit from yesterday gets
+    checked daily, a quark which is dormant for years only every few months.
+    The priority of a project is the time since its last check divided
+    by this interval, so a priority >= 1 means the project is due.
+    Projects which were never checked come first.
+
+    The time since the last check gets extended by ``slack``, so a project
+    with the minimal interval which was checked by the previous run of a
+    daily schedule, e.g. a few minutes less than a day ago, is due again.
+    """
+
+    def __init__(
+        self,
+        activity_factor: float = 0.1,
+        min_interval: timedelta = timedelta(days=1),
+        max_interval: timedelta = timedelta(days=90),
+        slack: timedelta = timedelta(hours=6),
+    ) -> None:
+        self.activity_factor = activity_factor
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.slack = slack
+
+    def check_interval(
+        self, activity: ProjectActivity, now: Optional[datetime] = None
+    ) -> timedelta:
+        now = now or datetime.now(tz=pytz.utc)
+        if activity.latest_commit is None:
+            return self.max_interval
+        dormancy = max(now - activity.latest_commit, timedelta(0))
+        return min(
+            max(dormancy * self.activity_factor, self.min_interval), self.max_interval
+        )
+
+    def priority(
+        self, activity: ProjectActivity, now: Optional[datetime] = None
+    ) -> float:
+        now = now or datetime.now(tz=pytz.utc)
+        if activity.last_checked is None:
+            return math.inf
+        since_checked = max(now - activity.last_checked, timedelta(0)) + self.slack
+        return since_checked / self.check_interval(activity, now)
+
+    def rank(
+        self,
+        names: List[str],
+        activities: Dict[str, ProjectActivity],
+        now: Optional[datetime] = None,
+    ) -> List[str]:
+        """Returns the names of all due projects, most likely changed first.
+        Names without an activity are unknown projects and therefore due.
+        """
+        now = now or datetime.now(tz=pytz.utc)
+        unknown = ProjectActivity(latest_commit=None, last_checked=None)
+        priorities = {
+            name: self.priority(activities.get(name, unknown), now) for name in names
+        }
+        return sorted(
+            (name for name in names if priorities[name] >= 1.0),
+            key=lambda name: priorities[name],
+            reverse=True,
+        )
@@ -1,18 +1,94 @@
 import asyncio
+import dataclasses
 import logging
+import multiprocessing
+import os
 import re
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import (
+    IO,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+)
 
 import aiohttp
+import pytz
 import yaml
-
-from ..models import Project, ProjectClass, ProjectDoc, ProjectVersion
-from .extractor import ProjectRepo, ProjectType, ReadmeFormatting
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import models, transaction
+
+from ..models import (
+    Project,
+    ProjectClass,
+    ProjectDoc,
+    ProjectGeneration,
+    ProjectVersion,
+    ScrapeJob,
+)
+from .dependency_graph import DependencyResolver
+from .extractor import (
+    GitMetadata,
+    HelpFile,
+    ProjectRepo,
+    ProjectType,
+    ReadmeFormatting,
+    SclangError,
+)
+from .git_supervisor import GitSupervisor
+from .quark_info_cache import QuarkInfoCache
+from .repo_cache import RepoCache, RepoLocked
+from .sclang_pool import SclangPool
+from .scrape_checkpoint import ScrapeCheckpoint
+from .scrape_report import ScrapeReport
+from .scrape_scheduler import ProjectActivity, ScrapeScheduler
 
 logger = logging.getLogger(__name__)
 
 
+@dataclasses.dataclass
+class ProjectScrape:
+    """The state of a project while it passes the stages of the pipeline."""
+
+    repo: ProjectRepo
+    # set if the scrape was claimed from the DB job queue
+    job: Optional[ScrapeJob] = None
+    project: Optional[Project] = None
+    git_metadata: Optional[GitMetadata] = None
+    doc_paths: List[Path] = dataclasses.field(default_factory=list)
+    doc_files: List[HelpFile] = dataclasses.field(default_factory=list)
+    versions: List[ProjectVersion] = dataclasses.field(default_factory=list)
+    classes: List[ProjectClass] = dataclasses.field(default_factory=list)
+    # None if the docs could not be built, so the docs of the last scrape are kept
+    docs: Optional[List[ProjectDoc]] = dataclasses.field(default_factory=list)
+    # False if a sclang step failed, so the project gets scraped again on the
+    # next run even if its remote did not change
+    complete: bool = True
+    # held from the git stage until the scrape finished or failed, so the repo
+    # is neither scraped by another process nor removed from the repo cache
+    repo_lock: Optional[IO] = None
+
+
+@dataclasses.dataclass
+class PipelineStage:
+    name: str
+    func: Callable[[ProjectScrape], Awaitable[None]]
+    # number of projects which are processed by the stage at the same time
+    concurrency: int
+
+
 class ProjectScraper:
     QUARKS_TXT_LIST_URL = "https://raw.githubusercontent.com/supercollider-quarks/quarks/master/directory.txt"
     QUARKS_TXT_REGEX = re.compile(
@@ -23,31 +99,137 @@ class ProjectScraper:
     )
 
     REPO_PATH = Path(__file__).parent.joinpath("../repos").resolve()
-
-    def __init__(self, num_instances: int = 8) -> None:
-        self.num_instances = num_instances
-        self.queue: asyncio.Queue[Optional[ProjectRepo]] = asyncio.Queue()
+    QUARK_INFO_CACHE_PATH = settings.BARYON_DATA_PATH.joinpath("cache/quark_info")
+    REPORT_PATH = settings.BARYON_DATA_PATH.joinpath("reports")
+    CHECKPOINT_PATH = settings.BARYON_DATA_PATH.joinpath("scrape_checkpoint.json")
+
+    # number of concurrent git ls-remote calls when checking for changes
+    NUM_REMOTE_CHECKS = 32
+
+    def __init__(
+        self,
+        force: bool = False,
+        num_git_instances: int = 16,
+        num_analysis_instances: int = 4,
+        num_sclang_instances: Optional[int] = None,
+        num_db_instances: int = 1,
+        trace_memory: bool = False,
+        resume: bool = False,
+        schedule: bool = False,
+        max_projects: Optional[int] = None,
+        time_budget: Optional[timedelta] = None,
+        repo_cache_max_size: Optional[int] = None,
+    ) -> None:
+        # if set, projects will also be scraped if their remote did not change
+        self.force = force
+        # if set, projects which finished within an interrupted run get skipped
+        self.resume = resume
+        # only set for a full in-process scrape
+        self.checkpoint: Optional[ScrapeCheckpoint] = None
+        # if set, only due projects get scraped, most likely changed first
+        self.schedule = schedule
+        self.scheduler = ScrapeScheduler()
+        # budgets of a run - no new projects get started once exhausted
+        self.max_projects = max_projects
+        self.time_budget = time_budget
+        self.deadline: Optional[float] = None
+        # concurrency of each stage of the pipeline, see _run_pipeline
+        self.num_git_instances = num_git_instances
+        self.num_analysis_instances = num_analysis_instances
+        self.num_db_instances = num_db_instances
+        # shared by all workers so sclang does not boot for each job -
+        # sclang is CPU bound, so by default there is one per CPU
+        self.sclang_pool = SclangPool(size=num_sclang_instances or os.cpu_count() or 2)
+        self.quark_info_cache = QuarkInfoCache(self.QUARK_INFO_CACHE_PATH)
+        # shared by all repos so stalled git calls can be reported
+        self.git_supervisor = GitSupervisor()
+        # keeps CPU bound work such as the rewriting of doc links off the event loop -
+        # the workers get started lazily while other threads run, and a fork of a
+        # threaded process can deadlock on a lock held by another thread, such as
+        # a lock of logging, so they get started by a fork server instead
+        self.process_pool = ProcessPoolExecutor(
+            mp_context=multiprocessing.get_context("forkserver")
+        )
+        # timings and resource usage of the scrape
+        self.report = ScrapeReport(trace_memory=trace_memory)
+        # keeps the cloned repos within the disk budget
+        self.repo_cache = RepoCache(self.REPO_PATH, max_size=repo_cache_max_size)
+
+    @classmethod
+    async def _fetch_quark_list(cls) -> List[Dict[str, str]]:
+        async with aiohttp.ClientSession() as s:
+            async with s.get(cls.QUARKS_TXT_LIST_URL) as r:
+                return [
+                    match.groupdict()
+                    for match in cls.QUARKS_TXT_REGEX.finditer(await r.text())
+                ]
 
     async def _fetch_quark_repos(self) -> List[ProjectRepo]:
         quark_repos: List[ProjectRepo] = []
-        async with aiohttp.ClientSession() as s:
-            async with s.get(self.QUARKS_TXT_LIST_URL) as r:
-                for match in self.QUARKS_TXT_REGEX.finditer(await r.text()):
-                    match_dict = match.groupdict()
-                    quark_repos.append(
-                        ProjectRepo(
-                            project_type=ProjectType.QUARK,
-                            name=match_dict["name"],
-                            url=match_dict["url"],
-                            repo_path=self.REPO_PATH.joinpath(match_dict["name"]),
-                            default_tag=match_dict["tag"]
-                            if match_dict["tag"]
-                            else None,
-                        )
-                    )
+        for match_dict in await self._fetch_quark_list():
+            quark_repos.append(
+                ProjectRepo(
+                    project_type=ProjectType.QUARK,
+                    name=match_dict["name"],
+                    url=match_dict["url"],
+                    repo_path=self.REPO_PATH.joinpath(match_dict["name"]),
+                    default_tag=match_dict["tag"] if match_dict["tag"] else None,
+                    sclang_pool=self.sclang_pool,
+                    quark_info_cache=self.quark_info_cache,
+                    git_supervisor=self.git_supervisor,
+                )
+            )
         # @todo check quarks in db are not listed in txt?
         return quark_repos
 
+    async def _filter_changed(self, repos: List[ProjectRepo]) -> List[ProjectRepo]:
+        """Checks the remote refs of all repos concurrently and returns only
+        those repos whose HEAD or tags differ from the last successful scrape.
+        """
+        semaphore = asyncio.Semaphore(self.NUM_REMOTE_CHECKS)
+
+        async def check(repo: ProjectRepo):
+            async with semaphore:
+                await repo.get_remote_refs()
+
+        await asyncio.gather(*[check(repo) for repo in repos])
+
+        if self.force:
+            return repos
+
+        scraped_projects = Project.objects.filter(
+            name__in=[repo.name for repo in repos]
+        ).values_list("name", "last_scraped_commit", "last_scraped_tags")
+        scraped_refs = {
+            name: (commit_hash, tags_fingerprint)
+            async for name, commit_hash, tags_fingerprint in scraped_projects
+        }
+
+        changed_repos: List[ProjectRepo] = []
+        unchanged_names: List[str] = []
+        for repo in repos:
+            remote_refs = repo.remote_refs
+            if (
+                remote_refs is not None
+                and remote_refs.head is not None
+                and scraped_refs.get(repo.name)
+                == (remote_refs.head, remote_refs.tags_fingerprint)
+            ):
+                logger.debug(f"Skip {repo} as its remote has not changed")
+                unchanged_names.append(repo.name)
+                continue
+            changed_repos.append(repo)
+
+        # changed projects get their check date once their scrape succeeded
+        await Project.objects.filter(name__in=unchanged_names).aupdate(
+            last_checked_date=datetime.now(tz=pytz.utc)
+        )
+
+        logger.info(
+            f"{len(changed_repos)} of {len(repos)} projects changed since last scrape"
+        )
+        return changed_repos
+
     @staticmethod
     def _convert_formatting(f: ReadmeFormatting) -> Project.Formatting:
         match f:
@@ -70,157 +252,628 @@ class ProjectScraper:
             case _:
                 return Project.ProjectType.EXTENSION
 
-    async def _worker(self, worker_number: int):
-        while True:
-            quark = await self.queue.get()
-            if quark is None:
-                logger.info(f"Worker {worker_number} will shut down")
-                self.queue.task_done()
-                break
-
-            logger.info(f"Worker {worker_number} starts on {quark}")
-
-            project, created = await Project.objects.aget_or_create(
-                name=quark.name,
-                git_url=quark.url,
-                project_type=self._convert_project_type(quark.project_type),
+    @staticmethod
+    def _sync_related(
+        model: Type[models.Model],
+        project: Project,
+        objs: Sequence[models.Model],
+        key_fields: List[str],
+        update_fields: List[str],
+    ):
+        """Upserts the new or changed objs of a project and deletes all rows
+        of the project which are not part of objs anymore.
+        """
+        model_fields = {f.name: f for f in model._meta.fields}
+        fields = [model_fields[f] for f in key_fields + update_fields]
+
+        def row_values(obj: models.Model) -> Tuple:
+            return tuple(f.get_prep_value(getattr(obj, f.attname)) for f in fields)
+
+        # the last obj of a key wins, same as consecutive updates would do
+        scraped = {row_values(obj)[: len(key_fields)]: obj for obj in objs}
+        # the default ordering would only add a join
+        existing_rows = (
+            model._default_manager.filter(project=project)
+            .order_by()
+            .values_list("pk", *key_fields, *update_fields)
+        )
+        existing = {
+            tuple(values[: len(key_fields)]): (pk, tuple(values))
+            for pk, *values in existing_rows
+        }
+
+        deleted_pks = [pk for key, (pk, _) in existing.items() if key not in scraped]
+        if deleted_pks:
+            model._default_manager.filter(pk__in=deleted_pks).delete()
+
+        changed_objs = [
+            obj
+            for key, obj in scraped.items()
+            if key not in existing or existing[key][1] != row_values(obj)
+        ]
+        if changed_objs:
+            model._default_manager.bulk_create(
+                changed_objs,
+                update_conflicts=True,
+                unique_fields=["project", *key_fields],
+                update_fields=[*update_fields, "modified_date"],
+            )
+        logger.debug(
+            f"Synced {model.__name__} of {project.name}: "
+            f"{len(changed_objs)} upserted, {len(deleted_pks)} deleted"
+        )
+
+    @classmethod
+    def sync_project(
+        cls,
+        project: Project,
+        versions: List[ProjectVersion],
+        classes: List[ProjectClass],
+        docs: Optional[List[ProjectDoc]],
+    ):
+        """Writes a scraped project and its versions, classes and docs within a
+        single transaction, so readers never see a half-updated project.
+        Only new or changed rows get written and rows which were not
+        scraped anymore get deleted. If docs is None, e.g. because sclang
+        failed, the existing docs are kept.
+        """
+        with transaction.atomic():
+            project.save()
+            Project.objects.filter(pk=project.pk).update_search_vector()
+            cls._sync_related(
+                ProjectVersion,
+                project,
+                versions,
+                key_fields=["version_name"],
+                update_fields=["release_date", "git_hash"],
             )
+            cls._sync_related(
+                ProjectClass,
+                project,
+                classes,
+                key_fields=["name"],
+                update_fields=["file_path", "super_class", "is_extension"],
+            )
+            if docs is not None:
+                cls._sync_related(
+                    ProjectDoc,
+                    project,
+                    docs,
+                    key_fields=["source_path"],
+                    update_fields=["html_file"],
+                )
+            ProjectGeneration.bump()
 
-            try:
-                await quark.init_repo()
-                await quark.update_repo()
-                project.default_branch = await quark.get_default_branch()
-
-                first_commit = await quark.get_first_commit()
-                project.first_commit = first_commit.date
-
-                latest_commit = await quark.get_current_commit()
-                project.latest_commit = latest_commit.date
-
-                tags = await quark.get_git_tags()
-
-                for tag in tags:
-                    if tag.tag is None:
-                        continue
-                    await ProjectVersion.objects.aget_or_create(
-                        project=project,
-                        version_name=tag.tag,
-                        release_date=tag.date,
-                        git_hash=tag.hash,
-                    )
+    @staticmethod
+    def sync_dependencies():
+        """Resolves the dependencies declared by all projects and stores them
+        as edges of the dependency graph, which is read by the project pages
+        and the API. Only added and removed edges get written.
+        """
+        projects = list(Project.objects.values_list("pk", "name", "git_url"))
+        resolver = DependencyResolver(
+            {pk: (name, git_url) for pk, name, git_url in projects}
+        )
+        edges = resolver.resolve_edges(
+            dict(Project.objects.values_list("pk", "quark_info"))
+        )
+
+        Dependency = Project.dependencies.through
+        with transaction.atomic():
+            existing_edges = {
+                (from_pk, to_pk): pk
+                for pk, from_pk, to_pk in Dependency.objects.values_list(
+                    "pk", "from_project_id", "to_project_id"
+                )
+            }
+            removed_edges = {
+                edge: pk for edge, pk in existing_edges.items() if edge not in edges
+            }
+            added_edges = edges - existing_edges.keys()
+            Dependency.objects.filter(pk__in=removed_edges.values()).delete()
+            Dependency.objects.bulk_create(
+                [
+                    Dependency(from_project_id=from_pk, to_project_id=to_pk)
+                    for from_pk, to_pk in added_edges
+                ]
+            )
+            if removed_edges or added_edges:
+                ProjectGeneration.bump()
+        logger.info(f"Dependency graph has {len(edges)} edges")
+
+    async def _git_stage(self, scrape: ProjectScrape):
+        repo = scrape.repo
+        scrape.repo_lock = self.repo_cache.try_lock(repo.name)
+        if scrape.repo_lock is None:
+            raise RepoLocked(f"{repo} is scraped by another process")
+        scrape.project, _ = await Project.objects.aget_or_create(
+            name=repo.name,
+            git_url=repo.url,
+            project_type=self._convert_project_type(repo.project_type),
+        )
+        await repo.init_repo()
+        await repo.update_repo()
+        scrape.git_metadata = await repo.get_git_metadata()
+
+    def _analysis_stage(self, scrape: ProjectScrape):
+        # blocking file access, so this gets executed in a thread
+        repo = scrape.repo
+        project = scrape.project
+        assert project is not None and scrape.git_metadata is not None
+
+        project.default_branch = scrape.git_metadata.default_branch
+        project.first_commit = scrape.git_metadata.first_commit.date
+        project.latest_commit = scrape.git_metadata.latest_commit.date
+
+        scrape.versions = [
+            ProjectVersion(
+                project=project,
+                version_name=tag.tag,
+                release_date=tag.date,
+                git_hash=tag.hash,
+            )
+            for tag in scrape.git_metadata.tags
+            if tag.tag is not None
+        ]
 
-                for sc_class in quark.get_classes():
-                    await ProjectClass.objects.aupdate_or_create(
-                        # identifier
-                        project=project,
-                        name=sc_class.name,
-                        # to be updated
-                        defaults={
-                            "file_path": str(
-                                sc_class.file_path.relative_to(quark.repo_path)
-                            ),
-                            "super_class": sc_class.super_class,
-                            "is_extension": sc_class.is_extension,
-                        },
-                    )
+        scrape.classes = [
+            ProjectClass(
+                project=project,
+                name=sc_class.name,
+                file_path=str(sc_class.file_path.relative_to(repo.repo_path)),
+                super_class=sc_class.super_class,
+                is_extension=sc_class.is_extension,
+            )
+            for sc_class in repo.get_classes()
+        ]
 
-                if readme := quark.get_readme():
-                    logger.debug(f"Found readme for {quark}")
-                    project.project_help = readme.text
-                    project.project_help_formatting = self._convert_formatting(
-                        readme.formatting
-                    )
+        if readme := repo.get_readme():
+            logger.debug(f"Found readme for {repo}")
+            project.project_help = readme.text
+            project.project_help_formatting = self._convert_formatting(
+                readme.formatting
+            )
 
-                project.quark_info = await quark.extract_quark_info()
-
-                for help_source_path in quark.find_doc_paths():
-                    doc_files = await quark.build_docs(help_source_path)
-                    quark.fix_doc_links(doc_files)
-                    for doc in doc_files:
-                        if doc.html_path is None:
-                            continue
-                        await ProjectDoc.objects.aupdate_or_create(
-                            project=project,
-                            source_path=doc.source_path.relative_to(quark.repo_path),
-                            defaults={
-                                "html_file": str(
-                                    doc.html_path.relative_to(
-                                        ProjectRepo.SCDOC_TARGET_PATH.joinpath(
-                                            ".."
-                                        ).resolve()
-                                    )
-                                ),
-                            },
-                        )
-            except TimeoutError as e:
-                logger.error(f"Found error on {quark}: {e}")
-            finally:
-                await project.asave()
-                self.queue.task_done()
-                logger.info(f"Finished working on {quark}")
-
-    async def scrape_quarks(self, limit: Optional[int] = None):
-        logger.info(f"Start scraping quarks with {self.num_instances} instances")
-
-        for quark_num, quark_entry in enumerate(await self._fetch_quark_repos()):
-            if limit:
-                if quark_num >= limit:
-                    break
-            await self.queue.put(quark_entry)
-
-        # Create worker tasks to process the queue concurrently.
-        workers = [
-            asyncio.create_task(self._worker(i)) for i in range(self.num_instances)
+        scrape.doc_paths = repo.find_doc_paths()
+
+    async def _sclang_stage(self, scrape: ProjectScrape):
+        repo = scrape.repo
+        project = scrape.project
+        assert project is not None
+
+        try:
+            project.quark_info = await repo.extract_quark_info()
+        except SclangError as e:
+            # the quark info of the last scrape is kept
+            logger.error(f"Sclang error on extracting quark info of {repo.name}: {e}")
+            scrape.complete = False
+
+        try:
+            scrape.doc_files = await repo.build_docs(scrape.doc_paths)
+        except SclangError as e:
+            logger.error(f"Sclang error on building docs for {repo.name}: {e}")
+            scrape.docs = None
+            scrape.complete = False
+
+    async def _links_stage(self, scrape: ProjectScrape):
+        repo = scrape.repo
+        project = scrape.project
+        assert project is not None
+        if scrape.docs is None:
+            return
+
+        await repo.fix_doc_links(scrape.doc_files, executor=self.process_pool)
+        scrape.docs = [
+            ProjectDoc(
+                project=project,
+                source_path=str(doc.source_path.relative_to(repo.repo_path)),
+                html_file=str(
+                    doc.html_path.relative_to(
+                        ProjectRepo.SCDOC_TARGET_PATH.joinpath("..").resolve()
+                    )
+                ),
+            )
+            for doc in scrape.doc_files
+            if doc.html_path is not None
         ]
 
-        # Wait until the queue is empty
-        await self.queue.join()
+    async def _db_stage(self, scrape: ProjectScrape):
+        repo = scrape.repo
+        project = scrape.project
+        assert project is not None
+
+        if scrape.complete and repo.remote_refs and repo.remote_refs.head:
+            project.last_scraped_commit = repo.remote_refs.head
+            project.last_scraped_tags = repo.remote_refs.tags_fingerprint
+        else:
+            project.last_scraped_commit = None
+            project.last_scraped_tags = None
+        project.last_checked_date = datetime.now(tz=pytz.utc)
+
+        await sync_to_async(self.sync_project)(
+            project,
+            versions=scrape.versions,
+            classes=scrape.classes,
+            docs=scrape.docs,
+        )
+        await self._on_scrape_finished(scrape)
+        logger.info(f"Finished working on {repo}")
 
-        # Put None in the queue to signal workers to stop
-        for _ in range(self.num_instances):
-            await self.queue.put(None)
+    @staticmethod
+    def _release_repo(scrape: ProjectScrape):
+        if scrape.repo_lock is not None:
+            scrape.repo_lock.close()
+            scrape.repo_lock = None
+
+    async def _on_scrape_finished(self, scrape: ProjectScrape):
+        self._release_repo(scrape)
+        self.report.add_subprocess_counts(
+            scrape.repo.name, scrape.repo.subprocess_counts
+        )
+        if scrape.job is not None:
+            await sync_to_async(scrape.job.finish)()
+        elif self.checkpoint is not None:
+            self.checkpoint.mark_done(scrape.repo.name)
+
+    async def _on_scrape_failed(self, scrape: ProjectScrape, error: Exception):
+        self._release_repo(scrape)
+        self.report.add_subprocess_counts(
+            scrape.repo.name, scrape.repo.subprocess_counts
+        )
+        if scrape.job is not None:
+            # the bookkeeping of a job must not take down the stage worker
+            try:
+                if isinstance(error, RepoLocked):
+                    await sync_to_async(scrape.job.postpone)(ScrapeJob.RETRY_DELAY)
+                else:
+                    await sync_to_async(scrape.job.fail)(
+                        f"{type(error).__name__}: {error}"
+                    )
+            except Exception as e:
+                logger.exception(f"Could not mark job of {scrape.repo} as failed: {e}")
+
+    async def _stage_worker(
+        self,
+        stage: PipelineStage,
+        in_queue: "asyncio.Queue[Optional[ProjectScrape]]",
+        out_queue: Optional["asyncio.Queue[Optional[ProjectScrape]]"],
+    ):
+        while True:
+            scrape = await in_queue.get()
+            if scrape is None:
+                # pass the sentinel on to the other workers of the stage
+                await in_queue.put(None)
+                return
+            logger.debug(f"Stage {stage.name} starts on {scrape.repo}")
+            start = time.perf_counter()
+            try:
+                await stage.func(scrape)
+            except Exception as e:
+                # a failed project leaves the pipeline, all others continue
+                logger.exception(f"Stage {stage.name} failed on {scrape.repo}: {e}")
+                self.report.add_timing(
+                    scrape.repo.name, stage.name, time.perf_counter() - start, True
+                )
+                await self._on_scrape_failed(scrape, e)
+                continue
+            self.report.add_timing(
+                scrape.repo.name, stage.name, time.perf_counter() - start, False
+            )
+            if out_queue is not None:
+                await out_queue.put(scrape)
+
+    async def _run_stage(
+        self,
+        stage: PipelineStage,
+        in_queue: "asyncio.Queue[Optional[ProjectScrape]]",
+        out_queue: Optional["asyncio.Queue[Optional[ProjectScrape]]"],
+    ):
+        await asyncio.gather(
+            *[
+                self._stage_worker(stage, in_queue, out_queue)
+                for _ in range(stage.concurrency)
+            ]
+        )
+        # all workers are done, so the next stage will receive no more projects
+        if out_queue is not None:
+            await out_queue.put(None)
+
+    async def _run_pipeline(self, scrapes: AsyncIterator[ProjectScrape]):
+        stages = [
+            PipelineStage("git", self._git_stage, self.num_git_instances),
+            PipelineStage(
+                "analysis",
+                lambda scrape: asyncio.to_thread(self._analysis_stage, scrape),
+                self.num_analysis_instances,
+            ),
+            PipelineStage("sclang", self._sclang_stage, self.sclang_pool.size),
+            PipelineStage("links", self._links_stage, os.cpu_count() or 1),
+            PipelineStage("db", self._db_stage, self.num_db_instances),
+        ]
+        logger.info(
+            "Start scraping with "
+            + ", ".join(f"{stage.concurrency} {stage.name}" for stage in stages)
+            + " instances"
+        )
+
+        # bounded queues so a fast stage can not run too far ahead of a slow one
+        queues: List[asyncio.Queue[Optional[ProjectScrape]]] = [
+            asyncio.Queue(maxsize=stage.concurrency * 2) for stage in stages
+        ]
+        stage_tasks = [
+            asyncio.create_task(
+                self._run_stage(
+                    stage, queues[i], queues[i + 1] if i + 1 < len(queues) else None
+                )
+            )
+            for i, stage in enumerate(stages)
+        ]
+        # the bounded queue makes the iterator only produce on demand
+        async for scrape in scrapes:
+            await queues[0].put(scrape)
+        await queues[0].put(None)
+        await asyncio.gather(*stage_tasks)
+
+    async def _schedule(self, repos: List[ProjectRepo]) -> List[ProjectRepo]:
+        """Returns only the due repos, ordered by their priority."""
+        activities = {
+            name: ProjectActivity(
+                latest_commit=latest_commit, last_checked=last_checked
+            )
+            async for name, latest_commit, last_checked in Project.objects.filter(
+                name__in=[repo.name for repo in repos]
+            ).values_list("name", "latest_commit", "last_checked_date")
+        }
+        repos_by_name = {repo.name: repo for repo in repos}
+        due_names = self.scheduler.rank(list(repos_by_name.keys()), activities)
+        logger.info(f"{len(due_names)} of {len(repos)} projects are due for a scrape")
+        return [repos_by_name[name] for name in due_names]
+
+    def _init_checkpoint(self) -> ScrapeCheckpoint:
+        if self.resume:
+            checkpoint = ScrapeCheckpoint.load(self.CHECKPOINT_PATH)
+            if checkpoint is not None and not checkpoint.is_finished:
+                logger.info(f"Resume {checkpoint}")
+                return checkpoint
+            logger.info("Found no interrupted scrape to resume - start a new one")
+        checkpoint = ScrapeCheckpoint(self.CHECKPOINT_PATH)
+        checkpoint.save()
+        return checkpoint
+
+    def _start_budget(self):
+        if self.time_budget is not None:
+            self.deadline = time.monotonic() + self.time_budget.total_seconds()
+
+    def _budget_exhausted(self) -> bool:
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            logger.info("Time budget is exhausted - no new projects will be started")
+            return True
+        return False
+
+    async def _fetch_repos(
+        self, quarks: bool, extensions: bool, limit: Optional[int]
+    ) -> List[ProjectRepo]:
+        repos: List[ProjectRepo] = []
+        if extensions:
+            repos.extend((await self._fetch_extensions())[:limit])
+        if quarks:
+            repos.extend((await self._fetch_quark_repos())[:limit])
+        return repos
+
+    async def _select_repos(self, repos: List[ProjectRepo]) -> List[ProjectRepo]:
+        if self.schedule:
+            repos = await self._schedule(repos)
+        if self.max_projects is not None:
+            repos = repos[: self.max_projects]
+        return repos
+
+    async def _iterate_repos(
+        self, repos: List[ProjectRepo]
+    ) -> AsyncIterator[ProjectScrape]:
+        for repo in await self._filter_changed(repos):
+            if self._budget_exhausted():
+                return
+            yield ProjectScrape(repo=repo)
+
+    async def _run(self, scrapes: AsyncIterator[ProjectScrape]):
+        self.report.start()
+        stall_watch = asyncio.create_task(self.git_supervisor.watch())
+        try:
+            await self._run_pipeline(scrapes)
+        finally:
+            stall_watch.cancel()
+            await self.sclang_pool.close()
+            self.process_pool.shutdown()
+        self.report.add_git_counts(self.git_supervisor.counts)
+        await sync_to_async(self.sync_dependencies)()
+        self.report.finish()
+        logger.info(f"Quark info cache: {self.quark_info_cache}")
+
+    async def scrape(
+        self,
+        quarks: bool = True,
+        extensions: bool = True,
+        limit: Optional[int] = None,
+        only: Optional[List[str]] = None,
+    ):
+        """Scrapes quarks and extensions within a single pipeline.
+        The limit applies separately to quarks and extensions.
+        If only is set, only the projects with these names get scraped.
+        """
+        self._start_budget()
+        repos = await self._fetch_repos(quarks, extensions, limit)
+        all_repos = repos
+        if only is not None:
+            repos = [repo for repo in repos if repo.name in only]
+            if missing_names := set(only) - {repo.name for repo in repos}:
+                logger.error(f"Could not find projects {', '.join(missing_names)}")
+            # a partial scrape must not interfere with the checkpoint of a full one
+            await self._run(self._iterate_repos(repos))
+            return
+
+        self.checkpoint = self._init_checkpoint()
+        repos = [repo for repo in repos if not self.checkpoint.is_done(repo.name)]
+        repos = await self._select_repos(repos)
+
+        await self._run(self._iterate_repos(repos))
+        self.checkpoint.finish()
+        # only the complete list of projects reveals the orphaned repos
+        is_complete = quarks and extensions and limit is None
+        await self._clean_repo_cache(all_repos if is_complete else None)
 
-        # wait for shutdown of workers
-        await asyncio.gather(*workers)
+    @staticmethod
+    def _complete_names(
+        quark_names: Set[str], extension_names: Set[str]
+    ) -> Optional[Set[str]]:
+        if not quark_names or not extension_names:
+            # e.g. directory.txt could not be obtained - keep everything
+            logger.error("Project lists are incomplete - skip pruning repo cache")
+            return None
+        return quark_names | extension_names
+
+    @classmethod
+    async def fetch_project_names(cls) -> Optional[Set[str]]:
+        """Returns the names of all listed quarks and extensions, which own
+        the repos of the repo cache, or None if a list could not be obtained.
+        """
+        return cls._complete_names(
+            {quark["name"] for quark in await cls._fetch_quark_list()},
+            {
+                extension["name"]
+                for extension in cls._load_extensions_yaml()
+                if "name" in extension
+            },
+        )
+
+    async def _clean_repo_cache(self, all_repos: Optional[List[ProjectRepo]]):
+        names: Optional[Set[str]] = None
+        if all_repos is not None:
+            names = self._complete_names(
+                {r.name for r in all_repos if r.project_type == ProjectType.QUARK},
+                {r.name for r in all_repos if r.project_type == ProjectType.EXTENSION},
+            )
+        await self.repo_cache.clean(names)
+
+    def _enqueue_jobs(self, repos: List[ProjectRepo]) -> int:
+        # the order of the repos is kept via the priority of the jobs
+        with transaction.atomic():
+            pending_jobs = {
+                job.name: job
+                for job in ScrapeJob.objects.filter(
+                    status=ScrapeJob.Status.PENDING,
+                    name__in=[repo.name for repo in repos],
+                )
+            }
+            new_jobs: List[ScrapeJob] = []
+            for i, repo in enumerate(repos):
+                priority = float(len(repos) - i)
+                if repo.name in pending_jobs:
+                    pending_jobs[repo.name].priority = priority
+                    continue
+                new_jobs.append(
+                    ScrapeJob(
+                        name=repo.name,
+                        git_url=repo.url,
+                        project_type=self._convert_project_type(repo.project_type),
+                        repo_info={
+                            "default_tag": repo.default_tag,
+                            "src_path_patterns": repo.src_path_patterns,
+                        },
+                        priority=priority,
+                    )
+                )
+            ScrapeJob.objects.bulk_update(pending_jobs.values(), ["priority"])
+            ScrapeJob.objects.bulk_create(new_jobs)
+        logger.info(
+            f"Queued {len(new_jobs)} new scrape jobs, {len(pending_jobs)} were already pending"
+        )
+        return len(new_jobs)
+
+    async def enqueue(
+        self,
+        quarks: bool = True,
+        extensions: bool = True,
+        limit: Optional[int] = None,
+    ) -> int:
+        """Stores scrape jobs for quarks and extensions in the DB, which get
+        processed by one or multiple :meth:`work` processes.
+        """
+        repos = await self._select_repos(
+            await self._fetch_repos(quarks, extensions, limit)
+        )
+        return await sync_to_async(self._enqueue_jobs)(repos)
+
+    def _repo_from_job(self, job: ScrapeJob) -> ProjectRepo:
+        repo_info = job.repo_info
+        if not repo_info and job.project_type == Project.ProjectType.EXTENSION:
+            # jobs of webhooks only know the project, e.g. src_path_patterns
+            # are declared within the extension yaml
+            repo_info = {
+                k: v
+                for raw_extension in self._load_extensions_yaml()
+                if raw_extension.get("name") == job.name
+                for k, v in raw_extension.items()
+                if k not in ["name", "url"]
+            }
+        return ProjectRepo(
+            project_type=ProjectType.QUARK
+            if job.project_type == Project.ProjectType.QUARK
+            else ProjectType.EXTENSION,
+            name=job.name,
+            url=job.git_url,
+            repo_path=self.REPO_PATH.joinpath(job.name),
+            sclang_pool=self.sclang_pool,
+            quark_info_cache=self.quark_info_cache,
+            git_supervisor=self.git_supervisor,
+            **repo_info,
+        )
+
+    async def _claim_scrapes(self, worker: str) -> AsyncIterator[ProjectScrape]:
+        # jobs are claimed in small batches so other workers get their share
+        while not self._budget_exhausted():
+            jobs = await sync_to_async(ScrapeJob.claim)(
+                worker, limit=self.num_git_instances
+            )
+            if not jobs:
+                logger.info("Found no more claimable scrape jobs")
+                return
+            repos = [self._repo_from_job(job) for job in jobs]
+            changed_repos = await self._filter_changed(repos)
+            for job, repo in zip(jobs, repos):
+                if repo in changed_repos:
+                    yield ProjectScrape(repo=repo, job=job)
+                else:
+                    await sync_to_async(job.finish)()
+
+    async def work(self):
+        """Claims scrape jobs from the DB and scrapes them until the queue
+        is drained or the time budget is exhausted.
+        """
+        self._start_budget()
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        logger.info(f"Start scrape worker {worker}")
+        await self._run(self._claim_scrapes(worker))
+
+    @classmethod
+    def _load_extensions_yaml(cls) -> List[Dict]:
+        with open(cls.EXTENSION_YAML_PATH, "r") as f:
+            extensions_yaml: Dict = yaml.safe_load(f)
+        return extensions_yaml.get("extensions", [])
 
     async def _fetch_extensions(self) -> List[ProjectRepo]:
-        with open(self.EXTENSION_YAML_PATH, "r") as f:
-            extensions_yaml: Dict = yaml.safe_load(f)
         extensions: List[ProjectRepo] = []
-        raw_extensions = extensions_yaml.get("extensions", [])
-        for raw_extension in raw_extensions:
+        for raw_extension in self._load_extensions_yaml():
             try:
                 extensions.append(
                     ProjectRepo(
                         project_type=ProjectType.EXTENSION,
                         repo_path=self.REPO_PATH.joinpath(raw_extension["name"]),
+                        sclang_pool=self.sclang_pool,
+                        quark_info_cache=self.quark_info_cache,
+                        git_supervisor=self.git_supervisor,
                         **raw_extension,
                     )
                 )
             except Exception as e:
                 print(e)
         return extensions
-
-    async def scrape_extensions(self, limit: Optional[int] = None):
-        logger.info(f"Start scraping quarks with {self.num_instances} instances")
-
-        for num, extension_entry in enumerate(await self._fetch_extensions()):
-            if limit:
-                if num >= limit:
-                    break
-            await self.queue.put(extension_entry)
-
-        # Create worker tasks to process the queue concurrently.
-        workers = [
-            asyncio.create_task(self._worker(i)) for i in range(self.num_instances)
-        ]
-
-        # Wait until the queue is empty
-        await self.queue.join()
-
-        # Put None in the queue to signal workers to stop
-        for _ in range(self.num_instances):
-            await self.queue.put(None)
-
-        # wait for shutdown of workers
-        await asyncio.gather(*workers)
@@ -0,0 +1,73 @@
+from django.test import SimpleTestCase, TestCase
+
+from ...models import *
+from ..dependency_graph import *
+from ..scraper import ProjectScraper
+
+
+class DependencyResolverTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        self.resolver = DependencyResolver(
+            {
+                1: ("wslib", "https://github.com/supercollider-quarks/wslib"),
+                2: (
+                    "crucial-library",
+                    "https://github.com/crucialfelix/crucial-library",
+                ),
+                3: ("sc3-plugins", "https://github.com/supercollider/sc3-plugins"),
+            }
+        )
+
+    def test_resolve(self):
+        for dependency, key in [
+            ("wslib", 1),
+            ("WSlib@1.0", 1),
+            ("git@github.com:crucialfelix/crucial-library.git", 2),
+            ("https://github.com/crucialfelix/crucial-library@tags/4.1.5", 2),
+            ("crucial=https://github.com/crucialfelix/crucial-library", 2),
+            ("wslib-extra", None),
+            ("https://github.com/someone/wslib", None),
+        ]:
+            self.assertEqual(self.resolver.resolve(dependency), key, dependency)
+
+    def test_resolve_edges(self):
+        edges = self.resolver.resolve_edges(
+            {
+                1: {"dependencies": ["wslib", "crucial-library"]},
+                2: {"ext_dependency": "sc3-plugins, some other plugin"},
+                3: {"dependencies": "not a list"},
+            }
+        )
+        # self references are dropped
+        self.assertEqual(edges, {(1, 2), (2, 3)})
+
+
+class SyncDependenciesTestCase(TestCase):
+    def create_project(self, name: str, dependencies: List[str]) -> Project:
+        return Project.objects.create(
+            name=name,
+            git_url=f"https://github.com/supercollider-quarks/{name}",
+            project_type=Project.ProjectType.QUARK,
+            quark_info={"dependencies": dependencies},
+        )
+
+    def test_sync(self):
+        foo = self.create_project("foo", ["bar", "baz"])
+        bar = self.create_project("bar", [])
+        baz = self.create_project("baz", ["bar"])
+
+        ProjectScraper.sync_dependencies()
+        self.assertEqual(sorted(p.name for p in foo.get_dependencies()), ["bar", "baz"])
+        self.assertEqual(sorted(p.name for p in bar.get_dependents()), ["baz", "foo"])
+
+        # only changed edges get written
+        foo.quark_info = {"dependencies": ["baz"]}
+        foo.save()
+        with self.assertNumQueries(7):
+            ProjectScraper.sync_dependencies()
+        self.assertEqual([p.name for p in foo.get_dependencies()], ["baz"])
+        self.assertEqual([p.name for p in bar.get_dependents()], ["baz"])
+
+        response = self.client.get("/api/quarks/baz/")
+        self.assertEqual(response.json()["dependencies"], ["bar"])
+        self.assertEqual(response.json()["dependents"], ["foo"])
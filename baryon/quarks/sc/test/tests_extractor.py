@@ -1,7 +1,11 @@
+import json
 import shutil
+import subprocess
+import tempfile
 from pathlib import Path
+from unittest import mock
 
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 
 from ..extractor import *
 from ..scraper import *
@@ -27,7 +31,17 @@ class ExtractorTestCase(TestCase):
     def test_raw_doc_file_exists(self):
         self.assertTrue(self.raw_doc_html_path.is_file())
 
-    def test_fix_doc_links(self):
+    async def test_fix_doc_links(self):
+        await self.check_fix_doc_links()
+
+    async def test_fix_doc_links_in_process_pool(self):
+        scraper = ProjectScraper()
+        try:
+            await self.check_fix_doc_links(executor=scraper.process_pool)
+        finally:
+            scraper.process_pool.shutdown()
+
+    async def check_fix_doc_links(self, executor: Optional[Executor] = None):
         # hack b/c lxml needs the file in read mode
         # not a good test but better than nothing
         project = self.get_project_repo()
@@ -40,7 +54,7 @@ class ExtractorTestCase(TestCase):
                     f.write(text)
             self.assertFalse("https://github.com/dkmayer/miSCellaneous_lib" in text)
 
-            project.fix_doc_links(
+            await project.fix_doc_links(
                 help_files=[
                     HelpFile(
                         source_path=Path(
@@ -49,6 +63,7 @@ class ExtractorTestCase(TestCase):
                         html_path=html_target,
                     )
                 ],
+                executor=executor,
             )
             with open(html_target, "r", encoding="utf-8") as f:
                 text = f.read()
@@ -98,3 +113,429 @@ class ExtractorTestCase(TestCase):
                     "/too/far/apart/will/not/work/because/of/max/recursion"
                 ),
             )
+
+    async def test_get_git_metadata(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            origin_path = Path(temp_dir).joinpath("origin")
+
+            def git(*args, cwd=origin_path):
+                subprocess.run(
+                    [
+                        "git",
+                        "-c",
+                        "user.name=baryon",
+                        "-c",
+                        "user.email=baryon@localhost",
+                        *args,
+                    ],
+                    cwd=cwd,
+                    check=True,
+                    capture_output=True,
+                    env={**os.environ, "GIT_COMMITTER_DATE": "@1600000000 +0000"},
+                )
+
+            git("init", "--initial-branch=develop", str(origin_path), cwd=temp_dir)
+            git("commit", "--allow-empty", "-m", "first")
+            git("tag", "v1.0")
+            git("commit", "--allow-empty", "-m", "second")
+            git("tag", "-a", "v1.1", "-m", "annotated")
+            git("clone", str(origin_path), "clone", cwd=temp_dir)
+
+            project = ProjectRepo(
+                project_type=ProjectType.QUARK,
+                name="test",
+                url=str(origin_path),
+                repo_path=Path(temp_dir).joinpath("clone"),
+            )
+            metadata = await project.get_git_metadata()
+
+        self.assertEqual(metadata.default_branch, "develop")
+        self.assertEqual(project.default_branch, "develop")
+        self.assertEqual(
+            metadata.first_commit.date, datetime.fromtimestamp(1600000000, tz=pytz.utc)
+        )
+        self.assertNotEqual(metadata.first_commit.hash, metadata.latest_commit.hash)
+        self.assertEqual(sorted(tag.tag for tag in metadata.tags), ["v1.0", "v1.1"])
+        for tag in metadata.tags:
+            self.assertEqual(tag.date, metadata.first_commit.date)
+
+    async def test_update_repo(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            origin_path = Path(temp_dir).joinpath("origin")
+            clone_path = Path(temp_dir).joinpath("clone")
+
+            def git(*args, cwd=origin_path) -> str:
+                return subprocess.run(
+                    ["git", "-c", "user.name=baryon", "-c", "user.email=b@localhost"]
+                    + list(args),
+                    cwd=cwd,
+                    check=True,
+                    capture_output=True,
+                ).stdout.decode()
+
+            git("init", "--initial-branch=main", str(origin_path), cwd=temp_dir)
+            git("config", "uploadpack.allowFilter", "true")
+            origin_path.joinpath("Foo.sc").write_text("Foo {}")
+            git("add", "Foo.sc")
+            git("commit", "-m", "first")
+            git("tag", "v1.0")
+            git("checkout", "-b", "other")
+            git("commit", "--allow-empty", "-m", "other")
+            git("tag", "other-tag")
+            git("checkout", "main")
+
+            project = ProjectRepo(
+                project_type=ProjectType.QUARK,
+                name="test",
+                url=f"file://{origin_path}",
+                repo_path=clone_path,
+            )
+            await project.init_repo()
+            await project.update_repo()
+            self.assertEqual(
+                git("config", "remote.origin.promisor", cwd=clone_path), "true\n"
+            )
+            self.assertEqual(
+                sorted(git("tag", cwd=clone_path).split()), ["other-tag", "v1.0"]
+            )
+
+            # rewrite the history and delete a tag - a pull would fail on this
+            git("commit", "--amend", "-m", "rewritten")
+            git("tag", "-d", "v1.0")
+            await project.update_repo()
+
+            self.assertEqual(
+                git("rev-parse", "HEAD", cwd=clone_path),
+                git("rev-parse", "HEAD"),
+            )
+            self.assertEqual(git("tag", cwd=clone_path).split(), ["other-tag"])
+            self.assertNotIn(
+                "origin/other", git("branch", "-r", cwd=clone_path).split()
+            )
+
+    async def test_get_remote_refs(self):
+        project = ProjectRepo(
+            project_type=ProjectType.QUARK,
+            name="test",
+            url="https://github.com/supercollider-quarks/test",
+            repo_path=Path("test"),
+        )
+        raw_refs = (
+            "1111\tHEAD\n"
+            "2222\trefs/tags/v1.0\n"
+            "3333\trefs/tags/v1.1\n"
+            # the commit of an annotated tag
+            "4444\trefs/tags/v1.1^{}\n"
+        )
+        with mock.patch.object(
+            ProjectRepo, "git", mock.AsyncMock(return_value=raw_refs)
+        ):
+            remote_refs = await project.get_remote_refs()
+        self.assertEqual(remote_refs.head, "1111")
+        self.assertEqual(remote_refs.tags, {"v1.0": "2222", "v1.1": "3333"})
+        self.assertIs(project.remote_refs, remote_refs)
+
+    def test_tags_fingerprint(self):
+        fingerprint = RemoteRefs(head="1", tags={"a": "2", "b": "3"}).tags_fingerprint
+        self.assertEqual(
+            RemoteRefs(head="4", tags={"b": "3", "a": "2"}).tags_fingerprint,
+            fingerprint,
+        )
+        # a moved, added or removed tag changes the fingerprint
+        for tags in [{"a": "2", "b": "4"}, {"a": "2", "b": "3", "c": "4"}, {"a": "2"}]:
+            self.assertNotEqual(
+                RemoteRefs(head="1", tags=tags).tags_fingerprint, fingerprint
+            )
+
+    def test_file_index(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_path = Path(temp_dir)
+            for file_path in [
+                ".git/README.md",
+                "Readme.md",
+                "source/FooUGens/sc/Foo.sc",
+                "source/FooUGens/sc/HelpSource/Classes/Foo.schelp",
+                "examples/Example.sc",
+            ]:
+                repo_path.joinpath(file_path).parent.mkdir(parents=True, exist_ok=True)
+                repo_path.joinpath(file_path).write_text("Foo : UGen {}")
+
+            project = ProjectRepo(
+                project_type=ProjectType.EXTENSION,
+                name="test",
+                url="https://github.com/supercollider/test",
+                repo_path=repo_path,
+                src_path_patterns=["source/**/sc"],
+            )
+            readme = project.get_readme()
+            doc_paths = project.find_doc_paths()
+            classes = project.get_classes()
+
+        self.assertIsNotNone(readme)
+        self.assertEqual(readme.file_path, repo_path.joinpath("Readme.md"))  # type: ignore
+        self.assertEqual(
+            doc_paths, [repo_path.joinpath("source/FooUGens/sc/HelpSource")]
+        )
+        self.assertEqual(
+            [sc_class.file_path for sc_class in classes],
+            [repo_path.joinpath("source/FooUGens/sc/Foo.sc")],
+        )
+
+
+class FakeSclangRepo(ProjectRepo):
+    """Renders help files by wrapping the schelp source instead of calling sclang."""
+
+    def __init__(self, doc_target_path: Path, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.SCDOC_TARGET_PATH = doc_target_path
+        self.num_sclang_calls = 0
+        # if set, sclang fails like a missing sclang would
+        self.fail = False
+        # relative to the namespace dir, e.g. Classes/Foo.schelp
+        self.rendered_files: List[str] = []
+
+    async def _sclang(
+        self, script_path: Path, env: Optional[Dict[str, str]] = None
+    ) -> str:
+        assert env is not None
+        self.num_sclang_calls += 1
+        if self.fail:
+            raise SclangError("sclang: not found")
+        source_path = Path(env["QUARK_HELP_SOURCE_PATH"])
+        for source_file in env["QUARK_HELP_SOURCE_FILES"].split("\n"):
+            html_path = (
+                Path(env["QUARK_HELP_TARGET_PATH"])
+                .joinpath(source_file)
+                .with_suffix(".html")
+            )
+            html_path.parent.mkdir(parents=True, exist_ok=True)
+            html_path.write_text(
+                f"<html>{source_path.joinpath(source_file).read_text()}</html>"
+            )
+            self.rendered_files.append(str(Path(source_file).relative_to(self.name)))
+        return ""
+
+
+class BuildDocsTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.repo_path = Path(self.temp_dir.name).joinpath("repo")
+        self.doc_path = Path(self.temp_dir.name).joinpath("sc_docs").joinpath("test")
+        self.repo = FakeSclangRepo(
+            doc_target_path=self.doc_path.parent,
+            project_type=ProjectType.EXTENSION,
+            name="test",
+            url="https://github.com/supercollider/test",
+            repo_path=self.repo_path,
+        )
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def write_help_file(self, file_path: str, text: str):
+        self.repo_path.joinpath(file_path).parent.mkdir(parents=True, exist_ok=True)
+        self.repo_path.joinpath(file_path).write_text(text)
+
+    async def build_docs(self) -> Dict[str, str]:
+        # the checkout changes between the builds, so it needs to be indexed again
+        self.repo._file_index = None
+        self.repo.rendered_files = []
+        help_files = await self.repo.build_docs(self.repo.find_doc_paths())
+        # html file by source, both relative
+        return {
+            str(help_file.source_path.relative_to(self.repo_path)): str(
+                help_file.html_path.relative_to(self.doc_path)  # type: ignore
+            )
+            for help_file in help_files
+        }
+
+    def read_manifest(self) -> Dict[str, Dict[str, str]]:
+        with self.doc_path.joinpath(ProjectRepo.DOC_MANIFEST_FILE_NAME).open() as f:
+            return json.load(f)
+
+    async def test_incremental_build(self):
+        self.write_help_file("HelpSource/Classes/Foo.schelp", "foo")
+        self.write_help_file("HelpSource/Classes/Bar.schelp", "bar")
+        all_help_files = {
+            "HelpSource/Classes/Foo.schelp": "Classes/Foo.html",
+            "HelpSource/Classes/Bar.schelp": "Classes/Bar.html",
+        }
+
+        self.assertEqual(await self.build_docs(), all_help_files)
+        self.assertEqual(
+            sorted(self.repo.rendered_files),
+            ["Classes/Bar.schelp", "Classes/Foo.schelp"],
+        )
+        self.assertEqual(
+            self.read_manifest()["Classes/Foo.html"],
+            {
+                "source": "HelpSource/Classes/Foo.schelp",
+                "hash": ProjectRepo._hash_file(
+                    self.repo_path.joinpath("HelpSource/Classes/Foo.schelp")
+                ),
+            },
+        )
+
+        # unchanged help files are not rendered again but still returned
+        self.assertEqual(await self.build_docs(), all_help_files)
+        self.assertEqual(self.repo.rendered_files, [])
+        self.assertEqual(self.repo.num_sclang_calls, 1)
+
+        self.write_help_file("HelpSource/Classes/Foo.schelp", "changed foo")
+        self.assertEqual(await self.build_docs(), all_help_files)
+        self.assertEqual(self.repo.rendered_files, ["Classes/Foo.schelp"])
+        self.assertEqual(
+            self.doc_path.joinpath("Classes/Foo.html").read_text(),
+            "<html>changed foo</html>",
+        )
+
+        # a deleted HTML file gets rendered again
+        self.doc_path.joinpath("Classes/Bar.html").unlink()
+        self.assertEqual(await self.build_docs(), all_help_files)
+        self.assertEqual(self.repo.rendered_files, ["Classes/Bar.schelp"])
+
+    async def test_remove_deleted_help_files(self):
+        self.write_help_file("HelpSource/Classes/Foo.schelp", "foo")
+        self.write_help_file("HelpSource/Classes/Bar.schelp", "bar")
+        await self.build_docs()
+
+        self.repo_path.joinpath("HelpSource/Classes/Bar.schelp").unlink()
+        self.assertEqual(
+            await self.build_docs(),
+            {"HelpSource/Classes/Foo.schelp": "Classes/Foo.html"},
+        )
+        self.assertEqual(self.repo.rendered_files, [])
+        self.assertFalse(self.doc_path.joinpath("Classes/Bar.html").exists())
+        self.assertEqual(list(self.read_manifest().keys()), ["Classes/Foo.html"])
+
+    async def test_failed_build(self):
+        self.write_help_file("HelpSource/Classes/Foo.schelp", "foo")
+        await self.build_docs()
+        manifest = self.read_manifest()
+
+        self.write_help_file("HelpSource/Classes/Foo.schelp", "changed foo")
+        self.repo.fail = True
+        with self.assertRaises(SclangError):
+            await self.build_docs()
+        self.assertEqual(self.read_manifest(), manifest)
+        self.assertEqual(
+            self.doc_path.joinpath("Classes/Foo.html").read_text(), "<html>foo</html>"
+        )
+
+        # the change gets rendered once sclang works again
+        self.repo.fail = False
+        await self.build_docs()
+        self.assertEqual(self.repo.rendered_files, ["Classes/Foo.schelp"])
+
+    async def test_multiple_help_sources(self):
+        self.write_help_file("source/A/HelpSource/Classes/A.schelp", "a")
+        self.write_help_file("source/A/HelpSource/Guides/Overview.schelp", "a guide")
+        self.write_help_file("source/B/HelpSource/Classes/B.schelp", "b")
+        self.write_help_file("source/B/HelpSource/Guides/Overview.schelp", "b guide")
+
+        # all help sources share the namespace and get rendered at once
+        self.assertEqual(
+            await self.build_docs(),
+            {
+                "source/A/HelpSource/Classes/A.schelp": "Classes/A.html",
+                "source/B/HelpSource/Classes/B.schelp": "Classes/B.html",
+                # the last help source wins a clash
+                "source/B/HelpSource/Guides/Overview.schelp": "Guides/Overview.html",
+            },
+        )
+        self.assertEqual(self.repo.num_sclang_calls, 1)
+        self.assertEqual(
+            self.doc_path.joinpath("Guides/Overview.html").read_text(),
+            "<html>b guide</html>",
+        )
+        self.assertEqual(
+            self.read_manifest()["Guides/Overview.html"]["source"],
+            "source/B/HelpSource/Guides/Overview.schelp",
+        )
+
+        # a change of the shadowed file does not trigger a render
+        self.write_help_file("source/A/HelpSource/Guides/Overview.schelp", "changed")
+        await self.build_docs()
+        self.assertEqual(self.repo.rendered_files, [])
+
+        # once the winning file is deleted, the shadowed one takes over
+        self.repo_path.joinpath("source/B/HelpSource/Guides/Overview.schelp").unlink()
+        help_files = await self.build_docs()
+        self.assertEqual(
+            help_files["source/A/HelpSource/Guides/Overview.schelp"],
+            "Guides/Overview.html",
+        )
+        self.assertEqual(self.repo.rendered_files, ["Guides/Overview.schelp"])
+        self.assertEqual(
+            self.doc_path.joinpath("Guides/Overview.html").read_text(),
+            "<html>changed</html>",
+        )
+
+    async def test_symlinked_help_dirs(self):
+        self.write_help_file("shared/Guides/Shared.schelp", "shared")
+        self.write_help_file("HelpSource/Classes/Foo.schelp", "foo")
+        self.repo_path.joinpath("HelpSource/Guides").symlink_to(
+            self.repo_path.joinpath("shared/Guides")
+        )
+        # neither a link cycle nor a link out of the repo gets followed
+        self.repo_path.joinpath("HelpSource/Classes/Loop").symlink_to(
+            self.repo_path.joinpath("HelpSource")
+        )
+        self.repo_path.joinpath("HelpSource/Outside").symlink_to(self.doc_path.parent)
+
+        self.assertEqual(
+            await self.build_docs(),
+            {
+                "HelpSource/Classes/Foo.schelp": "Classes/Foo.html",
+                "HelpSource/Guides/Shared.schelp": "Guides/Shared.html",
+            },
+        )
+
+
+class LinkTreeTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.source_path = Path(self.temp_dir.name).joinpath("source")
+        self.target_path = Path(self.temp_dir.name).joinpath("target")
+        self.source_path.joinpath("Classes").mkdir(parents=True)
+        self.source_file = self.source_path.joinpath("Classes/Foo.schelp")
+        self.source_file.write_text("foo")
+        self.target_file = self.target_path.joinpath("Classes/Foo.schelp")
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_symlink(self):
+        self.source_path.joinpath("Linked").symlink_to(
+            self.source_path.joinpath("Classes")
+        )
+        self.source_path.joinpath("Classes/Loop").symlink_to(self.source_path)
+        ProjectRepo._link_tree(self.source_path, self.target_path)
+
+        self.assertTrue(self.target_file.is_symlink())
+        self.assertEqual(self.target_file.resolve(), self.source_file.resolve())
+        self.assertEqual(
+            self.target_path.joinpath("Linked/Foo.schelp").read_text(), "foo"
+        )
+        self.assertFalse(self.target_path.joinpath("Classes/Loop").exists())
+
+    def test_hardlink_fallback(self):
+        with mock.patch.object(Path, "symlink_to", side_effect=OSError()):
+            ProjectRepo._link_tree(self.source_path, self.target_path)
+        self.assertFalse(self.target_file.is_symlink())
+        self.assertTrue(self.target_file.samefile(self.source_file))
+
+    def test_copy_fallback(self):
+        with mock.patch.object(
+            Path, "symlink_to", side_effect=OSError()
+        ), mock.patch.object(os, "link", side_effect=OSError()):
+            ProjectRepo._link_tree(self.source_path, self.target_path)
+        self.assertFalse(self.target_file.is_symlink())
+        self.assertFalse(self.target_file.samefile(self.source_file))
+        self.assertEqual(self.target_file.read_text(), "foo")
+
+    def test_replace_existing_files(self):
+        self.target_file.parent.mkdir(parents=True)
+        self.target_file.write_text("outdated")
+        ProjectRepo._link_tree(self.source_path, self.target_path)
+        self.assertEqual(self.target_file.read_text(), "foo")
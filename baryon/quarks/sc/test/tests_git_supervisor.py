@@ -0,0 +1,80 @@
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from ..git_supervisor import *
+
+
+class GitSupervisorTestCase(SimpleTestCase):
+    # an alias which spawns a child process, like git does for ssh or https
+    HANG = ["-c", "alias.hang=!sleep 30", "hang"]
+
+    def test_command(self):
+        self.assertEqual(
+            GitCall(args=("--no-pager", "log", "-n", "1"), cwd=Path()).command, "log"
+        )
+        self.assertEqual(GitCall(args=tuple(self.HANG), cwd=Path()).command, "hang")
+
+    async def test_env(self):
+        supervisor = GitSupervisor()
+        output = await supervisor.run(
+            "-c", "alias.prompt=!echo $GIT_TERMINAL_PROMPT", "prompt", cwd=Path.cwd()
+        )
+        self.assertEqual(output, "0\n")
+
+    async def test_timeout(self):
+        supervisor = GitSupervisor(timeouts={"hang": 0.5})
+        start = time.monotonic()
+        # the child process of the alias gets killed as well, otherwise
+        # it would keep the pipes open and this would block until it exits
+        with self.assertRaises(GitTimeout):
+            await supervisor.run(*self.HANG, cwd=Path.cwd())
+        self.assertLess(time.monotonic() - start, 10.0)
+        self.assertEqual(supervisor.counts["timeouts"], 1)
+        # local commands are not retried
+        self.assertEqual(supervisor.counts["retries"], 0)
+
+    async def test_retry(self):
+        supervisor = GitSupervisor(max_retries=2, backoff=0.0)
+        retries = []
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with self.assertRaises(GitError) as e, self.assertLogs(
+                "quarks.sc.git_supervisor", level="WARNING"
+            ):
+                await supervisor.run(
+                    "ls-remote",
+                    str(Path(temp_dir).joinpath("missing")),
+                    cwd=Path(temp_dir),
+                    before_retry=lambda: retries.append(True),
+                )
+        self.assertIsNotNone(e.exception.returncode)
+        self.assertEqual(len(retries), 2)
+        self.assertEqual(supervisor.counts["retries"], 2)
+        self.assertEqual(supervisor.counts["failures"], 1)
+
+    def test_network_commands(self):
+        supervisor = GitSupervisor()
+        # a reset of a partial clone downloads the blobs of the checkout
+        reset = GitCall(args=("reset", "--hard", "FETCH_HEAD"), cwd=Path())
+        self.assertEqual(
+            supervisor.timeout(reset),
+            supervisor.timeout(GitCall(args=("fetch", "origin"), cwd=Path())),
+        )
+        self.assertIn(reset.command, GitSupervisor.RETRIED_COMMANDS)
+
+    async def test_stalls(self):
+        supervisor = GitSupervisor(timeouts={"hang": 2.0}, stall_threshold=0.2)
+        call = asyncio.create_task(supervisor.run(*self.HANG, cwd=Path.cwd()))
+        await asyncio.sleep(0.5)
+        with self.assertLogs("quarks.sc.git_supervisor", level="WARNING"):
+            stalled_calls = supervisor.report_stalls()
+        self.assertEqual([c.command for c in stalled_calls], ["hang"])
+        # a stall gets only reported once
+        self.assertEqual(supervisor.report_stalls(), [])
+        call.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await call
+        self.assertEqual(supervisor.counts["stalls"], 1)
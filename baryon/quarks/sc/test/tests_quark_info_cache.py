@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from ..extractor import *
+from ..quark_info_cache import *
+from ..sclang_pool import SclangPool
+
+
+class QuarkInfoCacheTestCase(SimpleTestCase):
+    def test_build_key(self):
+        key = QuarkInfoCache.build_key(b"(name: 1)", "3.13.0")
+        self.assertEqual(key, QuarkInfoCache.build_key(b"(name: 1)", "3.13.0"))
+        self.assertNotEqual(key, QuarkInfoCache.build_key(b"(name: 2)", "3.13.0"))
+        self.assertNotEqual(key, QuarkInfoCache.build_key(b"(name: 1)", "3.14.0"))
+
+    def test_lru_eviction(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = QuarkInfoCache(Path(temp_dir), max_entries=2)
+            self.assertIsNone(cache.get("a"))
+
+            cache.set("a", {"name": "a"})
+            cache.set("b", {"name": "b"})
+            # make sure that "a" is the least recently used entry
+            os.utime(Path(temp_dir).joinpath("a.json"), (0, 0))
+            cache.set("c", {"name": "c"})
+
+            self.assertIsNone(cache.get("a"))
+            self.assertEqual(cache.get("b"), {"name": "b"})
+            self.assertEqual(cache.get("c"), {"name": "c"})
+            self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+    async def test_extract_quark_info(self):
+        quark_info = {"name": "FooBar", "dependencies": ["Bar"]}
+
+        async def run(script_path: Path, env: Dict[str, str]) -> str:
+            # writes the JSON like quarkToJson.scd does
+            Path(env["QUARK_JSON_FILE"]).write_text(json.dumps(quark_info))
+            return ""
+
+        sclang_pool = mock.Mock(spec=SclangPool)
+        sclang_pool.sclang_path = "sclang"
+        sclang_pool.run = mock.AsyncMock(side_effect=run)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_path = Path(temp_dir).joinpath("repo")
+            repo_path.mkdir()
+            # can not be parsed without sclang
+            repo_path.joinpath("FooBar.quark").write_text('(name: "Foo" ++ "Bar")')
+            cache = QuarkInfoCache(Path(temp_dir).joinpath("cache"))
+            repo = ProjectRepo(
+                project_type=ProjectType.QUARK,
+                name="FooBar",
+                url="https://github.com/supercollider-quarks/FooBar",
+                repo_path=repo_path,
+                sclang_path=Path("sclang"),
+                sclang_pool=sclang_pool,
+                quark_info_cache=cache,
+            )
+            with mock.patch.object(
+                ProjectRepo, "get_sclang_version", mock.AsyncMock(return_value="3.13.0")
+            ):
+                self.assertEqual(await repo.extract_quark_info(), quark_info)
+                self.assertEqual(sclang_pool.run.call_count, 1)
+                key = QuarkInfoCache.build_key(
+                    repo_path.joinpath("FooBar.quark").read_bytes(), "3.13.0"
+                )
+                self.assertEqual(cache.get(key), quark_info)
+
+                # the cached quark info gets returned without sclang
+                self.assertEqual(await repo.extract_quark_info(), quark_info)
+                self.assertEqual(sclang_pool.run.call_count, 1)
@@ -0,0 +1,70 @@
+from django.test import SimpleTestCase
+
+from ..quark_parser import *
+
+
+class QuarkParserTestCase(SimpleTestCase):
+    def test_parse_quark_file(self):
+        quark_info = parse_quark_file(
+            """
+            // a comment
+            (
+                name: "Foo",
+                'summary': "a multi line "
+                    "summary\\twith a \\"quote\\"",
+                version: 1.2,
+                since: 2011,
+                country: \\DE,
+                /* a /* nested */ comment */
+                dependencies: ["Bar", "Baz" -> "https://github.com/baz/baz"],
+                tags: #[synth, true],
+                isCompatible: { |a| a.notNil and: { "}".size == 1 } },
+                helpdoc: nil,
+                offset: -3,
+                meta: (nested: false),
+            );
+            """
+        )
+        self.assertEqual(
+            quark_info,
+            {
+                "name": "Foo",
+                "summary": 'a multi line summary with a "quote"',
+                "version": 1.2,
+                "since": 2011,
+                "country": "DE",
+                "dependencies": ["Bar", "Baz"],
+                "tags": ["synth", True],
+                "isCompatible": "a function",
+                "offset": -3,
+                "meta": {"nested": False},
+            },
+        )
+
+    def test_nil_values(self):
+        # an Event drops keys with a nil value, so they are missing in the
+        # JSON of sclang, but nil within an array is kept
+        self.assertEqual(
+            parse_quark_file(
+                """(
+                    name: "Foo",
+                    url: "https://github.com/foo/foo",
+                    url: nil,
+                    helpdoc: nil,
+                    tags: [nil, \\synth],
+                    meta: (author: nil),
+                )"""
+            ),
+            {"name": "Foo", "tags": [None, "synth"], "meta": {}},
+        )
+
+    def test_parse_quark_file_requires_sclang(self):
+        for text in [
+            '(name: "Foo" ++ "Bar")',
+            "(name: Platform.userHomeDir)",
+            "(version: 16rFF)",
+            '(name: "Foo"',
+            '"just a string"',
+        ]:
+            with self.assertRaises(QuarkParseError):
+                parse_quark_file(text)
@@ -0,0 +1,108 @@
+import io
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from ..repo_cache import *
+from ..scraper import ProjectScraper
+
+
+class RepoCacheTestCase(SimpleTestCase):
+    @staticmethod
+    def create_repo(path: Path, size: int, last_used: float):
+        path.joinpath(".git").mkdir(parents=True)
+        path.joinpath("data").write_bytes(os.urandom(size))
+        fetch_head = path.joinpath(".git", "FETCH_HEAD")
+        fetch_head.touch()
+        os.utime(fetch_head, (last_used, last_used))
+
+    def test_prune_and_budget(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir)
+            self.create_repo(path.joinpath("old"), 2**16, 1000)
+            self.create_repo(path.joinpath("new"), 2**16, 3000)
+            self.create_repo(path.joinpath("large"), 2**18, 2000)
+            self.create_repo(path.joinpath("unlisted"), 2**16, 4000)
+            cache = RepoCache(path)
+
+            usages = cache.usage()
+            self.assertEqual(usages[0].name, "large")
+            self.assertGreaterEqual(usages[0].size, 2**18)
+            self.assertIn("4 repos use", RepoCache.format_usage(usages))
+
+            orphans = cache.prune_orphans({"old", "new", "large"})
+            self.assertEqual([usage.name for usage in orphans], ["unlisted"])
+            self.assertFalse(path.joinpath("unlisted").exists())
+
+            # without a budget nothing gets evicted
+            self.assertEqual(cache.enforce_budget(), [])
+
+            # the least recently used repos get evicted first, even if small
+            cache.max_size = 2**18 + 2**17
+            evicted = cache.enforce_budget()
+            self.assertEqual([usage.name for usage in evicted], ["old"])
+            self.assertEqual(
+                sorted(usage.name for usage in cache.usage()), ["large", "new"]
+            )
+
+    def test_keep_locked_repo(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir)
+            self.create_repo(path.joinpath("scraped"), 2**16, 1000)
+            self.create_repo(path.joinpath("idle"), 2**16, 2000)
+            cache = RepoCache(path, max_size=0)
+
+            # e.g. held by a scrape worker
+            lock_file = cache.try_lock("scraped")
+            assert lock_file is not None
+            with lock_file:
+                self.assertIsNone(cache.try_lock("scraped"))
+                self.assertEqual(cache.prune_orphans({"idle"}), [])
+                evicted = cache.enforce_budget()
+                self.assertEqual([usage.name for usage in evicted], ["idle"])
+                self.assertTrue(path.joinpath("scraped").exists())
+            # lock files are not listed as repos
+            self.assertEqual([usage.name for usage in cache.usage()], ["scraped"])
+            self.assertEqual(
+                [usage.name for usage in cache.prune_orphans(set())], ["scraped"]
+            )
+
+    async def test_maintenance(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            repo_path = Path(temp_dir).joinpath("foo")
+            subprocess.run(
+                ["git", "init", str(repo_path)], check=True, capture_output=True
+            )
+            # does not contain a repo, so it gets skipped
+            Path(temp_dir).joinpath("broken").mkdir()
+            cache = RepoCache(Path(temp_dir))
+            with self.assertNoLogs("quarks.sc.repo_cache", level="ERROR"):
+                await cache.clean()
+            self.assertTrue(repo_path.exists())
+
+    def test_clean_command(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir)
+            self.create_repo(path.joinpath("listed"), 2**16, 1000)
+            self.create_repo(path.joinpath("unlisted"), 2**16, 2000)
+            stdout = io.StringIO()
+            with mock.patch.object(
+                ProjectScraper, "REPO_PATH", path
+            ), mock.patch.object(
+                ProjectScraper,
+                "fetch_project_names",
+                mock.AsyncMock(return_value={"listed"}),
+            ), mock.patch.object(
+                ProjectScraper, "__init__"
+            ) as init:
+                call_command("repo_cache", "--clean", stdout=stdout)
+            # the command does not need the resources of a scraper
+            init.assert_not_called()
+            self.assertTrue(path.joinpath("listed").exists())
+            self.assertFalse(path.joinpath("unlisted").exists())
+            self.assertIn("1 repos use", stdout.getvalue())
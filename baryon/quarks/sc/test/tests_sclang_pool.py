@@ -0,0 +1,174 @@
+import asyncio
+import stat
+import sys
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from ..extractor import *
+from ..sclang_pool import *
+
+# Speaks the stdin protocol of the pool like sclang does. The executed
+# "scripts" contain a single command: crash, hang, fail or the name of an
+# env variable whose value gets posted. Every start gets logged to boot_log.
+# Called with a script path it executes the script and exits, like sclang.
+FAKE_SCLANG = """#!{python}
+import os, re, sys, time
+
+with open("{boot_log}", "a") as f:
+    f.write(f"{{os.getpid()}}\\n")
+
+def execute(script_path):
+    command = open(script_path).read().strip()
+    if command == "crash":
+        sys.exit(1)
+    if command == "hang":
+        time.sleep(60)
+    if command == "fail":
+        print("ERROR: fail")
+        return False
+    print(os.environ.get(command, "nil"))
+    return True
+
+if len(sys.argv) > 3:
+    execute(sys.argv[3])
+    sys.exit(0)
+
+code = b""
+while char := sys.stdin.buffer.read(1):
+    if char != b"\\x1b":
+        code += char
+        continue
+    text, code = code.decode(), b""
+    succeeded = True
+    # the statements get executed in order
+    for key, value, unset_key, script_path in re.findall(
+        r'"(\\w+)"\\.setenv\\("([^"]*)"\\)|"(\\w+)"\\.unsetenv|executeFile\\("([^"]*)"\\)',
+        text,
+    ):
+        if key:
+            os.environ[key] = value
+        elif unset_key:
+            os.environ.pop(unset_key, None)
+        else:
+            succeeded = execute(script_path) and succeeded
+    error_sentinel, done_sentinel = re.findall(r'"(BARYON_JOB_\\w+ \\d+)"', text)
+    print(done_sentinel if succeeded else error_sentinel, flush=True)
+"""
+
+
+class SclangPoolTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.boot_log = self.temp_path.joinpath("boots")
+        self.sclang_path = self.write_fake_sclang("sclang")
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def write_fake_sclang(self, name: str) -> str:
+        sclang_path = self.temp_path.joinpath(name)
+        sclang_path.write_text(
+            FAKE_SCLANG.format(python=sys.executable, boot_log=self.boot_log)
+        )
+        sclang_path.chmod(sclang_path.stat().st_mode | stat.S_IEXEC)
+        return str(sclang_path)
+
+    def script(self, command: str) -> Path:
+        script_path = self.temp_path.joinpath(f"{command}.scd")
+        script_path.write_text(command)
+        return script_path
+
+    @property
+    def num_boots(self) -> int:
+        if not self.boot_log.exists():
+            return 0
+        return len(self.boot_log.read_text().split())
+
+    async def test_run(self):
+        pool = SclangPool(size=1, sclang_path=self.sclang_path)
+        try:
+            self.assertEqual(
+                await pool.run(self.script("FOO"), env={"FOO": "bar"}), "bar\n"
+            )
+            # env variables do not leak into the next job
+            self.assertEqual(await pool.run(self.script("FOO"), env={}), "nil\n")
+        finally:
+            await pool.close()
+        self.assertEqual(self.num_boots, 1)
+
+    async def test_error(self):
+        pool = SclangPool(size=1, sclang_path=self.sclang_path)
+        try:
+            with self.assertRaisesRegex(SclangError, "ERROR: fail"):
+                await pool.run(self.script("fail"), env={})
+            # a failed script does not affect the interpreter
+            self.assertEqual(await pool.run(self.script("FOO"), env={}), "nil\n")
+        finally:
+            await pool.close()
+        self.assertEqual(self.num_boots, 1)
+
+    async def test_restart_after_crash(self):
+        pool = SclangPool(size=1, sclang_path=self.sclang_path)
+        try:
+            with self.assertRaisesRegex(SclangError, "terminated unexpectedly"):
+                await pool.run(self.script("crash"), env={})
+            self.assertEqual(await pool.run(self.script("FOO"), env={}), "nil\n")
+        finally:
+            await pool.close()
+        self.assertEqual(self.num_boots, 2)
+
+    async def test_timeout(self):
+        pool = SclangPool(size=1, sclang_path=self.sclang_path, timeout=0.5)
+        try:
+            with self.assertRaises(TimeoutError):
+                await pool.run(self.script("hang"), env={})
+            # the hanging interpreter gets replaced
+            self.assertEqual(await pool.run(self.script("FOO"), env={}), "nil\n")
+        finally:
+            await pool.close()
+        self.assertEqual(self.num_boots, 2)
+
+    async def test_recycle(self):
+        pool = SclangPool(size=1, sclang_path=self.sclang_path, max_jobs_per_worker=2)
+        try:
+            for _ in range(3):
+                await pool.run(self.script("FOO"), env={})
+        finally:
+            await pool.close()
+        self.assertEqual(self.num_boots, 2)
+
+    async def test_close(self):
+        pool = SclangPool(size=2, sclang_path=self.sclang_path)
+        await asyncio.gather(*[pool.run(self.script("FOO"), env={}) for _ in range(2)])
+        self.assertEqual(self.num_boots, 2)
+        await pool.close()
+        for worker in pool._workers:
+            self.assertFalse(worker.is_alive)
+
+    async def test_repo_sclang_path(self):
+        pool = SclangPool(size=1, sclang_path=self.sclang_path)
+        pool_repo, own_sclang_repo = [
+            ProjectRepo(
+                project_type=ProjectType.EXTENSION,
+                name="test",
+                url="https://github.com/supercollider/test",
+                repo_path=self.temp_path,
+                sclang_path=Path(sclang_path),
+                sclang_pool=pool,
+            )
+            for sclang_path in [self.sclang_path, self.write_fake_sclang("sclang-2")]
+        ]
+        try:
+            await pool_repo._sclang(self.script("FOO"), env={"FOO": "pool"})
+            # a repo with its own sclang does not use the interpreters of the pool
+            self.assertEqual(
+                await own_sclang_repo._sclang(self.script("FOO"), env={"FOO": "own"}),
+                "own\n",
+            )
+        finally:
+            await pool.close()
+        self.assertEqual(pool_repo.subprocess_counts, {"sclang job": 1})
+        self.assertEqual(own_sclang_repo.subprocess_counts, {"sclang": 1})
@@ -0,0 +1,35 @@
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from ..scrape_checkpoint import *
+
+
+class ScrapeCheckpointTestCase(SimpleTestCase):
+    def test_resume(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir).joinpath("checkpoint.json")
+            self.assertIsNone(ScrapeCheckpoint.load(path))
+
+            checkpoint = ScrapeCheckpoint(path)
+            checkpoint.mark_done("foo")
+
+            # an interrupted run keeps its finished projects
+            loaded_checkpoint = ScrapeCheckpoint.load(path)
+            assert loaded_checkpoint is not None
+            self.assertFalse(loaded_checkpoint.is_finished)
+            self.assertTrue(loaded_checkpoint.is_done("foo"))
+            self.assertFalse(loaded_checkpoint.is_done("bar"))
+            self.assertEqual(loaded_checkpoint.started, checkpoint.started)
+
+            checkpoint.finish()
+            loaded_checkpoint = ScrapeCheckpoint.load(path)
+            assert loaded_checkpoint is not None
+            self.assertTrue(loaded_checkpoint.is_finished)
+
+    def test_broken_checkpoint(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir).joinpath("checkpoint.json")
+            path.write_text("{")
+            self.assertIsNone(ScrapeCheckpoint.load(path))
@@ -0,0 +1,31 @@
+from django.test import SimpleTestCase
+
+from ..scrape_report import *
+
+
+class ScrapeReportTestCase(SimpleTestCase):
+    def test_percentile(self):
+        values = [float(i) for i in range(1, 101)]
+        self.assertEqual(ScrapeReport.percentile(values, 50), 50.0)
+        self.assertEqual(ScrapeReport.percentile(values, 99), 99.0)
+        self.assertEqual(ScrapeReport.percentile([3.0], 90), 3.0)
+        self.assertEqual(ScrapeReport.percentile([], 90), 0.0)
+
+    def test_summary(self):
+        report = ScrapeReport()
+        report.start()
+        report.add_timing("fast", "git", 0.5, failed=False)
+        report.add_timing("slow", "git", 2.0, failed=False)
+        report.add_timing("slow", "sclang", 10.0, failed=True)
+        report.add_subprocess_counts("slow", collections.Counter({"git": 3}))
+        report.finish()
+
+        stats = report.to_dict()
+        self.assertEqual(stats["stages"]["git"]["count"], 2)
+        self.assertEqual(stats["stages"]["sclang"]["failed"], 1)
+        self.assertEqual(stats["projects"]["slow"]["subprocesses"], {"git": 3})
+        self.assertGreater(stats["peak_rss"]["scraper"], 0)
+
+        summary = report.format_summary(num_slowest=1)
+        self.assertIn("slow", summary)
+        self.assertNotIn("fast", summary)
@@ -0,0 +1,65 @@
+from django.test import SimpleTestCase
+
+from ..scrape_scheduler import *
+
+
+class ScrapeSchedulerTestCase(SimpleTestCase):
+    def setUp(self) -> None:
+        self.now = datetime(2024, 1, 1, tzinfo=pytz.utc)
+        self.scheduler = ScrapeScheduler()
+
+    def activity(self, commit_days_ago: float, checked_days_ago: float):
+        return ProjectActivity(
+            latest_commit=self.now - timedelta(days=commit_days_ago),
+            last_checked=self.now - timedelta(days=checked_days_ago),
+        )
+
+    def test_check_interval(self):
+        self.assertEqual(
+            self.scheduler.check_interval(self.activity(1, 0), self.now),
+            timedelta(days=1),
+        )
+        self.assertEqual(
+            self.scheduler.check_interval(self.activity(100, 0), self.now),
+            timedelta(days=10),
+        )
+        self.assertEqual(
+            self.scheduler.check_interval(self.activity(3650, 0), self.now),
+            timedelta(days=90),
+        )
+
+    def test_rank(self):
+        activities = {
+            # active and checked three days ago
+            "active": self.activity(commit_days_ago=5, checked_days_ago=3),
+            # dormant for ten years and checked a month ago
+            "dormant": self.activity(commit_days_ago=3650, checked_days_ago=30),
+            # dormant but not checked for half a year
+            "forgotten": self.activity(commit_days_ago=3650, checked_days_ago=180),
+            "recent": self.activity(commit_days_ago=50, checked_days_ago=1),
+        }
+        self.assertEqual(
+            self.scheduler.rank(
+                ["dormant", "forgotten", "active", "recent", "new"],
+                activities,
+                self.now,
+            ),
+            ["new", "active", "forgotten"],
+        )
+
+    def test_daily_schedule(self):
+        # checked by the run of the previous night, which took longer
+        activities = {
+            "active": ProjectActivity(
+                latest_commit=self.now - timedelta(days=2),
+                last_checked=self.now - timedelta(hours=23, minutes=59),
+            ),
+            "just_checked": ProjectActivity(
+                latest_commit=self.now - timedelta(days=2),
+                last_checked=self.now - timedelta(hours=1),
+            ),
+        }
+        self.assertEqual(
+            self.scheduler.rank(["active", "just_checked"], activities, self.now),
+            ["active"],
+        )
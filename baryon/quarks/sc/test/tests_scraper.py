@@ -0,0 +1,388 @@
+import tempfile
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pytz
+from django.db import DatabaseError
+from django.test import TestCase
+from django.utils import timezone
+
+from ...models import *
+from ..extractor import *
+from ..repo_cache import RepoCache, RepoLocked
+from ..scraper import *
+
+
+class SyncProjectTestCase(TestCase):
+    def setUp(self) -> None:
+        self.project = Project.objects.create(
+            name="test",
+            git_url="https://github.com/supercollider-quarks/test",
+            project_type=Project.ProjectType.QUARK,
+        )
+
+    def sync(
+        self,
+        class_names: List[str],
+        super_class: Optional[str] = None,
+        doc_names: Optional[Sequence[str]] = (),
+    ):
+        ProjectScraper.sync_project(
+            self.project,
+            versions=[
+                ProjectVersion(
+                    project=self.project,
+                    version_name="v1.0",
+                    release_date=datetime(2020, 1, 1, tzinfo=pytz.utc),
+                    git_hash="abc",
+                )
+            ],
+            classes=[
+                ProjectClass(
+                    project=self.project,
+                    name=name,
+                    file_path=f"classes/{name}.sc",
+                    super_class=super_class,
+                )
+                for name in class_names
+            ],
+            docs=[
+                ProjectDoc(
+                    project=self.project,
+                    source_path=f"HelpSource/Classes/{name}.schelp",
+                    html_file=f"sc_docs/test/Classes/{name}.html",
+                )
+                for name in doc_names
+            ]
+            if doc_names is not None
+            else None,
+        )
+
+    def test_sync_project(self):
+        self.sync(["Foo", "Bar"])
+        self.assertEqual(
+            sorted(self.project.classes.values_list("name", flat=True)),
+            ["Bar", "Foo"],
+        )
+        self.assertEqual(self.project.versions.count(), 1)
+
+        bar_pk = self.project.classes.get(name="Bar").pk
+        self.sync(["Bar", "Baz"], super_class="Object")
+        self.assertEqual(
+            sorted(self.project.classes.values_list("name", flat=True)),
+            ["Bar", "Baz"],
+        )
+        bar = self.project.classes.get(name="Bar")
+        self.assertEqual(bar.pk, bar_pk)
+        self.assertEqual(bar.super_class, "Object")
+
+    def test_keep_docs_of_failed_build(self):
+        self.sync(["Foo"], doc_names=["Foo"])
+        self.sync(["Foo"], doc_names=None)
+        self.assertEqual(
+            list(self.project.docs.values_list("source_path", flat=True)),
+            ["HelpSource/Classes/Foo.schelp"],
+        )
+        self.sync(["Foo"], doc_names=[])
+        self.assertFalse(self.project.docs.exists())
+
+    def test_sync_unchanged_project(self):
+        self.sync(["Foo", "Bar"])
+        # savepoint, save of project, a select per related model, the new
+        # generation and release
+        with self.assertNumQueries(7):
+            self.sync(["Foo", "Bar"])
+
+
+class PipelineTestCase(TestCase):
+    class FakeScraper(ProjectScraper):
+        def __init__(self, **kwargs) -> None:
+            super().__init__(**kwargs)
+            self.synced: List[str] = []
+            self.running_sclang_jobs = 0
+            self.max_running_sclang_jobs = 0
+
+        async def _git_stage(self, scrape: ProjectScrape):
+            if scrape.repo.name == "broken":
+                raise RepoUnavailable()
+
+        def _analysis_stage(self, scrape: ProjectScrape):
+            pass
+
+        async def _sclang_stage(self, scrape: ProjectScrape):
+            self.running_sclang_jobs += 1
+            self.max_running_sclang_jobs = max(
+                self.max_running_sclang_jobs, self.running_sclang_jobs
+            )
+            await asyncio.sleep(0.001)
+            self.running_sclang_jobs -= 1
+
+        async def _links_stage(self, scrape: ProjectScrape):
+            pass
+
+        async def _db_stage(self, scrape: ProjectScrape):
+            self.synced.append(scrape.repo.name)
+
+    async def test_pipeline(self):
+        scraper = self.FakeScraper(num_sclang_instances=2)
+        names = [f"quark{i}" for i in range(20)] + ["broken"]
+
+        async def scrapes():
+            for name in names:
+                yield ProjectScrape(
+                    repo=ProjectRepo(
+                        project_type=ProjectType.QUARK,
+                        name=name,
+                        url=f"https://github.com/supercollider-quarks/{name}",
+                        repo_path=Path(name),
+                    )
+                )
+
+        await scraper._run_pipeline(scrapes())
+        scraper.process_pool.shutdown()
+
+        # a failed project must not stop the others
+        self.assertEqual(sorted(scraper.synced), sorted(names[:-1]))
+        self.assertEqual(scraper.max_running_sclang_jobs, 2)
+        stages = scraper.report.to_dict()["stages"]
+        self.assertEqual(stages["git"]["count"], 21)
+        self.assertEqual(stages["git"]["failed"], 1)
+        self.assertEqual(stages["db"]["count"], 20)
+
+    async def test_failed_job_bookkeeping(self):
+        scraper = self.FakeScraper()
+        names = ["broken", "quark"]
+
+        async def scrapes():
+            for name in names:
+                yield ProjectScrape(
+                    repo=ProjectRepo(
+                        project_type=ProjectType.QUARK,
+                        name=name,
+                        url=f"https://github.com/supercollider-quarks/{name}",
+                        repo_path=Path(name),
+                    ),
+                    job=ScrapeJob(name=name),
+                )
+
+        with mock.patch.object(
+            ScrapeJob, "fail", side_effect=DatabaseError()
+        ), self.assertLogs("quarks.sc.scraper", level="ERROR") as logs:
+            await scraper._run_pipeline(scrapes())
+        scraper.process_pool.shutdown()
+
+        self.assertEqual(scraper.synced, ["quark"])
+        self.assertIn("Could not mark job of broken", logs.output[-1])
+
+
+class FilterChangedTestCase(TestCase):
+    def setUp(self) -> None:
+        self.scraper = ProjectScraper()
+        self.repos = {
+            name: ProjectRepo(
+                project_type=ProjectType.QUARK,
+                name=name,
+                url=f"https://github.com/supercollider-quarks/{name}",
+                repo_path=Path(name),
+            )
+            for name in ["unchanged", "pushed", "tagged", "new"]
+        }
+        self.remote_refs = {
+            name: RemoteRefs(head=f"{name}-head", tags={"v1.0": f"{name}-tag"})
+            for name in self.repos
+        }
+        for name in ["unchanged", "pushed", "tagged"]:
+            self.create_project(name, self.remote_refs[name])
+        self.remote_refs["pushed"].head = "new-head"
+        self.remote_refs["tagged"].tags["v1.1"] = "new-tag"
+
+    def tearDown(self) -> None:
+        self.scraper.process_pool.shutdown()
+
+    def create_project(self, name: str, remote_refs: RemoteRefs) -> Project:
+        return Project.objects.create(
+            name=name,
+            git_url=f"https://github.com/supercollider-quarks/{name}",
+            project_type=Project.ProjectType.QUARK,
+            last_scraped_commit=remote_refs.head,
+            last_scraped_tags=remote_refs.tags_fingerprint,
+        )
+
+    async def filter_changed(self) -> List[str]:
+        async def get_remote_refs(repo: ProjectRepo) -> RemoteRefs:
+            repo.remote_refs = self.remote_refs[repo.name]
+            return repo.remote_refs
+
+        with mock.patch.object(ProjectRepo, "get_remote_refs", get_remote_refs):
+            repos = await self.scraper._filter_changed(list(self.repos.values()))
+        return [repo.name for repo in repos]
+
+    async def test_skip_unchanged(self):
+        self.assertEqual(await self.filter_changed(), ["pushed", "tagged", "new"])
+        unchanged = await Project.objects.aget(name="unchanged")
+        self.assertIsNotNone(unchanged.last_checked_date)
+
+    async def test_force(self):
+        self.scraper.force = True
+        self.assertEqual(await self.filter_changed(), list(self.repos.keys()))
+
+    async def test_failed_sclang_step(self):
+        repo = self.repos["unchanged"]
+        repo.remote_refs = self.remote_refs["unchanged"]
+        project = await Project.objects.aget(name="unchanged")
+        project.quark_info = {"dependencies": ["Bar"]}
+        scrape = ProjectScrape(repo=repo, project=project)
+        with mock.patch.object(
+            ProjectRepo,
+            "extract_quark_info",
+            mock.AsyncMock(side_effect=SclangError("boot failed")),
+        ), mock.patch.object(
+            ProjectRepo, "build_docs", mock.AsyncMock(return_value=[])
+        ), self.assertLogs(
+            "quarks.sc.scraper", level="ERROR"
+        ):
+            await self.scraper._sclang_stage(scrape)
+        await self.scraper._db_stage(scrape)
+
+        project = await Project.objects.aget(name="unchanged")
+        self.assertEqual(project.quark_info, {"dependencies": ["Bar"]})
+        self.assertIsNone(project.last_scraped_commit)
+        # the project gets scraped again although its remote did not change
+        self.assertIn("unchanged", await self.filter_changed())
+
+
+class ScrapeJobTestCase(TestCase):
+    def create_job(self, name: str, priority: float = 0.0) -> ScrapeJob:
+        return ScrapeJob.objects.create(
+            name=name,
+            git_url=f"https://github.com/supercollider-quarks/{name}",
+            project_type=Project.ProjectType.QUARK,
+            priority=priority,
+        )
+
+    def test_claim(self):
+        self.create_job("low", priority=1.0)
+        self.create_job("high", priority=2.0)
+        self.create_job("later")
+        ScrapeJob.objects.filter(name="later").update(
+            scheduled_for=timezone.now() + timedelta(hours=1)
+        )
+
+        jobs = ScrapeJob.claim("worker-a", limit=1)
+        self.assertEqual([job.name for job in jobs], ["high"])
+        self.assertEqual(jobs[0].status, ScrapeJob.Status.RUNNING)
+        self.assertEqual(jobs[0].claimed_by, "worker-a")
+        self.assertEqual(jobs[0].attempts, 1)
+
+        # claimed and scheduled jobs are not handed out again
+        jobs = ScrapeJob.claim("worker-b", limit=10)
+        self.assertEqual([job.name for job in jobs], ["low"])
+        self.assertEqual(ScrapeJob.claim("worker-c", limit=10), [])
+
+    def test_reclaim_abandoned_job(self):
+        self.create_job("foo")
+        [job] = ScrapeJob.claim("worker-a", limit=1)
+        ScrapeJob.objects.filter(pk=job.pk).update(
+            claimed_date=timezone.now() - ScrapeJob.CLAIM_TIMEOUT * 2
+        )
+        [job] = ScrapeJob.claim("worker-b", limit=1)
+        self.assertEqual(job.claimed_by, "worker-b")
+        self.assertEqual(job.attempts, 2)
+
+    def test_claim_running_project(self):
+        self.create_job("foo")
+        [running_job] = ScrapeJob.claim("worker-a", limit=1)
+        # e.g. queued by a webhook while the project is being scraped
+        self.create_job("foo")
+        self.assertEqual(ScrapeJob.claim("worker-b", limit=10), [])
+
+        running_job.finish()
+        [job] = ScrapeJob.claim("worker-b", limit=10)
+        self.assertNotEqual(job.pk, running_job.pk)
+
+    def test_fail_with_pending_job(self):
+        self.create_job("foo")
+        [job] = ScrapeJob.claim("worker", limit=1)
+        pending_job = self.create_job("foo")
+        job.fail("error")
+        # the pending job covers the retry
+        self.assertEqual(job.status, ScrapeJob.Status.FAILED)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ScrapeJob.Status.FAILED)
+        pending_job.refresh_from_db()
+        self.assertEqual(pending_job.status, ScrapeJob.Status.PENDING)
+
+    def test_fail(self):
+        self.create_job("foo")
+        for _ in range(ScrapeJob.MAX_ATTEMPTS - 1):
+            ScrapeJob.objects.update(scheduled_for=timezone.now())
+            [job] = ScrapeJob.claim("worker", limit=1)
+            job.fail("error")
+            self.assertEqual(job.status, ScrapeJob.Status.PENDING)
+            self.assertGreater(job.scheduled_for, timezone.now())
+
+        ScrapeJob.objects.update(scheduled_for=timezone.now())
+        [job] = ScrapeJob.claim("worker", limit=1)
+        job.fail("error")
+        self.assertEqual(job.status, ScrapeJob.Status.FAILED)
+
+    def test_postpone(self):
+        self.create_job("foo")
+        [job] = ScrapeJob.claim("worker", limit=1)
+        job.postpone(timedelta(minutes=30))
+        job.refresh_from_db()
+        self.assertEqual(job.status, ScrapeJob.Status.PENDING)
+        self.assertEqual(job.attempts, 0)
+        self.assertGreater(job.scheduled_for, timezone.now())
+
+        ScrapeJob.objects.update(scheduled_for=timezone.now())
+        [job] = ScrapeJob.claim("worker", limit=1)
+        pending_job = self.create_job("foo")
+        job.postpone(timedelta(minutes=30))
+        # the pending job covers the scrape
+        self.assertEqual(job.status, ScrapeJob.Status.DONE)
+        pending_job.refresh_from_db()
+        self.assertEqual(pending_job.status, ScrapeJob.Status.PENDING)
+
+    async def test_locked_repo(self):
+        await sync_to_async(self.create_job)("foo")
+        [job] = await sync_to_async(ScrapeJob.claim)("worker", limit=1)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            scraper = ProjectScraper()
+            scraper.repo_cache = RepoCache(Path(temp_dir))
+            repo = scraper._repo_from_job(job)
+            # e.g. the repo is scraped by the nightly run
+            lock_file = scraper.repo_cache.try_lock("foo")
+            scrape = ProjectScrape(repo=repo, job=job)
+            with self.assertRaises(RepoLocked):
+                await scraper._git_stage(scrape)
+            await scraper._on_scrape_failed(scrape, RepoLocked())
+            scraper.process_pool.shutdown()
+            assert lock_file is not None
+            lock_file.close()
+        await job.arefresh_from_db()
+        self.assertEqual(job.status, ScrapeJob.Status.PENDING)
+        self.assertEqual(job.attempts, 0)
+
+    def test_enqueue(self):
+        repos = [
+            ProjectRepo(
+                project_type=ProjectType.EXTENSION,
+                name=name,
+                url=f"https://github.com/supercollider/{name}",
+                repo_path=Path(name),
+                src_path_patterns=["source/**/sc"],
+            )
+            for name in ["foo", "bar"]
+        ]
+        scraper = ProjectScraper()
+        self.assertEqual(scraper._enqueue_jobs(repos), 2)
+        # pending jobs are not queued twice but get the new priority
+        self.assertEqual(scraper._enqueue_jobs(repos[::-1]), 0)
+        scraper.process_pool.shutdown()
+
+        [job, _] = ScrapeJob.claim("worker", limit=2)
+        self.assertEqual(job.name, "bar")
+        repo = scraper._repo_from_job(job)
+        self.assertEqual(repo.project_type, ProjectType.EXTENSION)
+        self.assertEqual(repo.src_path_patterns, ["source/**/sc"])
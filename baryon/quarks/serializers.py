@@ -1,8 +1,15 @@
+import dataclasses
 from typing import Optional
 
 import django_filters
+from drf_yasg.utils import swagger_auto_schema
 from rest_framework import filters, serializers, viewsets
+from rest_framework.decorators import action
+from rest_framework.request import Request
+from rest_framework.response import Response
 
+from .class_index import ClassIndex, ClassResolver
+from .install_plan import DependencyGraph
 from .models import Project, ProjectClass, ProjectDoc, ProjectVersion
 
 
@@ -39,6 +46,12 @@ class ProjectDetailSerializer(serializers.HyperlinkedModelSerializer):
     versions = ProjectVersionSerializer(many=True, read_only=True)
     classes = ProjectClassSerializer(many=True, read_only=True)
     docs = ProjectDocSerializer(many=True, read_only=True)
+    dependencies = serializers.SlugRelatedField(
+        slug_field="name", many=True, read_only=True
+    )
+    dependents = serializers.SlugRelatedField(
+        slug_field="name", many=True, read_only=True
+    )
 
     class Meta:
         model = Project
@@ -51,6 +64,8 @@ class ProjectDetailSerializer(serializers.HyperlinkedModelSerializer):
             "versions",
             "classes",
             "docs",
+            "dependencies",
+            "dependents",
         ]
 
 
@@ -70,6 +85,19 @@ class ProjectSerializer(serializers.HyperlinkedModelSerializer):
         ]
 
 
+class PlannedProjectSerializer(serializers.Serializer):
+    name = serializers.CharField()
+    project_type = serializers.CharField()
+
+
+class InstallPlanSerializer(serializers.Serializer):
+    project = serializers.CharField()
+    install_order = PlannedProjectSerializer(many=True)
+    cycles = serializers.ListField(
+        child=serializers.ListField(child=serializers.CharField())
+    )
+
+
 class ProjectViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Project.objects.all()
 
@@ -86,6 +114,16 @@ class ProjectViewSet(viewsets.ReadOnlyModelViewSet):
     ]
     search_fields = ["name"]
 
+    @swagger_auto_schema(responses={200: InstallPlanSerializer})
+    @action(detail=True, url_path="install-plan")
+    def install_plan(self, request: Request, name: str) -> Response:
+        """Returns all transitive dependencies of the project in the order
+        in which they need to be installed, followed by the project itself.
+        """
+        project = self.get_object()
+        plan = DependencyGraph.get().install_plan(project)
+        return Response(InstallPlanSerializer(plan).data)
+
 
 class QuarkViewSet(ProjectViewSet):
     queryset = Project.objects.filter(project_type=Project.ProjectType.QUARK)
@@ -93,3 +131,101 @@ class QuarkViewSet(ProjectViewSet):
 
 class ExtensionViewSet(ProjectViewSet):
     queryset = Project.objects.filter(project_type=Project.ProjectType.EXTENSION)
+
+
+class ClassResolveSerializer(serializers.Serializer):
+    # enough for all classes used by a large code base
+    MAX_NAMES = 5000
+
+    names = serializers.ListField(
+        child=serializers.CharField(max_length=400),
+        allow_empty=False,
+        max_length=MAX_NAMES,
+    )
+
+
+class ClassDefinitionSerializer(serializers.Serializer):
+    project = serializers.CharField()
+    project_type = serializers.CharField()
+    is_extension = serializers.BooleanField()
+    super_class = serializers.CharField(allow_null=True)
+    file_path = serializers.CharField()
+
+
+class ClassResolveResponseSerializer(serializers.Serializer):
+    classes = serializers.DictField(child=ClassDefinitionSerializer(many=True))
+    unresolved = serializers.ListField(child=serializers.CharField())
+
+
+class ClassAutocompleteQuerySerializer(serializers.Serializer):
+    MAX_LIMIT = 50
+
+    q = serializers.CharField(allow_blank=True, default="")
+    limit = serializers.IntegerField(default=10)
+
+    def validate_limit(self, value: int) -> int:
+        return min(max(value, 0), self.MAX_LIMIT)
+
+
+class ClassAutocompleteResultSerializer(serializers.Serializer):
+    name = serializers.CharField()
+    super_class = serializers.CharField(allow_null=True)
+    is_extension = serializers.BooleanField()
+    project = serializers.CharField(source="project.name")
+    url = serializers.CharField(source="project.get_absolute_url")
+
+
+class ClassAutocompleteResponseSerializer(serializers.Serializer):
+    results = ClassAutocompleteResultSerializer(many=True)
+
+
+class ClassViewSet(viewsets.GenericViewSet):
+    serializer_class = ClassResolveSerializer
+    # the classes get looked up via in-memory indices instead of a queryset
+    filter_backends: list = []
+
+    @swagger_auto_schema(
+        query_serializer=ClassAutocompleteQuerySerializer,
+        responses={200: ClassAutocompleteResponseSerializer},
+    )
+    @action(detail=False)
+    def autocomplete(self, request: Request) -> Response:
+        """Returns the best matching classes of a search term, fast enough
+        to be requested on every keystroke.
+        """
+        query = ClassAutocompleteQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        pks = ClassIndex.get().search(
+            query.validated_data["q"], limit=query.validated_data["limit"]
+        )
+        classes = ProjectClass.objects.select_related("project").in_bulk(pks)
+        return Response(
+            ClassAutocompleteResponseSerializer(
+                # classes which got deleted since the index was built are skipped
+                {"results": [classes[pk] for pk in pks if pk in classes]}
+            ).data
+        )
+
+    @swagger_auto_schema(responses={200: ClassResolveResponseSerializer})
+    @action(detail=False, methods=["post"])
+    def resolve(self, request: Request) -> Response:
+        """Returns the projects which declare or extend each of the given
+        class names, so all classes of a code base can be resolved at once.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        definitions = ClassResolver.get().resolve(serializer.validated_data["names"])
+        return Response(
+            {
+                "classes": {
+                    name: [dataclasses.asdict(d) for d in name_definitions]
+                    for name, name_definitions in definitions.items()
+                    if name_definitions
+                },
+                "unresolved": [
+                    name
+                    for name, name_definitions in definitions.items()
+                    if not name_definitions
+                ],
+            }
+        )
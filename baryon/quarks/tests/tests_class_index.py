@@ -0,0 +1,70 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from ..class_index import *
+from ..models import *
+
+
+class ClassIndexTestCase(TestCase):
+    def setUp(self) -> None:
+        self.project = Project.objects.create(
+            name="foo",
+            git_url="https://github.com/supercollider-quarks/foo",
+            project_type=Project.ProjectType.QUARK,
+        )
+        for name in ["Pbind", "PbindFx", "Pdef", "MyPbind", "Pbindef"]:
+            ProjectClass.objects.create(
+                project=self.project, name=name, file_path=f"{name}.sc"
+            )
+        # the classes were not written by a scrape
+        ProjectGeneration.bump()
+
+    def names(self, pks) -> List[str]:
+        return [c.name for c in ClassSearchResults(pks)[:]]
+
+    def test_search(self):
+        index = ClassIndex.build()
+        # prefix matches first, shorter names first
+        self.assertEqual(
+            self.names(index.search("pbind")),
+            ["Pbind", "Pbindef", "PbindFx", "MyPbind"],
+        )
+        self.assertEqual(
+            self.names(index.search("pbind", limit=2)), ["Pbind", "Pbindef"]
+        )
+        # fuzzy matches of a typo
+        self.assertEqual(self.names(index.search("Pbindeff"))[0], "Pbindef")
+        self.assertEqual(index.search("Routine"), [])
+        self.assertEqual(index.search(" "), [])
+
+    def test_rebuild(self):
+        index = ClassIndex.get()
+        self.assertIs(ClassIndex.get(), index)
+        ProjectClass.objects.create(
+            project=self.project, name="Pbindf", file_path="Pbindf.sc"
+        )
+        # a scrape starts a new generation
+        ProjectGeneration.bump()
+        new_index = ClassIndex.get()
+        self.assertIsNot(new_index, index)
+        self.assertIn("Pbindf", self.names(new_index.search("pbindf")))
+
+    def test_autocomplete(self):
+        response = self.client.get(
+            reverse("class-autocomplete"), {"q": "pde", "limit": 3}
+        )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual([r["name"] for r in results], ["Pdef"])
+        self.assertEqual(results[0]["project"], "foo")
+        self.assertEqual(results[0]["url"], self.project.get_absolute_url())
+
+        response = self.client.get(reverse("class-autocomplete"), {"limit": "x"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_classes_view(self):
+        response = self.client.get(reverse("classes"), {"search": "bind"})
+        self.assertEqual(
+            [c.name for c in response.context["classes"]],
+            ["Pbind", "Pbindef", "PbindFx", "MyPbind"],
+        )
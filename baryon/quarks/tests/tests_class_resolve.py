@@ -0,0 +1,56 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import *
+
+
+class ClassResolveTestCase(TestCase):
+    def setUp(self) -> None:
+        for name, classes in [
+            ("foo", [("Foo", "Object", False), ("String", None, True)]),
+            ("bar", [("Bar", "Foo", False), ("Foo", None, True)]),
+        ]:
+            project = Project.objects.create(
+                name=name,
+                git_url=f"https://github.com/supercollider-quarks/{name}",
+                project_type=Project.ProjectType.QUARK,
+            )
+            for class_name, super_class, is_extension in classes:
+                ProjectClass.objects.create(
+                    project=project,
+                    name=class_name,
+                    super_class=super_class,
+                    is_extension=is_extension,
+                    file_path=f"{class_name}.sc",
+                )
+        # the classes were not written by a scrape
+        ProjectGeneration.bump()
+
+    def test_resolve(self):
+        response = self.client.post(
+            reverse("class-resolve"),
+            {"names": ["Foo", "Bar", "Baz"]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        classes = response.json()["classes"]
+        self.assertEqual(list(classes.keys()), ["Foo", "Bar"])
+        # the declaration comes before the extensions
+        self.assertEqual(
+            [(d["project"], d["is_extension"]) for d in classes["Foo"]],
+            [("foo", False), ("bar", True)],
+        )
+        self.assertEqual(classes["Bar"][0]["super_class"], "Foo")
+        self.assertEqual(response.json()["unresolved"], ["Baz"])
+
+    def test_invalid(self):
+        for payload in [{}, {"names": []}, {"names": "Foo"}]:
+            response = self.client.post(
+                reverse("class-resolve"), payload, content_type="application/json"
+            )
+            self.assertEqual(response.status_code, 400)
+
+    def test_schema(self):
+        response = self.client.get(reverse("schema-json", kwargs={"format": ".json"}))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("/classes/resolve/", response.json()["paths"])
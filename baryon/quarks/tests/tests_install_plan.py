@@ -0,0 +1,90 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from ..install_plan import *
+from ..models import *
+from ..sc.scraper import ProjectScraper
+
+
+class InstallPlanTestCase(TestCase):
+    def setUp(self) -> None:
+        # foo -> bar -> baz -> qux -> baz, foo -> baz
+        self.projects = {
+            name: Project.objects.create(
+                name=name,
+                git_url=f"https://github.com/supercollider-quarks/{name}",
+                project_type=Project.ProjectType.QUARK,
+                quark_info={"dependencies": dependencies},
+            )
+            for name, dependencies in [
+                ("foo", ["bar", "baz"]),
+                ("bar", ["baz"]),
+                ("baz", ["qux"]),
+                ("qux", ["baz"]),
+                ("solo", []),
+            ]
+        }
+        ProjectScraper.sync_dependencies()
+
+    def test_install_plan(self):
+        graph = DependencyGraph.build()
+        plan = graph.install_plan(self.projects["foo"])
+        self.assertEqual(
+            [p.name for p in plan.install_order], ["qux", "baz", "bar", "foo"]
+        )
+        self.assertEqual(plan.cycles, [["baz", "qux"]])
+        self.assertIs(graph.install_plan(self.projects["foo"]), plan)
+
+        plan = graph.install_plan(self.projects["solo"])
+        self.assertEqual([p.name for p in plan.install_order], ["solo"])
+        self.assertEqual(plan.dependencies, [])
+
+    def test_new_generation(self):
+        graph = DependencyGraph.get()
+        self.projects["solo"].quark_info = {"dependencies": ["foo"]}
+        self.projects["solo"].save()
+        ProjectScraper.sync_dependencies()
+        new_graph = DependencyGraph.get()
+        self.assertIsNot(new_graph, graph)
+        self.assertEqual(
+            len(new_graph.install_plan(self.projects["solo"]).install_order), 5
+        )
+
+    def test_project_missing_in_snapshot(self):
+        graph = DependencyGraph.build()
+        project = Project.objects.create(
+            name="new",
+            git_url="https://github.com/supercollider-quarks/new",
+            project_type=Project.ProjectType.QUARK,
+        )
+        plan = graph.install_plan(project)
+        self.assertEqual([p.name for p in plan.install_order], ["new"])
+        self.assertEqual(plan.cycles, [])
+
+    def test_admin_delete(self):
+        graph = DependencyGraph.get()
+        self.client.force_login(User.objects.create_superuser("admin"))
+        response = self.client.post(
+            reverse("admin:quarks_project_delete", args=[self.projects["solo"].pk]),
+            {"post": "yes"},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertIsNot(DependencyGraph.get(), graph)
+
+    def test_api(self):
+        response = self.client.get("/api/quarks/bar/install-plan/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [p["name"] for p in response.json()["install_order"]],
+            ["qux", "baz", "bar"],
+        )
+        self.assertEqual(response.json()["cycles"], [["baz", "qux"]])
+        self.assertEqual(
+            self.client.get("/api/quarks/missing/install-plan/").status_code, 404
+        )
+
+    def test_project_page(self):
+        response = self.client.get(reverse("project", kwargs={"name": "bar"}))
+        self.assertContains(response, "Install plan")
+        self.assertContains(response, "Cycle: baz &rarr; qux")
@@ -0,0 +1,45 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import *
+
+
+class ProjectSearchTestCase(TestCase):
+    def setUp(self) -> None:
+        for name, summary, readme in [
+            ("SuperDirt", "Sample player", "Plays samples with dirt"),
+            ("Bjorklund", "Euclidean rhythms", ""),
+            ("miSCellaneous_lib", "", "Contains a sample based granulator"),
+        ]:
+            Project.objects.create(
+                name=name,
+                git_url=f"https://github.com/supercollider-quarks/{name}",
+                project_type=Project.ProjectType.QUARK,
+                quark_info={"summary": summary},
+                project_help=readme,
+            )
+
+    def test_prefix_tsquery(self):
+        self.assertEqual(
+            ProjectQuerySet.prefix_tsquery("Super dirt"), "super:* & dirt:*"
+        )
+        # tsquery operators are dropped
+        self.assertEqual(
+            ProjectQuerySet.prefix_tsquery("a | !b & (c:*"), "a:* & b:* & c:*"
+        )
+        self.assertIsNone(ProjectQuerySet.prefix_tsquery(" & "))
+
+    def test_search(self):
+        self.assertEqual(
+            sorted(p.name for p in Project.objects.search("sample")),
+            ["SuperDirt", "miSCellaneous_lib"],
+        )
+        self.assertEqual(
+            [p.name for p in Project.objects.search("euclidean")], ["Bjorklund"]
+        )
+        # without PostgreSQL there is no search vector to maintain
+        self.assertEqual(Project.objects.update_search_vector(), 0)
+
+    def test_search_view(self):
+        response = self.client.get(reverse("quarks"), {"search": "dirt"})
+        self.assertEqual([p.name for p in response.context["projects"]], ["SuperDirt"])
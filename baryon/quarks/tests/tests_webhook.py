@@ -0,0 +1,123 @@
+import hashlib
+import hmac
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..checks import check_webhook_secret
+from ..models import *
+
+
+class ScrapeWebhookTestCase(TestCase):
+    def setUp(self) -> None:
+        self.project = Project.objects.create(
+            name="foo",
+            git_url="https://github.com/supercollider-quarks/Foo",
+            project_type=Project.ProjectType.QUARK,
+        )
+
+    def post_github(self, payload: dict, secret: str = "", event: str = "push"):
+        body = json.dumps(payload).encode()
+        signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return self.client.post(
+            reverse("webhook"),
+            data=body,
+            content_type="application/json",
+            headers={
+                "X-GitHub-Event": event,
+                "X-Hub-Signature-256": f"sha256={signature}",
+            },
+        )
+
+    def test_github_push(self):
+        payload = {
+            "ref": "refs/heads/main",
+            "repository": {
+                "html_url": "https://github.com/supercollider-quarks/Foo",
+                "ssh_url": "git@github.com:supercollider-quarks/Foo.git",
+            },
+        }
+        response = self.post_github(payload)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["project"], "foo")
+        job = ScrapeJob.objects.get()
+        self.assertEqual(job.name, "foo")
+        self.assertGreater(job.scheduled_for, job.created_date)
+
+        # a second push postpones the pending job
+        response = self.post_github(payload)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(ScrapeJob.objects.count(), 1)
+        self.assertGreaterEqual(
+            ScrapeJob.objects.get().scheduled_for, job.scheduled_for
+        )
+
+    def test_gitlab_push(self):
+        response = self.client.post(
+            reverse("webhook"),
+            data={
+                "project": {
+                    "git_ssh_url": "git@github.com:supercollider-quarks/foo.git"
+                }
+            },
+            content_type="application/json",
+            headers={"X-Gitlab-Event": "Push Hook"},
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(ScrapeJob.objects.count(), 1)
+
+    def test_ignored_event(self):
+        response = self.post_github({"zen": "Keep it simple"}, event="ping")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ScrapeJob.objects.count(), 0)
+
+    def test_unknown_repository(self):
+        response = self.post_github(
+            {"repository": {"html_url": "https://github.com/someone/bar"}}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(BARYON_WEBHOOK_SECRET="secret")
+    def test_secret(self):
+        payload = {
+            "repository": {"html_url": "https://github.com/supercollider-quarks/Foo"}
+        }
+        self.assertEqual(self.post_github(payload, secret="wrong").status_code, 403)
+        self.assertEqual(ScrapeJob.objects.count(), 0)
+        self.assertEqual(self.post_github(payload, secret="secret").status_code, 202)
+
+        response = self.client.post(
+            reverse("webhook"),
+            data=payload,
+            content_type="application/json",
+            headers={"X-Gitlab-Event": "Push Hook", "X-Gitlab-Token": "wrong"},
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_concurrent_push(self):
+        job = ScrapeJob.enqueue_project(self.project, delay=timedelta(minutes=2))
+        # a concurrent push created its job after the lookup
+        with mock.patch.object(QuerySet, "first", return_value=None):
+            postponed_job = ScrapeJob.enqueue_project(
+                self.project, delay=timedelta(minutes=5)
+            )
+        self.assertEqual(postponed_job.pk, job.pk)
+        self.assertGreater(postponed_job.scheduled_for, job.scheduled_for)
+        self.assertEqual(ScrapeJob.objects.count(), 1)
+
+    @override_settings(BARYON_WEBHOOK_SECRET=None)
+    def test_missing_secret_check(self):
+        self.assertEqual(
+            [warning.id for warning in check_webhook_secret(None)], ["quarks.W001"]
+        )
+        with override_settings(BARYON_WEBHOOK_SECRET="secret"):
+            self.assertEqual(check_webhook_secret(None), [])
+
+    def test_follow_requires_worker(self):
+        with self.assertRaisesRegex(CommandError, "--worker"):
+            call_command("scrape_projects", "--follow")
@@ -9,6 +9,7 @@ urlpatterns = [
     path("extensions", views.ExtensionListView.as_view(), name="extensions"),
     path("classes", views.ClassesListView.as_view(), name="classes"),
     path("about", cache_page(1)(views.AboutView.as_view()), name="about"),
+    path("api/webhook", views.ScrapeWebhookView.as_view(), name="webhook"),
     # cache this as this has dependencies scanning
     path(
         "project/<str:name>",
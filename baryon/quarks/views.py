@@ -1,10 +1,25 @@
-from typing import Any, List
-
+import hashlib
+import hmac
+import json
+import logging
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Union
+
+from django.conf import settings
 from django.db.models import Q
 from django.db.models.query import QuerySet
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import DetailView, ListView, TemplateView
 
-from .models import Project, ProjectClass
+from .class_index import ClassIndex, ClassSearchResults
+from .install_plan import DependencyGraph
+from .models import Project, ProjectClass, ProjectQuerySet, ScrapeJob
+from .sc.extractor import ProjectRepo as Extractor
+
+logger = logging.getLogger(__name__)
 
 
 class IndexView(TemplateView):
@@ -51,12 +66,13 @@ class ClassesListView(ListView):
             return ["partials/class-list.html"]
         return ["classes.html"]
 
-    def get_queryset(self) -> QuerySet[ProjectClass]:
+    def get_queryset(self) -> Union[QuerySet[ProjectClass], ClassSearchResults]:
         qs: QuerySet[ProjectClass] = super().get_queryset()  # type: ignore
         # qs = qs.filter(is_extension=False)
         if search_term := self.request.GET.get("search"):
-            qs = qs.filter(name__icontains=search_term)
-        return qs
+            # only the classes of the current page get fetched
+            return ClassSearchResults(ClassIndex.get().search(search_term))
+        return qs.select_related("project")
 
 
 class ProjectListView(ListView):
@@ -70,13 +86,9 @@ class ProjectListView(ListView):
         return ["projects.html"]
 
     def get_queryset(self) -> QuerySet[Project]:
-        qs: QuerySet[Project] = super().get_queryset()  # type: ignore
+        qs: ProjectQuerySet = super().get_queryset()  # type: ignore
         if search_term := self.request.GET.get("search"):
-            qs = qs.filter(
-                Q(name__icontains=search_term)
-                | Q(quark_info__summary__icontains=search_term)
-                | Q(project_help__icontains=search_term)
-            )
+            qs = qs.search(search_term)
         return qs
 
 
@@ -103,3 +115,104 @@ class ProjectDetailView(DetailView):
 
     def get_object(self, *args, **kwargs) -> Project:
         return Project.objects.get(name=self.kwargs.get("name"))
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context["install_plan"] = DependencyGraph.get().install_plan(self.object)
+        return context
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class ScrapeWebhookView(View):
+    """Receives push webhooks of GitHub and GitLab and queues a debounced
+    scrape of the project of the pushed repository.
+    """
+
+    http_method_names = ["post"]
+
+    # repository URLs within the payload of a push event
+    GITHUB_URL_KEYS = ["html_url", "clone_url", "git_url", "ssh_url"]
+    GITLAB_URL_KEYS = ["web_url", "git_http_url", "git_ssh_url"]
+
+    @staticmethod
+    def _is_verified(request: HttpRequest) -> bool:
+        secret = settings.BARYON_WEBHOOK_SECRET
+        if not secret:
+            return True
+        if signature := request.headers.get("X-Hub-Signature-256"):
+            expected_signature = (
+                "sha256="
+                + hmac.new(secret.encode(), request.body, hashlib.sha256).hexdigest()
+            )
+            return hmac.compare_digest(signature, expected_signature)
+        if token := request.headers.get("X-Gitlab-Token"):
+            return hmac.compare_digest(token, secret)
+        return False
+
+    @classmethod
+    def _get_repo_urls(
+        cls, request: HttpRequest, payload: Dict[str, Any]
+    ) -> Optional[List[str]]:
+        # returns None if the event is not a push
+        if github_event := request.headers.get("X-GitHub-Event"):
+            if github_event != "push":
+                return None
+            repository = payload.get("repository", {})
+            url_keys = cls.GITHUB_URL_KEYS
+        elif gitlab_event := request.headers.get("X-Gitlab-Event"):
+            if gitlab_event not in ["Push Hook", "Tag Push Hook"]:
+                return None
+            repository = payload.get("project", {})
+            url_keys = cls.GITLAB_URL_KEYS
+        else:
+            return None
+        return [
+            repository[url_key]
+            for url_key in url_keys
+            if isinstance(repository.get(url_key), str)
+        ]
+
+    @staticmethod
+    def _find_project(repo_urls: List[str]) -> Optional[Project]:
+        normalized_urls = {Extractor.normalize_git_url(url) for url in repo_urls}
+        # the path of the repository narrows down the candidates
+        query = Q()
+        for url in normalized_urls:
+            query |= Q(git_url__icontains=url.split("/", 1)[-1])
+        for project in Project.objects.filter(query):
+            if Extractor.normalize_git_url(project.git_url) in normalized_urls:
+                return project
+        return None
+
+    def post(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        if not self._is_verified(request):
+            return JsonResponse({"error": "Invalid signature"}, status=403)
+        try:
+            payload = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({"error": "Invalid JSON payload"}, status=400)
+        if not isinstance(payload, dict):
+            return JsonResponse({"error": "Invalid JSON payload"}, status=400)
+
+        repo_urls = self._get_repo_urls(request, payload)
+        if repo_urls is None:
+            # e.g. the ping event of GitHub
+            return JsonResponse({"status": "ignored"})
+
+        project = self._find_project(repo_urls)
+        if project is None:
+            return JsonResponse({"error": "Unknown repository"}, status=404)
+
+        job = ScrapeJob.enqueue_project(
+            project,
+            delay=timedelta(seconds=settings.BARYON_WEBHOOK_DEBOUNCE_SECONDS),
+        )
+        logger.info(f"Queued scrape of {project.name} via webhook")
+        return JsonResponse(
+            {
+                "status": "queued",
+                "project": project.name,
+                "scheduled_for": job.scheduled_for.isoformat(),
+            },
+            status=202,
+        )